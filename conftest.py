@@ -30,4 +30,36 @@ def pytest_report_header(config=None):
     except OSError:
         git_info = ""
     
-    return "Date: " + str(datetime.now()) + "\nGit: " + git_info + " (" + git_branch + ")"
\ No newline at end of file
+    return "Date: " + str(datetime.now()) + "\nGit: " + git_info + " (" + git_branch + ")"
+
+def pytest_addoption(parser):
+    parser.addoption('--deep-sheets', action='store_true', default=False,
+            help='Run the deep expected result tests as one test item per (solution, scenario, sheet) '
+                 'instead of one per solution, so that pytest-xdist can spread them over processes '
+                 '(e.g. -n auto --dist loadgroup).')
+
+
+def pytest_collection_modifyitems(config, items):
+    """Keep either the deep tests or the deep_sheets tests, as selected by --deep-sheets."""
+    dropped = 'deep' if config.getoption('--deep-sheets') else 'deep_sheets'
+    deselected = [item for item in items if item.get_closest_marker(dropped)]
+    if deselected:
+        config.hook.pytest_deselected(items=deselected)
+        items[:] = [item for item in items if not item.get_closest_marker(dropped)]
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Summarize the slowest scenarios of the deep_sheets tests."""
+    seconds = {}
+    load_seconds = {}
+    for reports in terminalreporter.stats.values():
+        for report in reports:
+            properties = dict(getattr(report, 'user_properties', []))
+            if getattr(report, 'when', None) == 'call' and 'deep_scenario' in properties:
+                name = properties['deep_scenario']
+                seconds[name] = seconds.get(name, 0.0) + report.duration
+                load_seconds[name] = properties.get('deep_scenario_load_seconds', 0.0)
+    if seconds:
+        terminalreporter.write_sep('=', 'slowest deep_sheets scenarios')
+        for name in sorted(seconds, key=seconds.get, reverse=True)[:10]:
+            terminalreporter.write_line(f"{seconds[name]:8.2f}s  (loading {load_seconds[name]:.2f}s)  {name}")
@@ -1,6 +1,7 @@
+import warnings
 from pathlib import Path
+import numpy as np
 import pandas as pd
-from . import integration
 from model import advanced_controls as ac
 from model import aez
 from model import dd
@@ -13,19 +14,19 @@ standard_land_allocation_types = list(world_land.AEZ_ALLOCATION_MAP.keys()) + ["
 
 standard_land_solution_priorities = {
     'Non-Degraded Forest':    
-        ['peatland', 'mangroverestoration', 'indigenouspeoplesland', 'forestprotection', 'multistrataagroforestry'],
+        ['peatlands', 'mangroverestoration', 'indigenouspeoplesland', 'forestprotection', 'multistrataagroforestry'],
     'Degraded Forest':        
-        ['tropicalforests', 'temporateforests', 'BOREAL FOREST', 'peatland', 'mangroverestoration', 'bamboo', 'afforestation'],
+        ['tropicalforests', 'temperateforests', 'BOREAL FOREST', 'peatlands', 'mangroverestoration', 'bamboo', 'afforestation'],
     'Non-Degraded Grassland': 
-        ['peatland', 'grasslandprotection', 'multistrataagroforestry', 'tropicaltreestaples', 'silvopasture', 'managedgrazing'],
+        ['peatlands', 'grasslandprotection', 'multistrataagroforestry', 'tropicaltreestaples', 'silvopasture', 'managedgrazing'],
     'Degraded Grassland':     
         ['afforestation', 'farmlandrestoration', 'perennialbioenergy'],
     'Non-Degraded Cropland':  
-        ['tropicalforests', 'peatland', 'riceintensification', 'improvedrice', 'conservationagriculture', 'treeintercropping'],
+        ['tropicalforests', 'peatlands', 'riceintensification', 'improvedrice', 'conservationagriculture', 'treeintercropping'],
     'Degraded Cropland':      
         ['treeintercropping'],
     'Add-On Solutions':      
-        ['improvedcattlefeed', 'regenerativeagriculture', 'irregationefficiency', 'nutrientmanagement', 'SUSTAINABLE INTENSIFICATION']
+        ['improvedcattlefeed', 'regenerativeagriculture', 'irrigationefficiency', 'nutrientmanagement', 'SUSTAINABLE INTENSIFICATION']
 }
 """The prioritization amongst Land solutions for access to land in each land allocation type.
 Any land solution not on this list will be assumed to be lower priority than these."""
@@ -39,6 +40,62 @@ Any land solution not on this list will be assumed to be lower priority than the
 # }
 
 
+class LandAllocation:
+    """Priority-ordered allocation of land to solutions.
+
+    The land available and the land each solution demands are held as arrays over
+    (region x TMR x allocation type) and (region x TMR x allocation type x solution).  Within each
+    allocation type, solutions are given land in order of priority: each gets as much of its demand
+    as is left over by the solutions before it.  All regions, TMRs and allocation types are filled
+    at once, so the allocation can be cheaply redone for any number of priority orderings.
+    """
+
+    def __init__(self, available, demand, regions, regimes, allocation_types, solutions):
+        self.available = np.nan_to_num(np.asarray(available, dtype=np.float64))
+        self.demand = np.nan_to_num(np.asarray(demand, dtype=np.float64))
+        self.regions = list(regions)
+        self.regimes = list(regimes)
+        self.allocation_types = list(allocation_types)
+        self.solutions = list(solutions)
+
+    def order(self, priorities=None) -> np.ndarray:
+        """Return the (allocation type x solution) array of solution indices in priority order.
+        priorities maps allocation types to lists of solutions, highest priority first (by default
+        standard_land_solution_priorities).  Solutions not on the list of an allocation type follow
+        those that are, in the order of self.solutions.  Names which are not in self.solutions are
+        ignored."""
+        priorities = standard_land_solution_priorities if priorities is None else priorities
+        index = {name: i for (i, name) in enumerate(self.solutions)}
+        result = []
+        for allocation_type in self.allocation_types:
+            first = [index[name] for name in dict.fromkeys(priorities.get(allocation_type, [])) if name in index]
+            taken = set(first)
+            result.append(first + [i for i in range(len(self.solutions)) if i not in taken])
+        return np.array(result, dtype=np.intp).reshape(len(self.allocation_types), len(self.solutions))
+
+    def allocate(self, priorities=None) -> np.ndarray:
+        """Return the land allocated to each solution (same shape as self.demand) under priorities
+        (see order)."""
+        order = self.order(priorities)[np.newaxis, np.newaxis]
+        demand = np.take_along_axis(self.demand, order, axis=3)
+        filled = np.minimum(np.cumsum(demand, axis=3), self.available[..., np.newaxis])
+        allocated = np.diff(filled, axis=3, prepend=0.0).clip(min=0.0)
+        result = np.empty_like(allocated)
+        np.put_along_axis(result, order, allocated, axis=3)
+        return result
+
+    def allocate_each(self, priorities_list) -> np.ndarray:
+        """Return the allocations (see allocate) under each of priorities_list, stacked along a new first axis."""
+        return np.stack([self.allocate(priorities) for priorities in priorities_list])
+
+    def to_frame(self, values) -> pd.DataFrame:
+        """Return an array of the shape of self.demand as a dataframe indexed by (region, TMR, allocation type),
+        with a column for each solution."""
+        index = pd.MultiIndex.from_product([self.regions, self.regimes, self.allocation_types],
+                                           names=["Region", "TMR", "Allocation Type"])
+        return pd.DataFrame(np.reshape(values, (-1, len(self.solutions))), index=index, columns=self.solutions)
+
+
 class AEZ_Land_Integration:
     """The AEZ / Land Integration looks at competition between LAND solutions for land of different types, 
     and adjusts land availability accordingly.
@@ -55,7 +112,7 @@ class AEZ_Land_Integration:
             self.solution_list = [ _map_scenario_to_module(scenario) for scenario in self.scenario_list ]
         else:
             self.solution_list = factory.all_solutions_category(ac.SOLUTION_CATEGORY.LAND)
-            self.scenario_list = [ factory.solution_pds_type(x, "PDS2") for x in self.solution_list ]
+            self.scenario_list = [ factory.load_scenario(x, "PDS2", lazy=True) for x in self.solution_list ]
         
         
         self.world_land_availability = world_land.World_TMR_AEZ_Map(series_name="2020")
@@ -74,11 +131,34 @@ class AEZ_Land_Integration:
 
         # Then we have to sort the data by priority within the different Landtypes
 
-        
-        
+        self.land = self._land_allocation(per_solution_allocations)
 
+    def _land_allocation(self, per_solution_allocations) -> LandAllocation:
+        """Build the LandAllocation of the main regions and the TMRs of the world map, where the demand
+        of each solution is its current allocation (in Mha)."""
+        regions = dd.MAIN_REGIONS
+        world = self.world_land_availability.reduce_columns(world_land.AEZ_ALLOCATION_MAP)
+        regimes = list(world.index.unique(level="TMR"))
+        cells = pd.MultiIndex.from_product([regimes, regions])
+        shape = (len(regimes), len(regions), len(world_land.AEZ_ALLOCATION_MAP))
 
+        # The world map is in km2 and solution allocations are in Mha
+        available = (world.reindex(cells).to_numpy() / 10000).reshape(shape).swapaxes(0, 1)
+        demand = []
+        for (name, allocations) in per_solution_allocations.items():
+            unmapped = set(allocations.index.unique(level=0)) - set(regimes)
+            if unmapped:
+                warnings.warn(f"{name} allocations for {sorted(unmapped)} are not in the world map, and are ignored")
+            reduced = world_land.sum_columns(allocations, world_land.AEZ_ALLOCATION_MAP)
+            demand.append(reduced.reindex(cells, fill_value=0.0).to_numpy().reshape(shape).swapaxes(0, 1))
+        return LandAllocation(available, np.stack(demand, axis=-1), regions, regimes,
+                              world_land.AEZ_ALLOCATION_MAP.keys(), self.solution_list)
 
+    def allocate(self, priorities=None) -> pd.DataFrame:
+        """Allocate land to the solutions by priority (by default standard_land_solution_priorities; see
+        LandAllocation.order), returning the land allocated to each solution (in Mha) by region, TMR and
+        allocation type.  Requires assemble_current_status; scenarios are not reloaded."""
+        return self.land.to_frame(self.land.allocate(priorities))
 
 
 def _map_scenario_to_module(scenario):
@@ -60,7 +60,8 @@ from dataclasses import dataclass
 from pathlib import Path
 import pandas as pd
 from model import integration
-from integration_base import *
+from integrations import integration_base
+from integrations.integration_base import *
 from solution import factory
 import pdb
 
@@ -101,7 +102,6 @@ building_solutions_needed = {
     "Commercial LED (Excludes Household LED)": "leds_commercial",
     }
 
-# Load adoption data from solutions
 @dataclass
 class building_integration_state:
     # This data class holds global variables that are shared between steps.  Embedding it in a class
@@ -125,10 +125,7 @@ class building_integration_state:
     water_heating_global_tam : pd.DataFrame = pd.read_csv(DATADIR/"water_heating_global_tam.csv", index_col="year", squeeze=False)
 
     testmode = False
-    adoption_dict = {}
-    for key, value in building_solutions_needed.items():
-        adoption_dict[key] = load_solution_adoptions(value)[pds.upper()]
-    adoption : pd.DataFrame = pd.DataFrame(data=adoption_dict)
+    adoption : pd.DataFrame = None   # set by integrate (see load_adoption)
 
     # Load test data
     if testmode:
@@ -148,11 +145,19 @@ if test_adoption:
     # ds.adoption = ds.adoption_test
     pass
 
+def load_adoption(pds) -> pd.DataFrame:
+    """Load the adoption of each of building_solutions_needed in scenario pds ('pds1', 'pds2' or 'pds3')."""
+    return pd.DataFrame(data={key: load_solution_adoptions(value)[pds.upper()]
+                              for key, value in building_solutions_needed.items()})
+
 def integrate():
     """Perform all steps of the integration together."""
+    if not integration_base.testmode:
+        solution_data(building_solutions_needed.values())   # build the scenarios of all the solutions at once, in parallel
     for pds in ['pds1', 'pds2', 'pds3']:
         print(pds)
         ds = building_integration_state(pds=pds)
+        ds.adoption = load_adoption(pds)
         cool_roofs_integration(ds)
         green_roofs_integration(ds)
         high_performance_glass_residential_integration(ds)
@@ -258,14 +258,9 @@ def load_net_grid_use() -> pd.DataFrame:
         df.columns = df.columns.sort_values()
     else:
         collect = {}
+        solution_data(factory.all_solutions())   # build all the scenarios at once, in parallel
         for x in factory.all_solutions():
-            s1 = factory.load_scenario(x, scenario_names[x][0])
-            s2 = factory.load_scenario(x, scenario_names[x][1])
-            s3 = factory.load_scenario(x, scenario_names[x][2])
-            collect[x] = pd.DataFrame({
-                "PDS1": s1.soln_net_energy_grid_impact()['World'],
-                "PDS2": s2.soln_net_energy_grid_impact()['World'],
-                "PDS3": s3.soln_net_energy_grid_impact()['World']})
+            collect[x] = load_solution_grid_impacts(x)
         
             # drop no-op solutions
             if collect[x].sum().sum() == 0:
@@ -415,6 +410,7 @@ def step2_calculate_adoptions():
         solutional = pd.read_csv(StringIO(maybedata), header=[0,1], index_col=0)
         solutional = solutional.rename(columns=factory.find_solution_by_name, level=1)
     else:
+        solution_data(energy_solutions)
         solutional = pd.concat({
             soln : load_solution_adoptions(soln) for soln in energy_solutions
         }, axis=1).swaplevel(axis=1)
@@ -1,10 +1,12 @@
 """Code shared by all integrations."""
 
 import os
+from concurrent.futures import ProcessPoolExecutor
 from io import StringIO
 import numpy as np
 import pandas as pd
 from model import integration
+from model import result_cache
 from solution import factory
 from pathlib import Path
 
@@ -49,6 +51,81 @@ def integration_clean():
 standard_scenarios = ["PDS1","PDS2","PDS3"]
 scenario_names = { s : standard_scenarios.copy() for s in factory.all_solutions() }
 
+# #######################################################################################################
+#
+# Solution data service
+#
+# Integrations use only a few results of each solution's PDS1/2/3 scenarios, and several
+# integrations use the same solutions.  solution_data builds each scenario once, in parallel
+# worker processes, and keeps the results keyed by the contents of the scenario's Advanced
+# Controls and of the code and data it depends on (as result_cache.source_digest does), so a
+# scenario is only rebuilt when one of its inputs changes.  If DRAWDOWN_RESULT_CACHE is set
+# the results are also stored in the result cache, and shared between runs.
+
+_solution_data = {}
+"""key (see solution_data) -> results of _build_solution_data"""
+
+def _build_solution_data(solution_name, scenario_name) -> dict :
+    """Build one scenario and return the results integrations use, each for the World region.
+    Land solutions have no TAM, so 'tam' is None for them.  Runs in a worker process of solution_data."""
+    s = factory.load_scenario(solution_name, scenario_name, lazy=True)
+    tm = getattr(s, 'tm', None)
+    return {
+        'adoption': s.ht.soln_pds_funits_adopted()['World'],
+        'tam': tm.pds_tam_per_region()['World'] if tm is not None else None,
+        'grid_impact': s.soln_net_energy_grid_impact()['World']}
+
+def solution_keys(solution_names) -> dict :
+    """Return {(solution, PDS): (scenario name, key)} for the PDS1, PDS2 and PDS3 scenarios of each of
+    solution_names, where key identifies the inputs of the scenario: it changes if the scenario's
+    Advanced Controls, or the code or data of the solution, change."""
+    keys = {}
+    # The same as result_cache.source_digest, but digesting the shared code and data only once
+    shared = result_cache.files_digest([rootdir/'model', rootdir/'data'] + sorted((rootdir/'solution').glob('*.py')))
+    for solution_name in dict.fromkeys(solution_names):
+        digest = result_cache.files_digest([rootdir/'solution'/solution_name])
+        for (pds, scenario_name) in zip(standard_scenarios, scenario_names[solution_name]):
+            the_ac = factory.scenario_ac(solution_name, scenario_name)
+            key = (f"integration-v{result_cache.FORMAT_VERSION}-{result_cache.integration_tag()}-{shared}-{digest}-"
+                   f"{the_ac.fingerprint()}")
+            keys[(solution_name, pds)] = (scenario_name, key)
+    return keys
+
+def solution_data(solution_names, workers=None) -> dict :
+    """Return {(solution, PDS): data} for the PDS1, PDS2 and PDS3 scenarios of each of solution_names
+    (as chosen in scenario_names), where data is a dict with the 'adoption', 'tam' and 'grid_impact'
+    of the scenario.  Scenarios that have not been built yet are built in up to `workers` processes
+    (default: the number of CPUs)."""
+    cache = result_cache.default_cache()
+    keys = solution_keys(solution_names)
+    missing = {}
+    for ((solution_name, pds), (scenario_name, key)) in keys.items():
+        if key in _solution_data or key in missing:
+            continue
+        stored = cache.get(solution_name, key) if cache else None
+        if stored is not None:
+            _solution_data[key] = stored
+        else:
+            missing[key] = (solution_name, scenario_name)
+
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(missing) <= 1:
+        built = [_build_solution_data(*args) for args in missing.values()]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(missing))) as executor:
+            futures = [executor.submit(_build_solution_data, *args) for args in missing.values()]
+            built = [f.result() for f in futures]
+    for ((key, (solution_name, _)), data) in zip(missing.items(), built):
+        _solution_data[key] = data
+        if cache:
+            cache.put(solution_name, key, data)
+
+    return {pair: _solution_data[key] for (pair, (_, key)) in keys.items()}
+
+def _pds_frame(solution_name, item) -> pd.DataFrame :
+    data = solution_data([solution_name])
+    return pd.DataFrame({pds: data[(solution_name, pds)][item] for pds in standard_scenarios})
+
 # #######################################################################################################
 #
 # Reading Solution Data
@@ -66,10 +143,7 @@ def load_solution_adoptions(solution_name) -> pd.DataFrame :
         if filename.is_file():
             return pd.read_csv(filename, index_col="Year")
     # else
-    pds1 = factory.load_scenario(solution_name, scenario_names[solution_name][0]).ht.soln_pds_funits_adopted()['World']
-    pds2 = factory.load_scenario(solution_name, scenario_names[solution_name][1]).ht.soln_pds_funits_adopted()['World']
-    pds3 = factory.load_scenario(solution_name, scenario_names[solution_name][2]).ht.soln_pds_funits_adopted()['World']
-    return pd.DataFrame({"PDS1": pds1, "PDS2": pds2, "PDS3": pds3})
+    return _pds_frame(solution_name, 'adoption')
 
 
 def load_solution_tam(solution_name) -> pd.Series:
@@ -79,7 +153,13 @@ def load_solution_tam(solution_name) -> pd.Series:
         if filename.is_file():
             return pd.read_csv(filename, index_col="Year")['World']
     # else
-    return factory.load_scenario(solution_name, scenario_names[solution_name][0]).tm.pds_tam_per_region()['World']
+    return solution_data([solution_name])[(solution_name, standard_scenarios[0])]['tam']
+
+
+def load_solution_grid_impacts(solution_name) -> pd.DataFrame :
+    """Return the net impact of solution on the electricity grid (see Scenario.soln_net_energy_grid_impact)
+    in three scenarios, labeled PDS1, PDS2 and PDS3.  Returns Year x (PDS1,PDS2,PDS3) dataframe."""
+    return _pds_frame(solution_name, 'grid_impact')
 
 
 def load_solution_file(solution_name, file_relative_name):
@@ -1 +1,333 @@
-"""Run any or all integrations, from end to end."""
+"""Run any or all integrations, from end to end.
+
+Usage:
+    python -m integrations.integration_master [--clean] [--testmode] [--force] [--year YEAR]
+                                              [--workers N] [--jobs N] [integration ...]
+
+Each integration is a sequence of steps (module functions such as elc_integration.step1_calculate_tams)
+that pass results to each other through the module's *_integration_state object.  STEPS declares,
+for every step, the steps it follows and what it reads and writes:
+  * inputs: files and directories (relative to the repository root) it reads,
+  * solutions: the solutions whose scenarios it reads (through integration_base.solution_data),
+  * outputs: files it writes (with update_to_version or integration_alt_file), and
+  * updates: the solutions whose scenarios it rewrites (with update_ac or update_adoptions).
+A step also runs after any step whose outputs or updates it reads, unless that step itself
+follows it (as when an integration updates the scenarios it read earlier; the update is then
+picked up by the next run).  Steps that do not depend on each other are prepared concurrently
+(their fingerprints computed and their solutions' scenarios built), but the steps themselves run
+one at a time, since they share the globals of integration_base (integration_name, auditlog).
+
+A run is incremental.  After a step has run, its fingerprint (a digest of its code, inputs,
+solution scenarios and the fingerprints of the steps it follows), a digest of its outputs and a
+snapshot of its integration's state and audit log are kept in the 'integration' result cache
+directory (see result_cache.cache_directory; no steps are skipped if DRAWDOWN_RESULT_CACHE is not set).  When a step's fingerprint and outputs are
+unchanged at the next run it is skipped and the snapshot restored instead.  Every run prints
+the time each step took.
+"""
+
+import argparse
+import concurrent.futures
+import dataclasses
+import hashlib
+import importlib
+import json
+import pickle
+import threading
+import time
+import traceback
+from pathlib import Path
+
+from integrations import integration_base
+from model import integration
+from model import result_cache
+from solution import factory
+
+ROOT = Path(__file__).parents[1]
+
+DEFAULT_YEAR = 2018
+"""The year the electricity integration integrates for (see elc_integration.setup)."""
+
+
+@dataclasses.dataclass(frozen=True)
+class Step:
+    """One step of an integration, named "<integration>.<function>" (see the module documentation).
+    inputs and outputs may contain "{year}", which is replaced by the year of the integration.
+    solutions may also be a function of the integration module, returning the solution names."""
+    name: str
+    after: tuple = ()
+    inputs: tuple = ()
+    solutions: object = ()
+    outputs: tuple = ()
+    updates: tuple = ()
+
+    @property
+    def integration(self):
+        return self.name.split('.')[0]
+
+    @property
+    def function(self):
+        return self.name.split('.')[1]
+
+
+STEPS = [
+    Step('waste.ws_step1', inputs=('integrations/data/msw',)),
+    Step('waste.ws_step2', after=('waste.ws_step1',), inputs=('integrations/data/msw',),
+         solutions=('bioplastic',)),
+    Step('waste.ws_step3', after=('waste.ws_step2',), solutions=('composting', 'hcrecycling')),
+    Step('waste.ws_step4', after=('waste.ws_step3',), inputs=('integrations/data/msw',),
+         solutions=('recycledpaper',)),
+    Step('waste.ws_step5', after=('waste.ws_step4',), solutions=('wastetoenergy',)),
+    Step('waste.ws_step6', after=('waste.ws_step5',), solutions=('landfillmethane',)),
+    Step('waste.ws_step7', after=('waste.ws_step6',),
+         outputs=('integrations/data/msw/waste_to_energy_lhv.csv', 'integrations/data/msw/waste_to_energy_doc.csv'),
+         updates=('composting', 'hcrecycling')),
+
+    Step('building.integrate', inputs=('integrations/data/building',),
+         solutions=lambda module: module.building_solutions_needed.values(),
+         updates=('coolroofs', 'greenroofs', 'residentialglass', 'buildingautomation', 'smartthermostats')),
+
+    Step('elc.step1_calculate_tams', inputs=('integrations/data/elc', 'data/energy'),
+         solutions=lambda module: factory.all_solutions()),
+    Step('elc.step2_calculate_adoptions', after=('elc.step1_calculate_tams',), inputs=('integrations/data/elc',),
+         solutions=lambda module: module.energy_solutions),
+    Step('elc.step3_calculate_emissions', after=('elc.step2_calculate_adoptions',), inputs=('integrations/data/elc',),
+         solutions=lambda module: module.energy_solutions),
+    Step('elc.step4_update', after=('elc.step3_calculate_emissions',),
+         outputs=tuple(f'data/{name}_{version}.csv' for name in
+                       ['emissions/meta', 'energy/PDS_plausible_scenario', 'energy/PDS_drawdown_scenario',
+                        'energy/PDS_optimum_scenario'] for version in ['{year}', 'current']) +
+                 ('data/energy/pds_tam_sources_{year}.csv',)),
+]
+
+INTEGRATIONS = list(dict.fromkeys(step.integration for step in STEPS))
+"""The integrations that can be run end to end."""
+
+
+def load_integration(name):
+    """Import the module of integration name.  This is done when an integration is run, since some
+    integration modules load solution data on import, which must happen after integration_start."""
+    return importlib.import_module(f'integrations.{name}_integration')
+
+
+def _state_object(module):
+    """The *_integration_state object through which the steps of module pass results, or None."""
+    for value in vars(module).values():
+        if dataclasses.is_dataclass(value) and type(value).__name__.endswith('_integration_state'):
+            return value
+    return None
+
+
+class _Run:
+    """The state of one run of run_steps."""
+
+    def __init__(self, steps, modules, directory, year, testmode, workers, force):
+        self.steps = {step.name: step for step in steps}
+        self.modules = modules
+        self.directory = Path(directory) if directory else None
+        self.year = year
+        self.testmode = testmode
+        self.workers = workers
+        self.force = force
+        self.lock = threading.Lock()
+        self.step_lock = threading.Lock()   # held while a step uses the globals of integration_base
+        self.fingerprints = {}
+        self.solutions = {name: self._solutions(step) for (name, step) in self.steps.items()}
+        self.outputs = {name: [integration.integration_alt_file(ROOT/p.format(year=year)) for p in step.outputs]
+                        for (name, step) in self.steps.items()}
+        self.previous = {}
+        if self.directory and (self.directory/'steps.json').is_file():
+            self.previous = json.loads((self.directory/'steps.json').read_text())
+        self.depends = self._dependencies()
+
+    def _solutions(self, step):
+        if step.integration not in self.modules:
+            return []
+        solutions = step.solutions(self.modules[step.integration]) if callable(step.solutions) else step.solutions
+        return list(solutions)
+
+    def _dependencies(self):
+        depends = {name: {a for a in step.after if a in self.steps} for (name, step) in self.steps.items()}
+
+        def follows(name, other):
+            return other in depends[name] or any(follows(d, other) for d in depends[name])
+
+        for (name, step) in self.steps.items():
+            reads = [ROOT/p.format(year=self.year) for p in step.inputs]
+            for (other_name, other) in self.steps.items():
+                if other_name == name or follows(other_name, name):
+                    continue
+                writes_input = any(out == p or p in out.parents for out in self.outputs[other_name] for p in reads)
+                if writes_input or set(other.updates) & set(self.solutions[name]):
+                    depends[name].add(other_name)
+        return depends
+
+    def fingerprint(self, name):
+        step = self.steps[name]
+        module = self.modules[step.integration]
+        all_outputs = [p for outputs in self.outputs.values() for p in outputs]
+        inputs = [ROOT/p.format(year=self.year) for p in step.inputs]
+        if self.testmode:
+            inputs.append(integration_base.testdir)
+        parts = {
+            'step': name, 'year': self.year, 'testmode': self.testmode,
+            'code': result_cache.files_digest([Path(module.__file__), Path(integration_base.__file__), ROOT/'model']),
+            'inputs': result_cache.files_digest(inputs, exclude=all_outputs),
+            'solutions': sorted(key for (_, key) in integration_base.solution_keys(self.solutions[name]).values()),
+            'after': sorted(self.fingerprints[d] for d in self.depends[name])}
+        return _digest(parts)
+
+    def output_digest(self, name):
+        step = self.steps[name]
+        return _digest({'files': result_cache.files_digest(self.outputs[name]),
+                        'updates': sorted(key for (_, key) in integration_base.solution_keys(step.updates).values())})
+
+    def execute(self, name):
+        """Run or skip step name, returning its record."""
+        step = self.steps[name]
+        start = time.perf_counter()
+        module = self.modules[step.integration]
+        state = _state_object(module)
+        self.fingerprints[name] = fingerprint = self.fingerprint(name)
+        snapshot = self.directory/f'{name}.pkl' if self.directory else None
+
+        previous = self.previous.get(name, {})
+        if (not self.force and snapshot and snapshot.is_file() and previous.get('fingerprint') == fingerprint
+                and previous.get('outputs') == self.output_digest(name)):
+            saved = pickle.loads(snapshot.read_bytes())
+            with self.step_lock:
+                if state is not None:
+                    vars(state).update(saved['state'])
+                integration_base.auditlog.setdefault(step.integration, {}).update(saved['audit'])
+            return {'step': name, 'status': 'skipped', 'seconds': time.perf_counter() - start, 'error': None}
+
+        if self.solutions[name] and not self.testmode:
+            integration_base.solution_data(self.solutions[name], workers=self.workers)
+        with self.step_lock:
+            # Every integration module sets integration_name when it is imported (start_audit), so
+            # it names whichever was imported last: set it to the integration of this step.
+            integration_base.integration_name = step.integration
+            audit = integration_base.auditlog.setdefault(step.integration, {})
+            audited = set(audit)
+            getattr(module, step.function)()
+            saved = {'state': dict(vars(state)) if state is not None else {},
+                     'audit': {k: v for (k, v) in audit.items() if k not in audited}}
+        if snapshot:
+            snapshot.parent.mkdir(parents=True, exist_ok=True)
+            snapshot.write_bytes(pickle.dumps(saved))
+            with self.lock:
+                self.previous[name] = {'fingerprint': fingerprint, 'outputs': self.output_digest(name),
+                                       'seconds': time.perf_counter() - start}
+                (self.directory/'steps.json').write_text(json.dumps(self.previous, indent=2))
+        return {'step': name, 'status': 'ran', 'seconds': time.perf_counter() - start, 'error': None}
+
+
+def _digest(parts):
+    return hashlib.blake2b(json.dumps(parts, sort_keys=True).encode(), digest_size=16).hexdigest()
+
+
+def run_steps(steps, modules, directory=None, year=DEFAULT_YEAR, testmode=False, workers=None, jobs=None,
+              force=False):
+    """Run steps (a list of Step) of the integration modules in modules ({integration: module}),
+    skipping those whose inputs are unchanged since the last run that kept its results in
+    directory (none are skipped if directory is None or force is True).  Up to `jobs` steps are
+    prepared concurrently (default: one per integration), though only one runs at a time, and
+    scenarios are built in up to `workers` processes (see integration_base.solution_data).
+
+    Returns a list of records, one per step in the order they finished, with the keys 'step',
+    'status' ('ran', 'skipped', 'failed', or 'blocked' if a step it follows failed), 'seconds'
+    and 'error' (None, or the formatted traceback)."""
+    failed = [step for step in steps if step.integration not in modules]
+    runner = _Run([step for step in steps if step not in failed], modules, directory, year, testmode,
+                  workers, force)
+    records = [{'step': step.name, 'status': 'failed', 'seconds': 0.0,
+                'error': f"integration {step.integration} could not be loaded"} for step in failed]
+    pending = dict(runner.depends)
+    done = {}
+
+    def execute(name):
+        start = time.perf_counter()
+        try:
+            return runner.execute(name)
+        except Exception:
+            return {'step': name, 'status': 'failed', 'seconds': time.perf_counter() - start,
+                    'error': traceback.format_exc()}
+
+    jobs = jobs or len(modules) or 1
+    with concurrent.futures.ThreadPoolExecutor(max_workers=jobs) as executor:
+        running = {}
+        while pending or running:
+            for (name, depends) in list(pending.items()):
+                if any(done.get(d) in ('failed', 'blocked') for d in depends):
+                    del pending[name]
+                    done[name] = 'blocked'
+                    records.append({'step': name, 'status': 'blocked', 'seconds': 0.0, 'error': None})
+                elif all(d in done for d in depends):
+                    del pending[name]
+                    running[executor.submit(execute, name)] = name
+            if not running:
+                continue
+            finished, _ = concurrent.futures.wait(running, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in finished:
+                record = future.result()
+                done[running.pop(future)] = record['status']
+                records.append(record)
+    return records
+
+
+def run(integrations=None, year=DEFAULT_YEAR, clean=False, testmode=False, workers=None, jobs=None, force=False):
+    """Run integrations (default: all of INTEGRATIONS), printing and returning the records of
+    run_steps."""
+    integrations = integrations or INTEGRATIONS
+    if clean:
+        integration_base.integration_clean()
+    integration_base.integration_start(testmode)
+
+    modules = {}
+    for name in integrations:
+        try:
+            modules[name] = load_integration(name)
+        except Exception:
+            print(f"Could not load the {name} integration:\n{traceback.format_exc()}")
+    if 'elc' in modules:
+        modules['elc'].setup(year)
+
+    steps = [step for step in STEPS if step.integration in integrations]
+    records = run_steps(steps, modules, result_cache.cache_directory('integration'), year=year,
+                        testmode=testmode, workers=workers, jobs=jobs, force=force)
+
+    for record in records:
+        if record['error']:
+            print(f"{record['step']} failed:\n{record['error']}")
+    print(f"{'step':<40}{'status':<10}{'seconds':>10}")
+    for record in records:
+        print(f"{record['step']:<40}{record['status']:<10}{record['seconds']:>10.2f}")
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Run integrations from end to end.')
+    parser.add_argument('integrations', nargs='*',
+                        help=f'Integrations to run.  Defaults to all of {", ".join(INTEGRATIONS)}.')
+    parser.add_argument('--clean', action='store_true',
+                        help='Remove the results of previous integration attempts first.')
+    parser.add_argument('--testmode', action='store_true',
+                        help='Use testmode snapshots of solution data where they exist.')
+    parser.add_argument('--force', action='store_true',
+                        help='Run every step, even if its inputs are unchanged since the last run.')
+    parser.add_argument('--year', type=int, default=DEFAULT_YEAR,
+                        help=f'The year of the electricity integration (default {DEFAULT_YEAR}).')
+    parser.add_argument('--workers', type=int, default=None,
+                        help='Number of processes to build scenarios in (default: the number of CPUs).')
+    parser.add_argument('--jobs', type=int, default=None,
+                        help='Number of steps to prepare concurrently (default: one per integration).')
+    args = parser.parse_args(argv)
+    unknown = [name for name in args.integrations if name not in INTEGRATIONS]
+    if unknown:
+        parser.error(f"unknown integration(s): {', '.join(unknown)}")
+    records = run(args.integrations, year=args.year, clean=args.clean, testmode=args.testmode,
+                  workers=args.workers, jobs=args.jobs, force=args.force)
+    return 0 if all(record['status'] in ('ran', 'skipped') for record in records) else 1
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+from integrations import aez_land_integration
+from integrations.aez_land_integration import LandAllocation
+from model import world_land
+from solution import factory
+
+
+def small_allocation():
+    # one region, one TMR, two allocation types and three solutions
+    available = np.array([[[10.0, 4.0]]])
+    demand = np.array([[[[6.0, 3.0, 5.0], [1.0, 2.0, 3.0]]]])
+    return LandAllocation(available, demand, ["OECD90"], ["Tropical-Humid"], ["Forest", "Grassland"], ["a", "b", "c"])
+
+
+def test_allocate():
+    land = small_allocation()
+    result = land.allocate({"Forest": ["c", "a"], "Grassland": ["b", "NOT A SOLUTION"]})
+    # Forest: c gets 5, a the remaining 5 of its 6, b nothing.  Grassland: b 2, then a 1, then c 1 of 3
+    np.testing.assert_allclose(result[0, 0], [[5.0, 0.0, 5.0], [1.0, 2.0, 1.0]])
+    assert (result <= land.demand).all()
+    np.testing.assert_allclose(result.sum(axis=3), np.minimum(land.demand.sum(axis=3), land.available))
+
+
+def test_order():
+    land = small_allocation()
+    np.testing.assert_array_equal(land.order({"Forest": ["c"]}), [[2, 0, 1], [0, 1, 2]])
+    assert land.order().shape == (2, 3)
+
+
+def test_allocate_each():
+    land = small_allocation()
+    orderings = [{"Forest": ["a"]}, {"Forest": ["b", "c"]}]
+    result = land.allocate_each(orderings)
+    assert result.shape == (2,) + land.demand.shape
+    np.testing.assert_allclose(result[1], land.allocate(orderings[1]))
+    np.testing.assert_allclose(result[1, 0, 0, 0], [2.0, 3.0, 5.0])
+
+
+def test_to_frame():
+    land = small_allocation()
+    df = land.to_frame(land.allocate())
+    assert list(df.columns) == ["a", "b", "c"]
+    assert df.loc[("OECD90", "Tropical-Humid", "Grassland"), "c"] == pytest.approx(1.0)
+
+
+def test_reduce_columns():
+    worldmap = world_land.World_TMR_AEZ_Map(series_name="2020")
+    reduced = worldmap.reduce_columns(world_land.AEZ_ALLOCATION_MAP)
+    assert list(reduced.columns) == list(world_land.AEZ_ALLOCATION_MAP)
+    expected = worldmap.map().loc[("Tropical-Humid", "OECD90"), world_land.AEZ_ALLOCATION_MAP["Degraded Forest"]].sum()
+    assert reduced.loc[("Tropical-Humid", "OECD90"), "Degraded Forest"] == pytest.approx(expected)
+
+
+def test_assemble_and_allocate():
+    scenarios = [factory.load_scenario(s, "PDS2", lazy=True) for s in ["afforestation", "silvopasture"]]
+    integration = aez_land_integration.AEZ_Land_Integration()
+    integration.assemble_current_status(scenarios)
+    assert integration.land.solutions == ["afforestation", "silvopasture"]
+    standard = integration.allocate()
+    reversed_priorities = {k: list(reversed(v)) for (k, v) in aez_land_integration.standard_land_solution_priorities.items()}
+    alternative = integration.allocate(reversed_priorities)
+    assert standard.shape == alternative.shape
+    # allocations never exceed demand, and the total allocated within each cell never exceeds the land there
+    demand = integration.land.to_frame(integration.land.demand)
+    assert (standard <= demand + 1e-9).all(axis=None)
+    available = integration.land.available.reshape(-1)
+    assert (standard.sum(axis=1).to_numpy() <= available + 1e-9).all()
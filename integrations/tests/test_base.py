@@ -43,6 +43,26 @@ def test_load_adoption_testmode_hit(with_testmode):
     assert a.loc[2033,"PDS1"] == pytest.approx(18.94589724)
 
 
+def test_solution_data():
+    data = integration_base.solution_data(["afforestation", "bioplastic"], workers=1)
+    assert set(data) == {(s, pds) for s in ["afforestation", "bioplastic"] for pds in ["PDS1","PDS2","PDS3"]}
+    assert data[("afforestation","PDS1")]["tam"] is None, "land solutions have no tam"
+    assert data[("bioplastic","PDS1")]["tam"] is integration_base.load_solution_tam("bioplastic")
+    again = integration_base.solution_data(["bioplastic"])
+    assert again[("bioplastic","PDS2")] is data[("bioplastic","PDS2")], "scenarios are built only once"
+    a = integration_base.load_solution_adoptions("bioplastic")
+    assert (a["PDS3"] == data[("bioplastic","PDS3")]["adoption"]).all()
+
+
+def test_solution_keys_integration(monkeypatch):
+    monkeypatch.delenv("DDINTEGRATE", raising=False)
+    plain = integration_base.solution_keys(["bioplastic"])
+    monkeypatch.setenv("DDINTEGRATE", integration_base.integration_suffix)
+    integrated = integration_base.solution_keys(["bioplastic"])
+    assert plain.keys() == integrated.keys()
+    assert all(plain[k][1] != integrated[k][1] for k in plain), "integration data gets its own keys"
+
+
 def test_load_solution_file_live():
      data = integration_base.load_solution_file("airplanes","vma_data/Average_Cruise_Speed_Single_Aisle.csv")
      assert "Geographic Location" in data   
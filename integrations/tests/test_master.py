@@ -0,0 +1,106 @@
+import types
+from dataclasses import dataclass
+import pandas as pd
+from integrations import integration_master
+from integrations.integration_master import Step
+
+
+@dataclass
+class fake_integration_state:
+    total : pd.Series = None
+
+
+def fake_integration(tmp_path, name, calls):
+    """A module with steps 'one' (reading input.csv) and 'two' (writing output.csv)."""
+    module = types.ModuleType(name)
+    module.__file__ = str(tmp_path/f"{name}.py")
+    (tmp_path/f"{name}.py").write_text("# code")
+    module.fs = fake_integration_state()
+    def one():
+        calls.append(f"{name}.one")
+        module.fs.total = pd.read_csv(tmp_path/name/"input.csv")["value"]
+    def two():
+        calls.append(f"{name}.two")
+        module.fs.total = module.fs.total * 2
+        module.fs.total.to_csv(tmp_path/f"{name}_output.csv")
+    module.one = one
+    module.two = two
+    (tmp_path/name).mkdir()
+    (tmp_path/name/"input.csv").write_text("value\n1\n2\n")
+    return module
+
+
+def fake_steps(tmp_path):
+    return [
+        Step('a.one', inputs=(str(tmp_path/'a'),)),
+        Step('a.two', after=('a.one',), outputs=(str(tmp_path/'a_output.csv'),)),
+        Step('b.one', inputs=(str(tmp_path/'b'), str(tmp_path/'a_output.csv'))),
+        Step('b.two', after=('b.one',), outputs=(str(tmp_path/'b_output.csv'),)),
+    ]
+
+
+def test_run_steps(tmp_path):
+    calls = []
+    modules = {'a': fake_integration(tmp_path, 'a', calls), 'b': fake_integration(tmp_path, 'b', calls)}
+    cache = tmp_path/'cache'
+    records = integration_master.run_steps(fake_steps(tmp_path), modules, cache)
+    assert [r['status'] for r in records] == ['ran'] * 4
+    # b.one reads the output of a.two, so runs after it
+    assert calls.index('b.one') > calls.index('a.two')
+    assert all(r['seconds'] >= 0 and r['error'] is None for r in records)
+
+    # nothing changed: everything is skipped, and the state is restored
+    calls.clear()
+    for m in modules.values():
+        m.fs = fake_integration_state()
+    records = integration_master.run_steps(fake_steps(tmp_path), modules, cache)
+    assert calls == []
+    assert {r['status'] for r in records} == {'skipped'}
+    assert list(modules['a'].fs.total) == [2, 4]
+
+    # a changed input reruns the steps that depend on it
+    (tmp_path/'b'/'input.csv').write_text("value\n5\n")
+    records = integration_master.run_steps(fake_steps(tmp_path), modules, cache)
+    assert {r['step']: r['status'] for r in records} == {
+        'a.one': 'skipped', 'a.two': 'skipped', 'b.one': 'ran', 'b.two': 'ran'}
+    assert list(modules['b'].fs.total) == [10]
+
+    # so does a missing output
+    (tmp_path/'a_output.csv').unlink()
+    records = integration_master.run_steps(fake_steps(tmp_path), modules, cache)
+    assert {r['step']: r['status'] for r in records}['a.two'] == 'ran'
+    assert (tmp_path/'a_output.csv').is_file()
+
+    records = integration_master.run_steps(fake_steps(tmp_path), modules, cache, force=True)
+    assert {r['status'] for r in records} == {'ran'}
+
+
+def test_run_steps_failure(tmp_path):
+    calls = []
+    modules = {'a': fake_integration(tmp_path, 'a', calls), 'b': fake_integration(tmp_path, 'b', calls)}
+    (tmp_path/'a'/'input.csv').write_text("nothing\n1\n")
+    records = {r['step']: r for r in integration_master.run_steps(fake_steps(tmp_path), modules, tmp_path/'cache')}
+    assert records['a.one']['status'] == 'failed' and 'KeyError' in records['a.one']['error']
+    assert [records[s]['status'] for s in ['a.two', 'b.one', 'b.two']] == ['blocked'] * 3
+    assert calls == ['a.one']
+
+
+def test_steps_declared():
+    names = {step.name for step in integration_master.STEPS}
+    for step in integration_master.STEPS:
+        assert set(step.after) <= names
+    assert integration_master.INTEGRATIONS == ['waste', 'building', 'elc']
+
+
+def test_run_steps_testmode(tmp_path, monkeypatch):
+    from integrations import integration_base, waste_integration
+    def live(*args, **kwargs):
+        raise AssertionError("testmode built a scenario")
+    monkeypatch.setattr(integration_base, 'testmode', True)
+    monkeypatch.setattr(integration_base, 'solution_data', live)
+    # as if another integration had been imported since
+    monkeypatch.setattr(integration_base, 'integration_name', 'elc')
+    steps = [step for step in integration_master.STEPS if step.name in ('waste.ws_step1', 'waste.ws_step2')]
+    records = integration_master.run_steps(steps, {'waste': waste_integration}, testmode=True)
+    assert [r['status'] for r in records] == ['ran', 'ran'], records
+    assert waste_integration.ws.organic_msw is not None
@@ -2,6 +2,7 @@ from dataclasses import dataclass
 from pathlib import Path
 import pandas as pd
 from model import integration
+from . import integration_base
 from .integration_base import *
 
 THISDIR = Path(__file__).parent
@@ -59,8 +60,12 @@ ws = waste_integration_state()
 # ########################################################################################################################
 #                                              CALCULATION
  
+waste_solutions = ["bioplastic", "composting", "hcrecycling", "recycledpaper", "wastetoenergy", "landfillmethane"]
+
 def integrate():
     """Perform all steps of the integration together."""
+    if not integration_base.testmode:
+        solution_data(waste_solutions)   # build the scenarios of all the solutions at once, in parallel
     ws_step1()
     ws_step2()
     ws_step3()
@@ -4,6 +4,7 @@ import os
 import pathlib
 import sys
 
+import model.climate
 import model.fairutil
 
 import fair
@@ -50,13 +51,13 @@ def init():
     total = model.fairutil.baseline_emissions()
     remaining = total.copy()
     sectors = sector_gtons.sort_values(axis='columns', by=2050, ascending=False).columns
-    emissions = []
+    trajectories = []
     for sector in sectors:
         remaining = remaining.subtract(sector_gtons[sector], fill_value=0.0)
-        _,_,T = fair.forward.fair_scm(emissions=remaining.values, useMultigas=False,
-                r0=model.fairutil.r0, tcrecs=model.fairutil.tcrecs)
-        df_T = pd.Series(T, index=remaining.index)
-        emissions.append((sector, df_T))
+        trajectories.append(remaining.values)
+    _,_,T = model.climate.run_batch(trajectories, useMultigas=False, workers=None,
+            **model.fairutil.fair_scm_kwargs())
+    emissions = [(sector, pd.Series(T[i], index=remaining.index)) for (i, sector) in enumerate(sectors)]
 
     fig = plt.figure()
     ax = fig.add_subplot()
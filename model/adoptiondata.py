@@ -56,6 +56,7 @@ from functools import lru_cache
 import pathlib
 import re
 
+from model import data_sources
 from model import interpolation
 from model import dd
 from model.metaclass_cache import MetaclassCache
@@ -174,7 +175,7 @@ class AdoptionData(DataHandler, object, metaclass=MetaclassCache):
                 else:
                     sources = value
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
+                    df = data_sources.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
                             skip_blank_lines=True, comment='#')
                     for region in dd.REGIONS:
                         df_per_region[region].loc[:, name] = df.loc[:, region]
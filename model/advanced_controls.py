@@ -15,9 +15,11 @@ AdvancedControls/Scenario combination.
 """
 
 from __future__ import annotations
+import collections.abc
 import dataclasses
 import enum
 import glob
+import hashlib
 import json
 import typing
 import re
@@ -1036,9 +1038,8 @@ class AdvancedControls:
         stat = stat.lower()
         self.vma_statistics[name] = longstat or stat
         if return_regional_series:
-            result = pd.Series(name='regional values',dtype=float)
-            for reg in REGIONS:
-                result[reg] = self.vmas[vma_title].avg_high_low(key=stat, region=reg)
+            result = pd.Series({reg: v.avg_high_low(key=stat, region=reg) for reg in REGIONS},
+                               name='regional values')
         else:
             result = self.vmas[vma_title].avg_high_low(key=stat)     
 
@@ -1049,24 +1050,34 @@ class AdvancedControls:
             result = raw_val_from_excel
         return result
 
-    def _hash_item(self, item):
-        if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
-            item = tuple(pd.util.hash_pandas_object(item))
-        try:
-            return hash(item)
-        except TypeError:
-            pass
-        try:
-            return hash(tuple(item))
-        except TypeError as e:
-            raise e
+    # Fields which describe a scenario but do not affect its results.
+    _fingerprint_exclude = frozenset(['vmas', 'vma_statistics', 'name', 'description',
+                                      'creation_date', 'jsfile'])
+
+    def fingerprint(self):
+        """A stable digest of the values of this object.
+
+        Two Advanced Controls with the same parameter values (after VMA substitution) have
+        the same fingerprint, in any process, regardless of their name, description, creation
+        date or source file.  It is used as the hash of the object and as its identity in
+        caches.
+        """
+        result = vars(self).get('_fingerprint')
+        if result is None:
+            values = {field.name: getattr(self, field.name) for field in dataclasses.fields(self)
+                      if field.name not in self._fingerprint_exclude}
+            text = json.dumps([type(self).__qualname__, _canonical(values)], sort_keys=True)
+            result = hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+            object.__setattr__(self, '_fingerprint', result)
+        return result
 
     def __hash__(self):
-        key = 0x811c9dc5
-        key = key ^ id(self)
-        for field in dataclasses.fields(self):
-            key = key ^ self._hash_item(field)
-        return key
+        return int(self.fingerprint()[:16], 16)
+
+    def __eq__(self, other):
+        if type(other) is not type(self):
+            return NotImplemented
+        return self.fingerprint() == other.fingerprint()
 
     def with_modifications(self, **mods):
         """Return a new Advanced Controls object that is the same as this one, but with the
@@ -1086,6 +1097,31 @@ class AdvancedControls:
 
 
 
+def _canonical(value):
+    """Convert value into a structure with a deterministic JSON representation."""
+    if isinstance(value, pd.DataFrame):
+        return {'__frame__': [_canonical(value.index.tolist()), _canonical(value.columns.tolist()),
+                              _canonical(value.values.tolist())]}
+    if isinstance(value, pd.Series):
+        return {'__series__': [_canonical(value.index.tolist()), _canonical(value.tolist())]}
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist())
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for (k, v) in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_canonical(v) for v in value]
+        return sorted(items, key=repr) if isinstance(value, (set, frozenset)) else items
+    if isinstance(value, enum.Enum):
+        return value.name
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, float) and np.isnan(value):
+        return 'NaN'
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    raise TypeError(f"Cannot fingerprint {type(value)}")
+
+
 def fill_missing_regions_from_world(data):
     """
     AdvancedControls attributes linked to VMAs can optionally be Series of regional values rather than
@@ -1108,8 +1144,11 @@ def fill_missing_regions_from_world(data):
         return data
 
 
-def load_scenarios_from_json(directory, vmas, cls=AdvancedControls):
-    """Load scenarios from JSON files in directory."""
+def load_scenarios_from_json(directory, vmas, cls=AdvancedControls, lazy=False):
+    """Load scenarios from JSON files in directory.  If lazy is True, return a ScenarioDirectory
+    which only creates each scenario when it is first used."""
+    if lazy:
+        return ScenarioDirectory(directory, vmas, cls)
     result = {}
     for filename in glob.glob(str(directory.joinpath('*.json'))):
         with open(filename, 'r') as fid:
@@ -1118,6 +1157,63 @@ def load_scenarios_from_json(directory, vmas, cls=AdvancedControls):
             result[a.name] = a
     return result
 
+def _scenario_files(directory):
+    """Return {scenario name: filename} for the JSON files in directory, in the order (and with the
+    precedence) of load_scenarios_from_json."""
+    files = {}
+    for filename in glob.glob(str(directory.joinpath('*.json'))):
+        with open(filename, 'r') as fid:
+            files[json.loads(fid.read())['name']] = filename
+    return files
+
+def scenario_names_from_json(directory):
+    """Return the names of the scenarios load_scenarios_from_json would load from directory, in
+    the same order, without creating them."""
+    return list(_scenario_files(directory))
+
+
+class ScenarioDirectory(collections.abc.Mapping):
+    """The scenarios of a directory of JSON files (see load_scenarios_from_json), each created
+    when it is first used.  Solutions define their scenarios this way, so that importing a solution
+    does not create (and compute the VMA values of) every scenario."""
+
+    def __init__(self, directory, vmas, cls=AdvancedControls):
+        self.directory = Path(directory)
+        self.vmas = vmas
+        self.cls = cls
+        self._files = None
+        self._scenarios = {}
+
+    def _filenames(self):
+        if self._files is None:
+            self._files = _scenario_files(self.directory)
+        return self._files
+
+    def __getitem__(self, name):
+        scenario = self._scenarios.get(name)
+        if scenario is None:
+            filename = self._filenames()[name]
+            with open(filename, 'r') as fid:
+                scenario = ac_from_dict(json.loads(fid.read()), self.vmas, filename, self.cls)
+            self._scenarios[name] = scenario
+        return scenario
+
+    def __iter__(self):
+        return iter(self._filenames())
+
+    def __len__(self):
+        return len(self._filenames())
+
+    def __contains__(self, name):
+        return name in self._filenames()
+
+    def __reduce__(self):
+        # pickled (e.g. for worker processes) as the dict load_scenarios_from_json would return
+        return (dict, (dict(self),))
+
+    def __repr__(self):
+        return f"ScenarioDirectory({self.directory})"
+
 def ac_from_dict(data: dict, vmas, filename="", cls=AdvancedControls) -> AdvancedControls:
     """Create an AdvancedControls object from a dictionary of values, as retrieved from a scenario json file."""
     d = data.copy()
@@ -24,12 +24,17 @@ changes over time, e.g. due to climate change modeling.
 This module contains the classes for solution-specific land allocations.
 See the module `world_land` for global land data.
 """
+import hashlib
+import json
+import os
 import pathlib
 import re
+from functools import lru_cache
 
 import numpy as np
 import pandas as pd
 from model import dd
+from model import result_cache
 from model.metaclass_cache import MetaclassCache
 
 from model.data_handler import DataHandler
@@ -38,6 +43,99 @@ from model.decorators import data_func
 LAND_CSV_PATH = pathlib.Path(__file__).parents[1].joinpath('data', 'land')
 
 
+class AllocationCube:
+    """The 'Total % allocated' of every solution in every (TMR, AEZ) of one allocation cohort.
+
+    The allocation{cohort} directories hold one CSV per TMR and AEZ, each with a row per
+    solution.  They are compiled into a single (solution x TMR x AEZ) array, which is
+    persisted as a memory-mappable .npy file (see result_cache.cache_directory) together with
+    its labels.  The compiled cube is keyed on the names, sizes and modification times of the
+    CSVs, which are checked each time it is loaded, so it is rebuilt automatically when they change.
+
+    TMRs and AEZs are identified by their file names (see AEZ._to_filename).
+    """
+
+    def __init__(self, solutions, regimes, zones, values):
+        self.solutions = {name: i for (i, name) in enumerate(solutions)}
+        self.regimes = {name: i for (i, name) in enumerate(regimes)}
+        self.zones = {name: i for (i, name) in enumerate(zones)}
+        self.values = values
+
+    def total_allocated(self, solution_name, regime_file, zone_file):
+        """Return the 'Total % allocated' to solution_name within one TMR and AEZ."""
+        if regime_file not in self.regimes or zone_file not in self.zones:
+            raise FileNotFoundError(f"No land allocation for {regime_file}/{zone_file}")
+        return self.values[self.solutions[solution_name], self.regimes[regime_file],
+                           self.zones[zone_file]]
+
+    @staticmethod
+    def sources(cohort):
+        return sorted(LAND_CSV_PATH.joinpath(f'allocation{cohort}').glob('*/*.csv'))
+
+    @classmethod
+    def build(cls, cohort):
+        """Compile the cube from the CSV files of the cohort."""
+        sources = cls.sources(cohort)
+        regimes = sorted({p.parent.name for p in sources})
+        zones = sorted({p.stem for p in sources})
+        solutions = None
+        values = None
+        for path in sources:
+            column = pd.read_csv(path, index_col=0)['Total % allocated']
+            if values is None:
+                solutions = list(column.index)
+                values = np.full((len(solutions), len(regimes), len(zones)), np.nan)
+            values[:, regimes.index(path.parent.name), zones.index(path.stem)] = (
+                column.reindex(solutions).to_numpy(dtype=np.float64))
+        return cls(solutions or [], regimes, zones, values if values is not None else np.empty((0, 0, 0)))
+
+    @classmethod
+    def load(cls, cohort):
+        """Return the cube of the cohort, compiling and persisting it first if needed."""
+        h = hashlib.blake2b(digest_size=8)
+        for path in cls.sources(cohort):
+            st = path.stat()
+            h.update(f"{path.parent.name}/{path.name}:{st.st_size}:{st.st_mtime_ns};".encode())
+        return cls._load(cohort, h.hexdigest(), result_cache.cache_directory('land'))
+
+    @classmethod
+    @lru_cache()
+    def _load(cls, cohort, key, directory):
+        """Return the cube of the cohort whose CSVs have digest key (see load), kept in directory."""
+        if directory is None:
+            return cls.build(cohort)
+        stem = directory / f"allocation{cohort}-{key}"
+        try:
+            labels = json.loads(stem.with_suffix('.json').read_text())
+            values = np.load(stem.with_suffix('.npy'), mmap_mode='r', allow_pickle=False)
+            return cls(labels['solutions'], labels['regimes'], labels['zones'], values)
+        except (OSError, ValueError, KeyError):
+            pass
+        cube = cls.build(cohort)
+        try:
+            directory.mkdir(parents=True, exist_ok=True)
+            tmp = directory / f".{stem.name}.{os.getpid()}.tmp"
+            np.save(f"{tmp}.npy", cube.values, allow_pickle=False)
+            pathlib.Path(f"{tmp}.json").write_text(json.dumps({'solutions': list(cube.solutions),
+                    'regimes': list(cube.regimes), 'zones': list(cube.zones)}))
+            os.replace(f"{tmp}.npy", stem.with_suffix('.npy'))
+            os.replace(f"{tmp}.json", stem.with_suffix('.json'))
+        except OSError:
+            pass  # persisting is an optimization only
+        return cube
+
+
+@lru_cache()
+def _solution_aez_matrix():
+    return pd.read_csv(LAND_CSV_PATH.joinpath('aez', 'solution_aez_matrix.csv'), index_col=0)
+
+
+@lru_cache()
+def _world_land(subdir, filename):
+    return pd.read_csv(LAND_CSV_PATH.joinpath('world', subdir, filename + '.csv'),
+            index_col=0).drop(columns='Total Area (km2)')
+
+
 class AEZ(DataHandler, object, metaclass=MetaclassCache):
     """The AEZ object holds various land-based information applicable to a solution, including the allocated TLA"""
 
@@ -108,18 +206,16 @@ class AEZ(DataHandler, object, metaclass=MetaclassCache):
         else:
             df = df.fillna(0)
 
+        cube = AllocationCube.load(self.cohort)
         for tmr in self.regimes:
-            tmr_path = LAND_CSV_PATH.joinpath(f'allocation{self.cohort}', self._to_filename(tmr))
             for col in df:
                 if col.startswith('AEZ29'):  # this zone is not included in land allocation
                     continue
-                aez_path = tmr_path.joinpath(self._to_filename(col) + '.csv')
-                la_df = pd.read_csv(aez_path, index_col=0)
-                total_perc_allocated = la_df.loc[self.solution_name]['Total % allocated']
+                total_perc_allocated = cube.total_allocated(self.solution_name,
+                        self._to_filename(tmr), self._to_filename(col))
                 if total_perc_allocated > 0:
                     df.at[tmr, col] = total_perc_allocated
-        else:
-            self.soln_land_alloc_df = df
+        self.soln_land_alloc_df = df
 
 
     def _get_applicable_zones(self):
@@ -127,8 +223,7 @@ class AEZ(DataHandler, object, metaclass=MetaclassCache):
            Note: DD land allocation already takes applicability into consideration, so
            applicable_zones will be redundant in solutions which use DD allocation.
         """
-        row = pd.read_csv(LAND_CSV_PATH.joinpath('aez', 'solution_aez_matrix.csv'),
-                index_col=0).loc[self.solution_name]
+        row = _solution_aez_matrix().loc[self.solution_name]
         self.applicable_zones = row[row].index.tolist()
 
 
@@ -137,8 +232,7 @@ class AEZ(DataHandler, object, metaclass=MetaclassCache):
         self.world_land_alloc_dict = {}
         subdir = '2020' if len(self.regimes) == 8 else '2018'
         for tmr in self.regimes:
-            df = pd.read_csv(LAND_CSV_PATH.joinpath('world', subdir,
-                    self._to_filename(tmr) + '.csv'), index_col=0).drop('Total Area (km2)', 1)
+            df = _world_land(subdir, self._to_filename(tmr))
             # apply fixed world fraction to each region
             self.world_land_alloc_dict[tmr] = df.mul(self.soln_land_alloc_df.loc[tmr],
                     axis=1) / 10000
@@ -0,0 +1,130 @@
+"""Bounded memoization for functions taking pandas/numpy arguments.
+
+Functions like operatingcost.annual_breakout or unitadoption.cumulative_degraded_land are
+called with identical Series/DataFrame arguments from many scenarios.  functools.lru_cache
+cannot hash those, so array_cache computes a fixed-size content digest of each argument
+(the raw buffers of the values and labels) and uses that as the cache key.  The original
+arguments are passed through to the function unchanged.
+
+Usage:
+
+    @array_cache(maxsize=64)
+    def expensive(series, rate):
+        ...
+
+    expensive.cache_info()   # -> CacheInfo(hits=..., misses=..., maxsize=64, currsize=...)
+    expensive.cache_clear()
+"""
+
+from collections import OrderedDict, namedtuple
+from functools import wraps
+import hashlib
+import threading
+
+import numpy as np
+import pandas as pd
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize'])
+
+_registry = {}
+
+
+def _update_with_array(h, values):
+    values = np.asarray(values)
+    h.update(f"{values.dtype.str}{values.shape}".encode())
+    if values.dtype.kind in 'biufcmM':
+        h.update(np.ascontiguousarray(values).view(np.uint8).data)
+    else:
+        h.update(pd.util.hash_array(values.ravel().astype(object)).data)
+
+
+def _update_with_labels(h, index):
+    h.update(repr(index.names).encode())
+    _update_with_array(h, index.to_flat_index().values)
+
+
+def digest(item):
+    """Return a hashable key describing the content of item.
+
+    pandas and numpy objects are reduced to a 16 byte blake2b digest of their values, index,
+    columns and name; other arguments must be hashable and are returned as-is.
+    """
+    if isinstance(item, (pd.DataFrame, pd.Series, np.ndarray)):
+        h = hashlib.blake2b(digest_size=16)
+        h.update(type(item).__name__.encode())
+        if isinstance(item, pd.DataFrame):
+            _update_with_labels(h, item.columns)
+            dtypes = item.dtypes.unique()
+            h.update(repr(list(dtypes)).encode())
+            if len(dtypes) <= 1:
+                _update_with_array(h, item.to_numpy())
+            else:
+                _update_with_array(h, pd.util.hash_pandas_object(item, index=False).values)
+        elif isinstance(item, pd.Series):
+            h.update(repr(item.name).encode())
+            _update_with_array(h, item.values)
+        else:
+            _update_with_array(h, item)
+        if not isinstance(item, np.ndarray):
+            _update_with_labels(h, item.index)
+        return h.digest()
+    hash(item)  # raise TypeError early for unhashable arguments
+    return item
+
+
+def array_cache(maxsize=128):
+    """Decorator memoizing a function on the content of its (pandas/numpy) arguments.
+
+    At most maxsize results are kept, least recently used results are evicted first.
+    Set maxsize=None for an unbounded cache.
+    """
+    def decorator(func):
+        cache = OrderedDict()
+        lock = threading.RLock()
+        stats = {'hits': 0, 'misses': 0}
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            key = tuple(digest(a) for a in args)
+            if kwargs:
+                key += tuple((k, digest(v)) for (k, v) in sorted(kwargs.items()))
+            with lock:
+                try:
+                    result = cache[key]
+                    cache.move_to_end(key)
+                    stats['hits'] += 1
+                    return result
+                except KeyError:
+                    stats['misses'] += 1
+            result = func(*args, **kwargs)
+            with lock:
+                cache[key] = result
+                if maxsize is not None and len(cache) > maxsize:
+                    cache.popitem(last=False)
+            return result
+
+        def cache_info():
+            with lock:
+                return CacheInfo(stats['hits'], stats['misses'], maxsize, len(cache))
+
+        def cache_clear():
+            with lock:
+                cache.clear()
+                stats['hits'] = stats['misses'] = 0
+
+        wrapper.cache_info = cache_info
+        wrapper.cache_clear = cache_clear
+        _registry[f"{func.__module__}.{func.__qualname__}"] = wrapper
+        return wrapper
+    return decorator
+
+
+def cache_stats():
+    """Return a dict of function name -> CacheInfo for every array_cache'd function."""
+    return {name: f.cache_info() for (name, f) in _registry.items()}
+
+
+def clear_all():
+    """Empty the caches of every array_cache'd function."""
+    for f in _registry.values():
+        f.cache_clear()
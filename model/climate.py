@@ -0,0 +1,170 @@
+"""Batched FaIR climate runs.
+
+The FaIR simple climate model (https://github.com/OMS-NetZero/FAIR) is run once per emissions
+trajectory.  Whole-portfolio studies run it for many trajectories that only differ from one of
+the four RCP baselines by the Drawdown reductions in 2014-2060, so this module:
+  * computes the multigas results of the four RCP baselines once and persists them to disk
+    (keyed on the FaIR version), so they are not recomputed per scenario or per process,
+  * builds RCP emissions with Drawdown reductions subtracted, without modifying the RCP data
+    shipped with FaIR, and
+  * runs a stack of trajectories in a single call, in parallel across processes if requested.
+
+Results are returned as ClimateResult(C, F, T) arrays as returned by fair.forward.fair_scm,
+stacked along a new first axis for batches:
+  C: concentrations (CO2 ppm, CH4 ppb, N2O ppb, ... in multigas mode; CO2 ppm otherwise)
+  F: radiative forcing in watts per square meter
+  T: change in temperature since pre-industrial time
+"""
+
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import os
+
+import fair
+from fair.RCPs import rcp26, rcp45, rcp60, rcp85
+import numpy as np
+import pandas as pd
+
+from model import result_cache
+
+ClimateResult = namedtuple('ClimateResult', ['C', 'F', 'T'])
+
+RCPS = {'rcp3': rcp26, 'rcp45': rcp45, 'rcp6': rcp60, 'rcp85': rcp85}
+"""The RCP scenarios supported as baselines, by the names used in CO2Calcs (rcp3 is RCP2.6)."""
+
+EMISSIONS_COLUMNS = ['Year', 'FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
+        'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
+        'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
+        'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
+        'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
+        'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
+        'CFC_12 (kt)', 'CFC_113 (kt)', 'CFC_114 (kt)', 'CFC_115 (kt)',
+        'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
+        'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)',
+        'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)']
+
+# Rows of the RCP emissions tables (which start in 1765) replaced by Drawdown reductions: 2014-2060
+DRAWDOWN_ROWS = slice(249, 296)
+
+
+###########----############----############----############----############
+# Emissions
+
+def rcp_emissions(rcp):
+    """Return a (Year x gas) DataFrame of the emissions of the named RCP for 1765-2500.
+    The DataFrame is a copy; changing it does not affect the RCP data of FaIR."""
+    emissions = pd.DataFrame(RCPS[rcp].Emissions.emissions.copy(), index=range(1765, 2501),
+                             columns=EMISSIONS_COLUMNS)
+    emissions.index.name = "Year"
+    return emissions
+
+
+def drawdown_emissions(rcp, annual_reductions):
+    """Return the emissions of the named RCP with Drawdown reductions subtracted.
+
+    annual_reductions: DataFrame indexed by year (2014-2060) with columns for the reductions of
+      CO2 (Gt-C), CH4 (Mt-CH4) and N2O (Mt-N2O), as CO2Calcs.ghg_emissions_reductions_global_annual.
+    """
+    emissions = rcp_emissions(rcp)
+    chopped = emissions.iloc[DRAWDOWN_ROWS, :]
+    for (column, reduction) in [(1, 0), (3, 1), (4, 2)]:
+        emissions.iloc[DRAWDOWN_ROWS, column] = chopped.iloc[:, column] - annual_reductions.iloc[:, reduction]
+    return emissions
+
+
+###########----############----############----############----############
+# Running FaIR
+
+def run(emissions, useMultigas=True, **kwargs):
+    """Run FaIR on one emissions trajectory, returning a ClimateResult."""
+    return ClimateResult(*fair.forward.fair_scm(emissions=np.asarray(emissions),
+                                                useMultigas=useMultigas, **kwargs))
+
+
+def _run_args(args):
+    (emissions, useMultigas, kwargs) = args
+    return run(emissions, useMultigas, **kwargs)
+
+
+def run_batch(emissions, useMultigas=True, workers=1, **kwargs):
+    """Run FaIR on each of a stack of emissions trajectories.
+
+    emissions: a sequence of trajectories, or an array with the trajectories along its first axis.
+    workers: number of processes to use, None for one per CPU.  With workers=1 (the default) the
+      trajectories are run one after the other in this process.
+    Returns a ClimateResult whose arrays have the trajectories along their first axis.
+    """
+    jobs = [(np.asarray(e), useMultigas, kwargs) for e in emissions]
+    if workers is None:
+        workers = os.cpu_count() or 1
+    if workers == 1 or len(jobs) <= 1:
+        results = [_run_args(job) for job in jobs]
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(jobs))) as pool:
+            results = list(pool.map(_run_args, jobs))
+    if not results:
+        raise ValueError("run_batch requires at least one emissions trajectory")
+    return ClimateResult(*(np.stack(arrays) for arrays in zip(*results)))
+
+
+def drawdown_batch(rcp, reductions, workers=1):
+    """Run FaIR in multigas mode for the named RCP with each of a list of Drawdown reductions
+    (see drawdown_emissions) subtracted."""
+    return run_batch([drawdown_emissions(rcp, r).to_numpy() for r in reductions], workers=workers)
+
+
+###########----############----############----############----############
+# Persisted baselines
+
+@lru_cache()
+def rcp_baseline(rcp):
+    """Return the multigas ClimateResult of the named RCP without any Drawdown reductions.
+
+    Computed once per FaIR version and persisted (see result_cache.cache_directory), subsequently
+    loaded from disk.  The arrays are read-only as they are shared by all callers.
+    """
+    directory = result_cache.cache_directory('fair')
+    path = directory / f"{rcp}-fair{fair.__version__}.npz" if directory else None
+    result = None
+    if path is not None and path.is_file():
+        try:
+            with np.load(path, allow_pickle=False) as npz:
+                result = ClimateResult(npz['C'], npz['F'], npz['T'])
+        except (OSError, ValueError, KeyError):
+            result = None
+    if result is None:
+        result = run(rcp_emissions(rcp).to_numpy())
+        if path is not None:
+            try:
+                path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp.npz")
+                np.savez(tmp, **result._asdict())
+                os.replace(tmp, path)
+            except OSError:
+                pass  # persisting is an optimization only
+    for array in result:
+        array.flags.writeable = False
+    return result
+
+
+###########----############----############----############----############
+# Tables
+
+def multigas_tables(result, name, rcp):
+    """Return the (concentration, forcing, temperature) DataFrames of a multigas ClimateResult,
+    named like 'FaIR_CFT_{name}_conc_{rcp}'."""
+    (C, F, T) = result
+    years = RCPS[rcp].Emissions.year
+    conc = pd.DataFrame({'CO2(ppm)': C[:, 0], 'CH4(ppb)': C[:, 1], 'N2O(ppb)': C[:, 2]}, index=years)
+    conc.index.name = "Year"
+    conc.name = f'FaIR_CFT_{name}_conc_{rcp}'
+    forc = pd.DataFrame({'CO2(Wm-2)': F[:, 0], 'CH4(Wm-2)': F[:, 1], 'N2O(Wm-2)': F[:, 2],
+                         'others(Wm-2)': np.sum(F, axis=1) - F[:, 0] - F[:, 1] - F[:, 2],
+                         'total(Wm-2)': np.sum(F, axis=1)}, index=years)
+    forc.index.name = "Year"
+    forc.name = f'FaIR_CFT_{name}_forc_{rcp}'
+    temp = pd.DataFrame({'TempAnomaly(C)': T}, index=years)
+    temp.index.name = "Year"
+    temp.name = f'FaIR_CFT_{name}_temp_{rcp}'
+    return conc, forc, temp
@@ -5,18 +5,17 @@ from functools import lru_cache, wraps
 import hashlib
 import math
 #from numba import jit
-import json
-from io import StringIO
 
 import fair
-from fair.RCPs import rcp26, rcp45, rcp60, rcp85
 import numpy as np
 import pandas as pd
 import model.advanced_controls
 import model.dd
 import model.fairutil
 
-from model.data_handler import DataHandler
+from model import climate
+from model.array_cache import array_cache
+from model.data_handler import DataHandler, Deferred
 from model.decorators import data_func
 from model.units import map_to_unit, Mt
 
@@ -25,76 +24,76 @@ C_TO_CO2EQ = 3.666
 # Note: a different value of 3.64 is sometimes used for certain results in Excel
 # Here we will always use this value for consistency
 
-class NumpyEncoder(json.JSONEncoder):
-    def default(self, obj):
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return json.JSONEncoder.default(self, obj)
-
-
 ###########----############----############----############----############
 # CO2-EQ CALCULATIONS AND PRIOR USE OF FAIR
 
-@lru_cache
-def fair_scm_cached(json_input: str):
-    input = json.loads(json_input)
-    values = np.array(input['values'])
-    kwargs = {}
-    for k in input['kwargs']:
-        if isinstance(input['kwargs'][k], list):
-            kwargs[k] = np.array(input['kwargs'][k])
-        else:
-            kwargs[k] = input['kwargs'][k]
-    return fair.forward.fair_scm(emissions=values, useMultigas=input['useMultigas'], **kwargs)
-
+@array_cache()
 def fair_scm(values, useMultigas, **kwargs):
-    key = json.dumps({
-        'values': values,
-        'useMultigas': useMultigas,
-        'kwargs': kwargs
-    }, cls=NumpyEncoder)
-    return fair_scm_cached(key)
-
-@lru_cache
-def co2_ppm_calculator_cached(
-    co2_vals,
-    solution_category,
-    report_start_year,
-    ):
-
-    co2_vals = pd.read_csv(StringIO(co2_vals), index_col=0, squeeze=True, float_precision='round_trip')
-
-    columns = ['PPM', 'Total'] + list(range(2015, 2061))
-    ppm_calculator = pd.DataFrame(0, columns=columns, index=co2_vals.index.copy(),
-                                      dtype=np.float64)
-    ppm_calculator.index = ppm_calculator.index.astype(int)
-    ppm_calculator.index.name = 'Year'
-    first_year = ppm_calculator.first_valid_index()
-    last_year = ppm_calculator.last_valid_index()
-    for year in ppm_calculator.index:
-        if (year < report_start_year and
-                solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND):
-            # On RRS xls models this skips the calc but on LAND the calc is done anyway
-            # Note that this affects the values for all years and should probably NOT be
-            # skipped (i.e. LAND is the correct implementation)
-            # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-            continue
-        b = co2_vals[year]
-        for delta in range(1, last_year - first_year + 2):
-            if (year + delta - 1) > last_year:
-                break
-            val = 0.217
-            val += 0.259 * math.exp(-delta / 172.9)
-            val += 0.338 * math.exp(-delta / 18.51)
-            val += 0.186 * math.exp(-delta / 1.186)
-            ppm_calculator.loc[year + delta - 1, year] = b * val
-    ppm_calculator.loc[:, 'Total'] = ppm_calculator.sum(axis=1)
-    for year in ppm_calculator.index:
-        ppm_calculator.at[year, 'PPM'] = ppm_calculator.at[year, 'Total'] / (44.01 * 1.8 * 100)
+    """fair.forward.fair_scm, memoized on the content of the emissions and parameters."""
+    return fair.forward.fair_scm(emissions=values, useMultigas=useMultigas, **kwargs)
+
+@lru_cache()
+def co2_decay_kernel(length):
+    """Fraction of a CO2 pulse remaining in the atmosphere 1..length years after emission.
+
+    Simplified atmospheric lifetime function for CO2 from Myhrvald and Caldeira (2012), based
+    on the Bern Carbon Cycle model.  Computed once per length with math.exp in the same order
+    of operations as the Excel-derived calculation, so the values are bit-identical to it.
+    """
+    kernel = np.empty(length, dtype=np.float64)
+    for delta in range(1, length + 1):
+        val = 0.217
+        val += 0.259 * math.exp(-delta / 172.9)
+        val += 0.338 * math.exp(-delta / 18.51)
+        val += 0.186 * math.exp(-delta / 1.186)
+        kernel[delta - 1] = val
+    kernel.flags.writeable = False
+    return kernel
+
+
+def co2_ppm_calculator_array(co2_vals, solution_category, report_start_year):
+    """Build the CO2 PPM calculator table for a Series of annual CO2 reductions (MMT).
+
+    Each year's reduction is a discrete avoided pulse decaying according to co2_decay_kernel.
+    The (year x pulse year) table is the lower-triangular Toeplitz matrix of the kernel scaled
+    by the pulse sizes, built with a single broadcast multiply.
+    """
+    index_years = co2_vals.index.values.astype(int)
+    if solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND:
+        # On RRS xls models the years before report_start_year are skipped but on LAND the
+        # calc is done anyway. Note that this affects the values for all years and should
+        # probably NOT be skipped (i.e. LAND is the correct implementation)
+        # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
+        pulse_years = index_years[index_years >= report_start_year]
+    else:
+        pulse_years = index_years
+
+    col_years = list(range(2015, 2061))
+    # Pulses outside 2015-2060 get a column of their own, appended after the standard ones.
+    col_years += [y for y in pulse_years if y not in col_years]
+    col_years = np.array(col_years)
+    active = np.isin(col_years, pulse_years)
+
+    pulses = co2_vals.reindex(col_years).to_numpy(dtype=np.float64)
+    deltas = index_years.reshape(-1, 1) - col_years.reshape(1, -1) + 1
+    kernel = co2_decay_kernel(max(int(deltas.max()), 1))
+    decay = kernel[np.clip(deltas, 1, None) - 1]
+    vals = np.where((deltas >= 1) & active.reshape(1, -1), pulses.reshape(1, -1) * decay, 0.0)
+
+    total = np.nansum(vals, axis=1).reshape(-1, 1)
+    ppm = total / (44.01 * 1.8 * 100)
+    ppm_calculator = pd.DataFrame(np.concatenate([ppm, total, vals], axis=1),
+                                  columns=['PPM', 'Total'] + list(col_years),
+                                  index=pd.Index(index_years, name='Year'), dtype=np.float64)
     ppm_calculator.name = 'co2_ppm_calculator'
     return ppm_calculator
 
 
+@array_cache()
+def co2_ppm_calculator_cached(co2_vals, solution_category, report_start_year):
+    return co2_ppm_calculator_array(co2_vals, solution_category, report_start_year)
+
+
 
 ###########----############----############----############----############
 # CO2 MODULE IMPORTS
@@ -153,7 +152,8 @@ class CO2Calcs(DataHandler):
         else:
             self.regimes = None
 
-        self.baseline = model.fairutil.baseline_emissions()
+        # only needed by the FaIR calculations
+        self.baseline = Deferred(model.fairutil.baseline_emissions)
 
 
 
@@ -411,7 +411,7 @@ class CO2Calcs(DataHandler):
             co2_vals = self.co2_sequestered_global()['All'] + self.co2eq_mmt_reduced()['World']
             assert self.ac.emissions_use_co2eq, 'Land/ocean models must use CO2 eq'
 
-        return co2_ppm_calculator_cached(co2_vals.to_csv(), self.ac.solution_category, self.ac.report_start_year)
+        return co2_ppm_calculator_cached(co2_vals, self.ac.solution_category, self.ac.report_start_year)
 
     @lru_cache()
     @data_func
@@ -695,32 +695,9 @@ class CO2Calcs(DataHandler):
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
         """
-        emissions = rcp26.Emissions.emissions
-        rcpemissions = pd.DataFrame(emissions, index = range(1765,2501),
-                                       columns=['Year', 'FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissions.index.name="Year"
+        rcpemissions = climate.rcp_emissions('rcp3')
         rcpemissions.name = 'FaIR_CFT_baseline_emis_rcp3'
-        
-        (C,F,T) = fair.forward.fair_scm(emissions=emissions)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp26.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_baseline_conc_rcp3'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp26.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_baseline_forc_rcp3'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp26.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_baseline_temp_rcp3' 
-        return result1, result2, result3, rcpemissions
+        return climate.multigas_tables(climate.rcp_baseline('rcp3'), 'baseline', 'rcp3') + (rcpemissions,)
 
     @lru_cache()
     @data_func
@@ -737,33 +714,10 @@ class CO2Calcs(DataHandler):
                  CO2(Wm-2), CH4(Wm-2), N2O(Wm-2), others(Wm-2), total(Wm-2)
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
-        """        
-        emissions = rcp45.Emissions.emissions
-        rcpemissions = pd.DataFrame(emissions, index = range(1765,2501),
-                                       columns=['Year', 'FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissions.index.name="Year"
+        """
+        rcpemissions = climate.rcp_emissions('rcp45')
         rcpemissions.name = 'FaIR_CFT_baseline_emis_rcp45'
-        
-        (C,F,T) = fair.forward.fair_scm(emissions=emissions)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp45.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_baseline_conc_rcp45'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp45.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_baseline_forc_rcp45'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp45.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_baseline_temp_rcp45' 
-        return result1, result2, result3, rcpemissions
+        return climate.multigas_tables(climate.rcp_baseline('rcp45'), 'baseline', 'rcp45') + (rcpemissions,)
 
     @lru_cache()
     @data_func
@@ -780,33 +734,10 @@ class CO2Calcs(DataHandler):
                  CO2(Wm-2), CH4(Wm-2), N2O(Wm-2), others(Wm-2), total(Wm-2)
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
-        """   
-        emissions = rcp60.Emissions.emissions
-        rcpemissions = pd.DataFrame(emissions, index = range(1765,2501),
-                                       columns=['Year', 'FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissions.index.name="Year"
+        """
+        rcpemissions = climate.rcp_emissions('rcp6')
         rcpemissions.name = 'FaIR_CFT_baseline_emis_rcp6'
-        
-        (C,F,T) = fair.forward.fair_scm(emissions=emissions)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp60.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_baseline_conc_rcp6'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp60.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_baseline_forc_rcp6'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp60.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_baseline_temp_rcp6' 
-        return result1, result2, result3, rcpemissions
+        return climate.multigas_tables(climate.rcp_baseline('rcp6'), 'baseline', 'rcp6') + (rcpemissions,)
     
     @data_func
     def FaIR_CFT_baseline_RCP85(self):
@@ -822,33 +753,10 @@ class CO2Calcs(DataHandler):
                  CO2(Wm-2), CH4(Wm-2), N2O(Wm-2), others(Wm-2), total(Wm-2)
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
-        """   
-        emissions = rcp85.Emissions.emissions
-        rcpemissions = pd.DataFrame(emissions, index = range(1765,2501),
-                                       columns=['Year', 'FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissions.index.name="Year"
+        """
+        rcpemissions = climate.rcp_emissions('rcp85')
         rcpemissions.name = 'FaIR_CFT_baseline_emis_rcp85'
-        
-        (C,F,T) = fair.forward.fair_scm(emissions=emissions)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp85.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_baseline_conc_rcp85'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp85.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_baseline_forc_rcp85'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp85.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_baseline_temp_rcp85' 
-        return result1, result2, result3, rcpemissions
+        return climate.multigas_tables(climate.rcp_baseline('rcp85'), 'baseline', 'rcp85') + (rcpemissions,)
 
     @lru_cache()
     @lru_cache()
@@ -913,48 +821,13 @@ class CO2Calcs(DataHandler):
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
 
-        """   
+        """
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
-        # Call on the RCP scenario
-        rcpemissions = rcp26.Emissions.emissions
-        rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
-                                       columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissionsnew.index.name="Year"
-        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp3' 
-        rcpemissionschopped = rcpemissionsnew.iloc[249:296,:]
-        
-        # Replace the CO2 emissions
-        a0 = rcpemissionschopped.iloc[:,1]- annual_reductions.iloc[:,0]
-        rcpemissionsnew.iloc[249:296,1] = a0
-        # Replace the CH4 emissions
-        a1 = rcpemissionschopped.iloc[:,3]- annual_reductions.iloc[:,1]
-        rcpemissionsnew.iloc[249:296,3] = a1
-        # Replace the N2O emissions
-        a2 = rcpemissionschopped.iloc[:,4]- annual_reductions.iloc[:,2]
-        rcpemissionsnew.iloc[249:296,4] = a2
-        
-        emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp26.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_Drawdown_conc_rcp3'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp26.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_Drawdown_forc_rcp3'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp26.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_Drawdown_temp_rcp3' 
-        return result1, result2, result3, rcpemissionsnew
+        rcpemissionsnew = climate.drawdown_emissions('rcp3', annual_reductions)
+        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp3'
+        result = climate.run(rcpemissionsnew.to_numpy())
+        return climate.multigas_tables(result, 'Drawdown', 'rcp3') + (rcpemissionsnew,)
 
     @lru_cache()
     @data_func
@@ -972,48 +845,13 @@ class CO2Calcs(DataHandler):
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
 
-        """   
+        """
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
-        # Call on the RCP scenario
-        rcpemissions = rcp45.Emissions.emissions
-        rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
-                                       columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissionsnew.index.name="Year"
-        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp45' 
-        rcpemissionschopped = rcpemissionsnew.iloc[249:296,:]
-        
-        # Replace the CO2 emissions
-        a0 = rcpemissionschopped.iloc[:,1]- annual_reductions.iloc[:,0]
-        rcpemissionsnew.iloc[249:296,1] = a0
-        # Replace the CH4 emissions
-        a1 = rcpemissionschopped.iloc[:,3]- annual_reductions.iloc[:,1]
-        rcpemissionsnew.iloc[249:296,3] = a1
-        # Replace the N2O emissions
-        a2 = rcpemissionschopped.iloc[:,4]- annual_reductions.iloc[:,2]
-        rcpemissionsnew.iloc[249:296,4] = a2
-        
-        emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp45.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_Drawdown_conc_rcp45'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp45.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_Drawdown_forc_rcp45'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp45.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_Drawdown_temp_rcp45' 
-        return result1, result2, result3, rcpemissionsnew
+        rcpemissionsnew = climate.drawdown_emissions('rcp45', annual_reductions)
+        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp45'
+        result = climate.run(rcpemissionsnew.to_numpy())
+        return climate.multigas_tables(result, 'Drawdown', 'rcp45') + (rcpemissionsnew,)
     
     @lru_cache()
     @data_func
@@ -1031,48 +869,13 @@ class CO2Calcs(DataHandler):
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
 
-        """   
+        """
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
-        # Call on the RCP scenario
-        rcpemissions = rcp60.Emissions.emissions
-        rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
-                                       columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissionsnew.index.name="Year"
-        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp6' 
-        rcpemissionschopped = rcpemissionsnew.iloc[249:296,:]
-        
-        # Replace the CO2 emissions
-        a0 = rcpemissionschopped.iloc[:,1]- annual_reductions.iloc[:,0]
-        rcpemissionsnew.iloc[249:296,1] = a0
-        # Replace the CH4 emissions
-        a1 = rcpemissionschopped.iloc[:,3]- annual_reductions.iloc[:,1]
-        rcpemissionsnew.iloc[249:296,3] = a1
-        # Replace the N2O emissions
-        a2 = rcpemissionschopped.iloc[:,4]- annual_reductions.iloc[:,2]
-        rcpemissionsnew.iloc[249:296,4] = a2
-        
-        emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp60.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_Drawdown_conc_rcp6'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp60.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_Drawdown_forc_rcp6'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp60.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_Drawdown_temp_rcp6' 
-        return result1, result2, result3, rcpemissionsnew 
+        rcpemissionsnew = climate.drawdown_emissions('rcp6', annual_reductions)
+        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp6'
+        result = climate.run(rcpemissionsnew.to_numpy())
+        return climate.multigas_tables(result, 'Drawdown', 'rcp6') + (rcpemissionsnew,)
     
     @lru_cache()
     @data_func
@@ -1090,48 +893,13 @@ class CO2Calcs(DataHandler):
              3: Change in temperature since pre-industrial time in Celsius
              4: RCP emissions (39 individual gases)
 
-        """   
+        """
         # Call on the solution emission reductions
         annual_reductions = self.ghg_emissions_reductions_global_annual()
-        # Call on the RCP scenario
-        rcpemissions = rcp85.Emissions.emissions
-        rcpemissionsnew = pd.DataFrame(rcpemissions, index = range(1765,2501),
-                                       columns=['Year','FossilCO2 (Gt-C)', 'OtherCO2 (Gt-C)', 'CH4 (Mt-CH4)',
-                                                'N2O (Mt-N2O)', 'SOx (Mt-S)', 'CO (Mt-CO)', 'NMVOC (Mt)',
-                                                'NOx (Mt-N)', 'BC (Mt)', 'OC (Mt)', 'NH3 (Mt-N)', 'CF4 (kt)',
-                                                'C2F6 (kt)', 'C6F14 (kt)', 'HFC23 (kt)', 'HFC32 (kt)',
-                                                'HFC43_10 (kt)', 'HFC125 (kt)', 'HFC134a (kt)', 'HFC143a (kt)',
-                                                'HFC227ea (kt)', 'HFC245fa (kt)', 'SF6 (kt)', 'CFC_11 (kt)',
-                                                'CFC_12 (kt)', 'CFC_113 (kt)','CFC_114 (kt)','CFC_115 (kt)',
-                                                'CARB_TET (kt)', 'MCF (kt)', 'HCFC_22 (kt)', 'HCFC_141B (kt)',
-                                                'HCFC_142B (kt)', 'HALON1211 (kt)', 'HALON1202 (kt)', 
-                                                'HALON1301 (kt)', 'HALON2404 (kt)', 'CH3BR (kt)', 'CH3CL (kt)'])
-        rcpemissionsnew.index.name="Year"
-        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp85' 
-        rcpemissionschopped = rcpemissionsnew.iloc[249:296,:]
-        
-        # Replace the CO2 emissions
-        a0 = rcpemissionschopped.iloc[:,1]- annual_reductions.iloc[:,0]
-        rcpemissionsnew.iloc[249:296,1] = a0
-        # Replace the CH4 emissions
-        a1 = rcpemissionschopped.iloc[:,3]- annual_reductions.iloc[:,1]
-        rcpemissionsnew.iloc[249:296,3] = a1
-        # Replace the N2O emissions
-        a2 = rcpemissionschopped.iloc[:,4]- annual_reductions.iloc[:,2]
-        rcpemissionsnew.iloc[249:296,4] = a2
-        
-        emissionsnew = rcpemissionsnew.to_numpy()
-        (C,F,T) = fair.forward.fair_scm(emissions=emissionsnew)
-        result1 = pd.DataFrame({'CO2(ppm)': C[:,0,], 'CH4(ppb)': C[:,1,], 'N2O(ppb)': C[:,2,]}, index=rcp85.Emissions.year)
-        result1.index.name="Year"
-        result1.name = 'FaIR_CFT_Drawdown_conc_rcp85'
-        result2 = pd.DataFrame({'CO2(Wm-2)': F[:,0,], 'CH4(Wm-2)': F[:,1,], 'N2O(Wm-2)': F[:,2,], 'others(Wm-2)': np.sum(F, axis=1)-F[:,0,]-F[:,1,]-F[:,2,], 'total(Wm-2)': np.sum(F, axis=1)}, index=rcp85.Emissions.year)
-        result2.index.name="Year"
-        result2.name = 'FaIR_CFT_Drawdown_forc_rcp85'
-        result3 = pd.DataFrame({'TempAnomaly(C)': T}, index=rcp85.Emissions.year)
-        result3.index.name="Year"
-        result3.name = 'FaIR_CFT_Drawdown_temp_rcp85' 
-        return result1, result2, result3, rcpemissionsnew
+        rcpemissionsnew = climate.drawdown_emissions('rcp85', annual_reductions)
+        rcpemissionsnew.name = 'FaIR_CFT_Drawdown_emis_rcp85'
+        result = climate.run(rcpemissionsnew.to_numpy())
+        return climate.multigas_tables(result, 'Drawdown', 'rcp85') + (rcpemissionsnew,)
 
 
 ###########----############----############----############----############
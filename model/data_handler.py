@@ -2,10 +2,54 @@
 import pandas as pd
 import numpy as np
 import copy
+import inspect
+from functools import lru_cache
 from typing import List
 
+class Deferred:
+    """A value which is computed when it is first needed.
+
+    Wraps a function of no arguments.  When a Deferred is assigned to an attribute of a
+    DataHandler, the function is only called (once) when that attribute is first read.
+    """
+
+    __slots__ = ('func',)
+
+    def __init__(self, func):
+        self.func = func
+
+    def resolve(self):
+        return self.func()
+
+
 class DataHandler:
 
+    def __setattr__(self, name, value):
+        pending = self.__dict__.get('_deferred')
+        if isinstance(value, Deferred):
+            if hasattr(type(self), name):
+                # a class attribute would hide the pending value, so resolve it right away
+                value = value.resolve()
+            else:
+                if pending is None:
+                    pending = self.__dict__['_deferred'] = {}
+                pending[name] = value
+                self.__dict__.pop(name, None)
+                return
+        elif pending:
+            pending.pop(name, None)
+        object.__setattr__(self, name, value)
+
+    def __getattr__(self, name):
+        # Only called when normal lookup fails, i.e. for unresolved Deferred attributes.
+        pending = self.__dict__.get('_deferred')
+        if pending and name in pending:
+            value = pending[name].resolve()
+            del pending[name]
+            object.__setattr__(self, name, value)
+            return value
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {name!r}")
+
     def clean_nan(dataframe):
         """ It replaces NaN values by 0 """
         if(dataframe is None):
@@ -15,25 +59,57 @@ class DataHandler:
         dataframe = dataframe.fillna(0)
         return dataframe
 
+    @classmethod
+    @lru_cache()
+    def table_names(cls):
+        """The names of the @data_func methods of this class which can be called without
+        arguments, i.e. the tables exported by to_json."""
+        names = []
+        for name in dir(cls):
+            attr = inspect.getattr_static(cls, name)
+            if isinstance(attr, staticmethod):
+                (func, bound) = (attr.__func__, False)
+            elif isinstance(attr, classmethod):
+                (func, bound) = (attr.__func__, True)
+            elif callable(attr):
+                (func, bound) = (attr, True)
+            else:
+                continue
+            if getattr(func, 'data_func', False):
+                params = list(inspect.signature(func).parameters.values())[int(bound):]
+                if all(p.default is not p.empty or p.kind in (p.VAR_POSITIONAL, p.VAR_KEYWORD)
+                       for p in params):
+                    names.append(name)
+        return tuple(names)
+
+    @staticmethod
+    def export_table(data, regions: List[str]=None):
+        """Return a table as exported by to_json, without the cleaning: if regions is given
+        and data has a 'World' column (or index entry for a Series), only the regions listed
+        are kept, and np.int64 labels are moved to the end as strings.  data is not modified."""
+        if not isinstance(data, (pd.DataFrame, pd.Series)):
+            return data
+        keys = list(data.keys())
+        if regions is not None and 'World' in data.keys():
+            keys = [l for l in keys if l in regions]
+        labels = [l for l in keys if not isinstance(l, np.int64)]
+        moved = [l for l in keys if isinstance(l, np.int64)]
+        if len(labels) + len(moved) == len(data.keys()) and not moved:
+            return data
+        if isinstance(data, pd.DataFrame):
+            result = data.loc[:, labels + moved]
+            result.columns = pd.Index(labels + [str(l) for l in moved], name=data.columns.name)
+        else:
+            result = data.loc[labels + moved]
+            result.index = pd.Index(labels + [str(l) for l in moved], name=data.index.name)
+        return result
+
     def to_json(self, regions: List[str]=None, clean_nan=clean_nan):
         outputs = dict()
-        obj_vars = dir(self)
-        limit_regions = (regions is not None)
-        for k in obj_vars:
-            func = getattr(self, k)
-            if hasattr(func, 'data_func'):
-                data = func()
-                if data is not None and (isinstance(data, pd.DataFrame) or isinstance(data, pd.Series)):
-                    data_keys = data.keys()
-                    for l in data.keys():
-                        if limit_regions and 'World' in data_keys and l not in regions:
-                            del data[l]
-                        else:
-                            if isinstance(l, np.int64):
-                                label = str(l)
-                                data[label] = data[l]
-                                del data[l]
-                    outputs[k] = clean_nan(data)
-                else:
-                    outputs[k] = data
+        for k in self.table_names():
+            data = getattr(self, k)()
+            if data is not None and (isinstance(data, pd.DataFrame) or isinstance(data, pd.Series)):
+                outputs[k] = clean_nan(self.export_table(data, regions))
+            else:
+                outputs[k] = data
         return outputs
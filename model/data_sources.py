@@ -0,0 +1,75 @@
+"""Process-wide registry of parsed data source files.
+
+TAM, adoption, custom adoption and VMA data sources are CSV files shared between scenarios
+and between solutions (all the energy RRS solutions use the same TAM sources, for example),
+which were parsed again by every scenario.  read_csv parses each file once per process and
+hands out the same parsed data for subsequent reads with the same arguments.
+
+The frames handed out are (deep) copies of the parsed data, so callers may modify them freely.
+Copying a parsed frame is much cheaper than parsing its CSV again.
+
+An entry is reparsed when the size or modification time of its file changes.  Arguments
+which are not paths (e.g. io.StringIO) are passed to pandas.read_csv uncached.
+
+    df = data_sources.read_csv(filename, header=0, index_col=0, comment='#')
+    data_sources.stats()   # -> Stats(hits=..., misses=..., files_read=..., bytes_read=..., ...)
+    data_sources.clear()
+"""
+
+from collections import namedtuple
+import os
+import pathlib
+import threading
+
+import pandas as pd
+
+Stats = namedtuple('Stats', ['hits', 'misses', 'files_read', 'bytes_read', 'entries'])
+
+_entries = {}
+_lock = threading.Lock()
+_counters = {'hits': 0, 'misses': 0, 'files_read': 0, 'bytes_read': 0}
+
+
+def _hashable(value):
+    if isinstance(value, (list, tuple)):
+        return tuple(_hashable(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _hashable(v)) for (k, v) in value.items()))
+    if isinstance(value, (set, frozenset)):
+        return frozenset(value)
+    return value
+
+
+def read_csv(filename, **kwargs):
+    """Return pandas.read_csv(filename, **kwargs), parsing each file only once per process."""
+    if not isinstance(filename, (str, pathlib.PurePath)):
+        return pd.read_csv(filename, **kwargs)
+    path = os.path.abspath(filename)
+    st = os.stat(path)
+    key = (path, _hashable(kwargs))
+    with _lock:
+        entry = _entries.get(key)
+        if entry is not None and entry[0] == (st.st_size, st.st_mtime_ns):
+            _counters['hits'] += 1
+            return entry[1].copy()
+        _counters['misses'] += 1
+    df = pd.read_csv(path, **kwargs)
+    with _lock:
+        _entries[key] = ((st.st_size, st.st_mtime_ns), df)
+        _counters['files_read'] += 1
+        _counters['bytes_read'] += st.st_size
+    return df.copy()
+
+
+def stats():
+    """Return the Stats of the registry since the process started (or since clear())."""
+    with _lock:
+        return Stats(entries=len(_entries), **_counters)
+
+
+def clear():
+    """Drop all parsed files and reset the counters."""
+    with _lock:
+        _entries.clear()
+        for name in _counters:
+            _counters[name] = 0
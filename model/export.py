@@ -0,0 +1,97 @@
+"""Export of all the tables of a scenario.
+
+DataHandler.to_json returns the tables of one model object as DataFrames, which the caller then
+has to clean and serialize.  The functions here export the key results and the tables of every
+model object of a scenario (see DataHandler.table_names) in one pass:
+
+    with open('pds2.json', 'w') as f:
+        export.write_json(scenario, f, regions=['World', 'OECD90'])
+    export.write_binary(scenario, 'pds2.npz')
+    outputs = export.read_binary('pds2.npz')
+
+The JSON has the layout {"key_results": {...}, "tables": {attr: {table: ...}}}, where attr is
+the attribute of the model object in the scenario (e.g. "ua").  DataFrames are written as
+{"columns": [...], "index": [...], "data": [[row], ...]} and Series as {"name": ..., "index":
+[...], "data": [...]} (the "split" orient of pandas); as with to_json, NaN and infinite values
+are written as 0.
+
+The binary format is the .npz format of the result cache (see result_cache.save_outputs): the
+columns of all tables as arrays plus a JSON manifest, with values as computed (NaN included).
+read_binary returns the same structure of DataFrames and Series.
+
+Both formats apply the region filtering and relabelling of DataHandler.export_table, without
+modifying the (cached) results of the model objects.
+"""
+
+import json
+
+import numpy as np
+import pandas as pd
+
+from model import result_cache
+from model.data_handler import DataHandler
+
+
+def scenario_tables(s, regions=None):
+    """Return {attr: {table name: table}} for the model objects of scenario s, filtered to
+    regions as DataHandler.export_table does."""
+    tables = {}
+    for (attr, obj) in vars(s).items():
+        if isinstance(obj, DataHandler):
+            tables[attr] = {name: obj.export_table(getattr(obj, name)(), regions)
+                            for name in type(obj).table_names()}
+    return tables
+
+
+def _finite(values):
+    """values (an array) with NaN and infinite values replaced by 0."""
+    if values.dtype.kind == 'f':
+        return np.where(np.isfinite(values), values, 0.0)
+    if values.dtype.kind == 'O':
+        return DataHandler.clean_nan(pd.DataFrame(values)).to_numpy()
+    return values
+
+
+def _to_json(value):
+    """value as a JSON string.  DataFrames and Series are written by the pandas (C) encoder."""
+    if isinstance(value, pd.DataFrame):
+        value = pd.DataFrame(_finite(value.to_numpy()), index=value.index, columns=value.columns)
+        return value.to_json(orient='split', double_precision=15)
+    if isinstance(value, pd.Series):
+        value = pd.Series(_finite(value.to_numpy()), index=value.index, name=value.name)
+        return value.to_json(orient='split', double_precision=15)
+    if isinstance(value, np.ndarray):
+        return json.dumps(_finite(value).tolist())
+    if isinstance(value, (tuple, list)):
+        return '[' + ', '.join(_to_json(v) for v in value) + ']'
+    if isinstance(value, dict):
+        return '{' + ', '.join(f'{json.dumps(str(k))}: {_to_json(v)}' for (k, v) in value.items()) + '}'
+    if isinstance(value, np.generic):
+        value = value.item()
+    if isinstance(value, float) and not np.isfinite(value):
+        value = 0.0
+    return json.dumps(value)
+
+
+def write_json(s, f, regions=None):
+    """Write the key results and tables of scenario s as JSON to the text file f."""
+    f.write('{"key_results": ')
+    f.write(_to_json(s.get_key_results()))
+    f.write(', "tables": {')
+    for (i, (attr, tables)) in enumerate(scenario_tables(s, regions).items()):
+        f.write(f'{", " if i else ""}{json.dumps(attr)}: {{')
+        for (j, (name, table)) in enumerate(tables.items()):
+            f.write(f'{", " if j else ""}{json.dumps(name)}: {_to_json(table)}')
+        f.write('}')
+    f.write('}}')
+
+
+def write_binary(s, path, regions=None):
+    """Write the key results and tables of scenario s to the .npz file path."""
+    result_cache.save_outputs(path, {'key_results': s.get_key_results(),
+                                     'tables': scenario_tables(s, regions)})
+
+
+def read_binary(path):
+    """Read a file written by write_binary, returning {'key_results': ..., 'tables': ...}."""
+    return result_cache.load_outputs(path)
@@ -161,19 +161,130 @@ def single_trend(data):
 
 def trend_algorithm(data, trend):
     """Fit of data via one of several trend interpolation algorithms."""
-    t = trend.lower()
+    t = trend_name(trend)
     if t == "linear": return linear_trend(data=data)
-    if t == "2nd poly" or t == "2nd_poly" or t == "degree2":
-        return poly_degree2_trend(data=data)
-    if t == "3rd poly" or t == "3rd_poly" or t == "degree3":
-        return poly_degree3_trend(data=data)
-    if t == "exponential" or t == "exp":
-        return exponential_trend(data=data)
-    if t == "single" or t == "single source":
-        return single_trend(data)
+    if t == "degree2": return poly_degree2_trend(data=data)
+    if t == "degree3": return poly_degree3_trend(data=data)
+    if t == "exponential": return exponential_trend(data=data)
+    return single_trend(data)
+
+
+TRENDS = ('linear', 'degree2', 'degree3', 'exponential')
+"""The fitted trends, by their canonical names (see trend_name)."""
+
+_TREND_COLUMNS = {'linear': ['x', 'constant', 'adoption'],
+                  'degree2': ['x^2', 'x', 'constant', 'adoption'],
+                  'degree3': ['x^3', 'x^2', 'x', 'constant', 'adoption'],
+                  'exponential': ['coeff', 'e^x', 'adoption']}
+
+
+def trend_name(trend):
+    """Return the canonical name of a trend accepted by trend_algorithm: one of TRENDS or
+    'single'."""
+    t = trend.lower()
+    if t == "linear": return 'linear'
+    if t == "2nd poly" or t == "2nd_poly" or t == "degree2": return 'degree2'
+    if t == "3rd poly" or t == "3rd_poly" or t == "degree3": return 'degree3'
+    if t == "exponential" or t == "exp": return 'exponential'
+    if t == "single" or t == "single source": return 'single'
     raise ValueError('invalid trend algorithm: ' + str(trend))
 
 
+def _mask_groups(mask):
+    """Return a list of (rows, columns) of the columns of mask which are identical."""
+    groups = {}
+    for col in range(mask.shape[1]):
+        groups.setdefault(mask[:, col].tobytes(), []).append(col)
+    return [(mask[:, cols[0]], np.array(cols)) for cols in groups.values()]
+
+
+def _polyfit_columns(x, y, groups, degree):
+    """Return the np.polyfit coefficients (degree+1 x columns) of each column of y against x.
+       groups: as returned by _mask_groups, the rows to fit and the columns sharing them.
+       The columns of a group are fitted in a single least squares solve, with the same
+       scaled Vandermonde matrix as np.polyfit.  Columns with no valid rows or with non-finite
+       values get NaN coefficients."""
+    coeffs = np.full((degree + 1, y.shape[1]), np.nan)
+    for (rows, cols) in groups:
+        cols = cols[np.isfinite(y[rows][:, cols]).all(axis=0)]
+        if not rows.any() or not len(cols):
+            continue
+        lhs = np.vander(x[rows], degree + 1)
+        scale = np.sqrt((lhs * lhs).sum(axis=0))
+        lhs /= scale
+        rcond = rows.sum() * np.finfo(np.float64).eps
+        c = np.linalg.lstsq(lhs, y[np.ix_(rows, cols)], rcond=rcond)[0]
+        coeffs[:, cols] = (c.T / scale).T
+    return coeffs
+
+
+def fit_trends(data, trends=TRENDS):
+    """Fit every column of data with each of trends at once.
+
+       Equivalent to calling trend_algorithm(data[column], trend) for every column and trend,
+       but each polynomial degree is fitted for all columns together (see _polyfit_columns).
+       Arguments:
+         data: a DataFrame indexed by year, one column per series to fit.  NaN values are
+           ignored, as in the single series functions.
+         trends: canonical names of the trends to fit (see trend_name).
+
+       Returns a DataFrame indexed by Year 2014-2060 with (trend, column, component) columns;
+       result[(trend, column)] has the same columns and values as the DataFrame returned by
+       trend_algorithm.
+    """
+    years = np.arange(2014, 2061)
+    offsets = np.arange(len(years))[:, np.newaxis]
+    x = np.asarray(data.index, dtype=np.float64) - 2014
+    y = data.to_numpy(dtype=np.float64)
+    groups = _mask_groups(~np.isnan(y))
+    components = sorted({c for trend in trends for c in _TREND_COLUMNS[trend]})
+    blocks = []
+    codes = ([], [], [])
+    for trend in trends:
+        if trend == 'exponential':
+            with np.errstate(divide='ignore', invalid='ignore'):
+                (ce, c0) = _polyfit_columns(x, np.log(y), groups, 1)
+            ex = np.exp(offsets * ce)
+            coeff = np.broadcast_to(np.exp(c0), ex.shape)
+            parts = [coeff, ex, ex * coeff]
+        else:
+            degree = {'linear': 1, 'degree2': 2, 'degree3': 3}[trend]
+            coeffs = _polyfit_columns(x, y, groups, degree)
+            # powers of x, highest first, then the constant
+            terms = [(offsets ** (degree - i)) * coeffs[i] for i in range(degree)]
+            constant = np.broadcast_to(coeffs[degree], (len(years), y.shape[1]))
+            # sum in the same order as the single series functions
+            adoption = terms[-1]
+            for term in terms[-2::-1]:
+                adoption = adoption + term
+            parts = terms + [constant, adoption + constant]
+        # (year, column, component) -> (year, column * component)
+        blocks.append(np.stack(parts, axis=2).reshape(len(years), -1))
+        for col in range(y.shape[1]):
+            for component in _TREND_COLUMNS[trend]:
+                codes[0].append(trends.index(trend))
+                codes[1].append(col)
+                codes[2].append(components.index(component))
+    values = np.hstack(blocks) if blocks else np.empty((len(years), 0))
+    columns = pd.MultiIndex(levels=[list(trends), data.columns, components], codes=codes,
+                            verify_integrity=False)
+    return pd.DataFrame(values, index=pd.Index(years, name="Year"), columns=columns)
+
+
+def fitted_trend(fits, trend, column):
+    """Return a new DataFrame of trend fitted to column, from the result of fit_trends (like
+       fits[(trend, column)], but faster), or None if fits does not include it."""
+    (trends, columns) = fits.columns.levels[:2]
+    if trend not in trends or column not in columns:
+        return None
+    # fit_trends lays out the columns by trend, then by column, then by component
+    start = sum(len(_TREND_COLUMNS[t]) for t in trends[:trends.get_loc(trend)]) * len(columns)
+    width = len(_TREND_COLUMNS[trend])
+    start += columns.get_loc(column) * width
+    return pd.DataFrame(fits.to_numpy()[:, start:start + width], index=fits.index.copy(),
+                        columns=_TREND_COLUMNS[trend])
+
+
 def matching_data_sources(data_sources, name, groups_only, region_key=None):
     """Return a list of data sources which match name.
        If name is a group, return all data sources which are part of that group.
@@ -5,52 +5,182 @@ Passing in the same arguments will return the same object, shared by all callers
 This is especially useful for objects with expensive methods which are decorated
 @lru_cache, like TAM.py. Sharing a single object means when any of them have warmed
 the cache, all solutions benefit.
+
+The cache is shared by all classes using the metaclass and is bounded: by default it holds
+at most DEFAULT_MAXSIZE instances, and optionally an (estimated) memory budget.  The least
+recently used instances are dropped first; callers which still hold a reference keep a
+working object, it is simply rebuilt by the next caller asking for it.
+
+The memory budget bounds instance data only: the size of each instance's attributes, estimated
+once when it is constructed.  Results of @lru_cache methods are held by the class-level caches
+of those methods (keyed on the instance), so they are not counted, and they keep an evicted
+instance alive until the method caches drop it in turn.
+
+    metaclass_cache.set_limits(maxsize=64, max_bytes=500 * 2**20)
+    metaclass_cache.cache_info()   # -> CacheInfo(hits=..., misses=..., ..., bytes=...)
+    metaclass_cache.cache_clear()
 """
 
-import pandas as pd
+from collections import OrderedDict, namedtuple
+import hashlib
 import json
+import sys
+import threading
+
+import numpy as np
+import pandas as pd
+
+from model.array_cache import digest
 
 # pylint is confused by the __call__ syntax
 # pylint: disable=no-value-for-parameter
 
+DEFAULT_MAXSIZE = 1024
+
+CacheInfo = namedtuple('CacheInfo', ['hits', 'misses', 'maxsize', 'currsize', 'bytes', 'max_bytes'])
+
+
+def _json_default(item):
+    if isinstance(item, (pd.DataFrame, pd.Series, np.ndarray)):
+        return digest(item).hex()
+    return str(item)
+
+
+def hash_item(item):
+    """Return a small hashable key describing the content of item.
+
+    pandas and numpy objects are reduced to a fixed-size digest of their content; other
+    hashable items are used as they are; anything else (lists of data source dicts, etc.)
+    is reduced to a digest of its JSON representation.
+    """
+    if isinstance(item, (pd.DataFrame, pd.Series, np.ndarray)):
+        return digest(item)
+    try:
+        hash(item)
+        return item
+    except TypeError:
+        pass
+    text = json.dumps(item, sort_keys=True, separators=(',', ':'), default=_json_default)
+    return (type(item).__name__, hashlib.blake2b(text.encode('utf-8'), digest_size=16).digest())
+
+
+def _estimate_bytes(value, depth=0):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if depth < 3:
+        if isinstance(value, dict):
+            return sum(_estimate_bytes(v, depth + 1) for v in value.values())
+        if isinstance(value, (list, tuple)):
+            return sum(_estimate_bytes(v, depth + 1) for v in value)
+        if hasattr(value, '__dict__') and depth == 0:
+            return sys.getsizeof(value) + _estimate_bytes(vars(value), depth + 1)
+    return sys.getsizeof(value)
+
+
+class InstanceCache:
+    """LRU mapping of constructor arguments to instances, with hit/miss counters."""
+
+    def __init__(self, maxsize=DEFAULT_MAXSIZE, max_bytes=None):
+        self.maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.entries = OrderedDict()
+        self.sizes = {}    # key -> estimated bytes of the instance, when it was stored
+        self.bytes = 0
+        self.lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        with self.lock:
+            try:
+                instance = self.entries[key]
+            except KeyError:
+                self.misses += 1
+                return None
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return instance
+
+    def put(self, key, instance):
+        """Store instance under key, returning the instance now cached there (another thread
+        may have constructed one first)."""
+        with self.lock:
+            if key not in self.entries:
+                self.entries[key] = instance
+                self.sizes[key] = _estimate_bytes(instance)
+                self.bytes += self.sizes[key]
+            self.entries.move_to_end(key)
+            self.evict()
+            return self.entries[key]
+
+    def nbytes(self):
+        """Estimated memory held by the attributes of the cached instances (see the module
+        documentation)."""
+        with self.lock:
+            return self.bytes
+
+    def _pop_oldest(self):
+        key, _ = self.entries.popitem(last=False)
+        self.bytes -= self.sizes.pop(key)
+
+    def evict(self):
+        with self.lock:
+            if self.maxsize is not None:
+                while len(self.entries) > self.maxsize:
+                    self._pop_oldest()
+            if self.max_bytes is not None:
+                while self.bytes > self.max_bytes and len(self.entries) > 1:  # never evict the newest entry
+                    self._pop_oldest()
+
+    def info(self):
+        with self.lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self.entries),
+                             self.nbytes(), self.max_bytes)
+
+    def clear(self):
+        with self.lock:
+            self.entries.clear()
+            self.sizes.clear()
+            self.bytes = 0
+            self.hits = self.misses = 0
+
+
 class MetaclassCache(type):
 
-    cache = {}
+    cache = InstanceCache()
 
     def hash_item(self, item):
-        if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
-            item = tuple(pd.util.hash_pandas_object(item))
-        try:
-            return hash(item)
-        except TypeError:
-            pass
+        return hash_item(item)
+
+    def __call__(self, *args, **kwargs):
+        key = (self, tuple(hash_item(arg) for arg in args),
+               tuple((name, hash_item(kwargs[name])) for name in sorted(kwargs.keys())))
+        instance = self.cache.get(key)
+        if instance is None:
+            instance = self.cache.put(key, type.__call__(self, *args, **kwargs))
+        return instance
 
-        try:
-            return hash(json.dumps(item, separators=(',', ':')))
-        except TypeError:
-            pass
 
-        try:
-            return(hash(str(item)))
-        except TypeError:
-            pass
+def cache_info():
+    """Return the CacheInfo of the instance cache shared by all MetaclassCache classes."""
+    return MetaclassCache.cache.info()
 
-        try:
-            return hash(tuple(item))
-        except TypeError as e:
-            raise e
 
+def cache_clear():
+    """Drop all cached instances and reset the counters."""
+    MetaclassCache.cache.clear()
 
-    def __call__(self, *args, **kwargs):
-        key = self.hash_item(self)
-        for arg in args:
-            key = (key << 64) ^ self.hash_item(arg)
-        for arg in sorted(kwargs.keys()):
-            key = (key << 64) ^ self.hash_item(arg)
-            key = (key << 64) ^ self.hash_item(kwargs[arg])
-        try:
-            return self.cache[key]
-        except KeyError:
-            instance = type.__call__(self, *args, **kwargs)
-            self.cache[key] = instance
-            return instance
+
+def set_limits(maxsize=DEFAULT_MAXSIZE, max_bytes=None):
+    """Bound the instance cache to maxsize instances and/or max_bytes of estimated instance
+    data (None for no bound; see the module documentation), evicting least recently used
+    instances as needed."""
+    cache = MetaclassCache.cache
+    with cache.lock:
+        cache.maxsize = maxsize
+        cache.max_bytes = max_bytes
+        cache.evict()
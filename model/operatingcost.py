@@ -3,7 +3,6 @@
 from functools import lru_cache
 import math
 import types
-from io import StringIO
 
 import model.dd as dd
 from model.advanced_controls import SOLUTION_CATEGORY
@@ -13,10 +12,11 @@ import pandas as pd
 #from numba import jit
 import model
 
+from model.array_cache import array_cache
 from model.data_handler import DataHandler
 from model.decorators import data_func
 
-@lru_cache
+@array_cache()
 def annual_breakout(
     new_funits_per_year, 
     new_annual_iunits_reqd,
@@ -28,13 +28,6 @@ def annual_breakout(
     has_var_costs,
     conversion_factor_vom,
     conversion_factor_fom):
-
-    # index_col = year
-    # squeeze -> pd.Dataframe to pd.Series
-    # round_trip retains float precision
-    new_funits_per_year = pd.read_csv(StringIO(new_funits_per_year), index_col=0, squeeze=True, float_precision='round_trip')
-    new_annual_iunits_reqd = pd.read_csv(StringIO(new_annual_iunits_reqd), index_col=0,  squeeze=True, float_precision='round_trip')
-
     """Breakout of operating cost per year, including replacements.
         Supplies calculations for:
         SolarPVUtil 'Operating Cost'!B262:AV386 for soln_pds
@@ -79,6 +72,70 @@ def annual_breakout(
                 break
     return breakout
 
+
+@array_cache()
+def annual_breakout_array(
+    new_funits_per_year,
+    new_annual_iunits_reqd,
+    lifetime_replacement,
+    var_oper_cost_per_funit,
+    fuel_cost_per_funit,
+    fixed_oper_cost_per_iunit,
+    report_end_year,
+    has_var_costs,
+    conversion_factor_vom,
+    conversion_factor_fom):
+    """Array-based equivalent of annual_breakout.
+
+       Builds the whole (row year x purchase year) table from a single broadcasted
+       remaining-lifetime mask instead of writing one cell at a time.
+       The floating point operations are performed in the same order as annual_breakout,
+       so results are identical to the Excel-compatible loop implementation.
+    """
+    first_year = dd.CORE_START_YEAR
+    last_year = report_end_year
+    last_column = dd.CORE_END_YEAR
+    last_row = 2139
+    rows = np.arange(first_year, last_row + 1)
+    columns = np.arange(first_year, last_column + 1)
+    values = np.zeros((len(rows), len(columns)), dtype=np.float64)
+
+    # if there are no operating costs we return a table of 0s
+    if (has_var_costs or fixed_oper_cost_per_iunit) and last_year >= first_year:
+        # supply a reasonable value if none provided; this matches the requested default in the Excel
+        if lifetime_replacement == 0:
+            lifetime_replacement = 100
+
+        years = np.arange(first_year, min(last_year, last_column) + 1)
+
+        # within the years of interest, assume replacement of worn out equipment. Lifetimes
+        # are grown by repeated addition (not multiplication) to match the loop bit for bit.
+        remaining = (last_year + 1 - years).astype(np.float64)
+        lifetime = np.full(len(years), lifetime_replacement, dtype=np.float64)
+        grow = np.ceil(lifetime) < remaining
+        while grow.any():
+            lifetime = np.where(grow, lifetime + lifetime_replacement, lifetime)
+            grow = np.ceil(lifetime) < remaining
+
+        cost = var_oper_cost_per_funit + fuel_cost_per_funit if has_var_costs else 0
+        funits = new_funits_per_year.reindex(years).to_numpy(dtype=np.float64)
+        iunits = new_annual_iunits_reqd.reindex(years).to_numpy(dtype=np.float64)
+        total = funits * cost * conversion_factor_vom
+        total += iunits * fixed_oper_cost_per_iunit * conversion_factor_fom
+
+        # age[r, c] is how many years equipment purchased in year c has been in service at
+        # row r; the fraction of that year it is still operating is clip(lifetime - age, 0, 1).
+        age = (rows[:, np.newaxis] - years[np.newaxis, :]).astype(np.float64)
+        fraction = np.where(age >= 0, np.clip(lifetime[np.newaxis, :] - age, 0, 1), 0.0)
+        val = total[np.newaxis, :] * fraction
+        values[:, :len(years)] = np.where(np.abs(val) > 0.01, val, 0.0)
+
+    breakout = pd.DataFrame(values, index=rows, columns=columns)
+    breakout.index.name = 'Year'
+    breakout.index = breakout.index.astype(int)
+    return breakout
+
+
 class OperatingCost(DataHandler):
     """Implementation for the Operating Cost module.
 
@@ -306,9 +363,9 @@ class OperatingCost(DataHandler):
     def _annual_breakout(self, new_funits_per_year, new_annual_iunits_reqd,
                          lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit,
                          fixed_oper_cost_per_iunit):
-        return annual_breakout(
-            new_funits_per_year.to_csv(),
-            new_annual_iunits_reqd.to_csv(),
+        return annual_breakout_array(
+            new_funits_per_year,
+            new_annual_iunits_reqd,
             lifetime_replacement,
             var_oper_cost_per_funit,
             fuel_cost_per_funit,
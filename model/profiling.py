@@ -0,0 +1,260 @@
+"""Opt-in profiling of the model calculations.
+
+While profiling is enabled, every @data_func or @lru_cache method of the model classes
+(UnitAdoption, FirstCost, OperatingCost, CO2Calcs, TAM, ...) records, per solution and scenario:
+the number of calls, lru_cache hits and misses, wall time (including and excluding the
+methods it calls) and the size of its results.  When profiling is disabled the methods are
+not wrapped at all, so it costs nothing.
+
+    with profiling.profile() as prof:
+        factory.load_scenario('solarpvutil', 'PDS2').get_key_results()
+    prof.records()                    # DataFrame, slowest (self time) first
+    prof.write('profile.csv')         # the same as CSV
+    prof.write('profile.folded')      # folded stacks, for flamegraph.pl or speedscope
+
+Setting the environment variable DRAWDOWN_PROFILE to a filename enables profiling when the
+first solution is loaded and writes the report there (CSV if the name ends in .csv, folded
+stacks otherwise) when the process exits.  "{pid}" in the name is replaced by the process id,
+for runs with worker processes.
+
+Calls are attributed to the scenario holding the model object, and the methods it calls to the
+same scenario.  Models shared between scenarios (e.g. TAM data) belong to the scenario that
+most recently took them, and calls made while a model is being constructed to the scenario
+being constructed.
+"""
+
+import atexit
+import contextlib
+import functools
+import importlib
+import os
+import sys
+import threading
+import time
+import types
+import weakref
+
+import numpy as np
+import pandas as pd
+
+ENV_VAR = 'DRAWDOWN_PROFILE'
+
+# Modules with the model classes, imported when profiling is enabled so they can be instrumented.
+MODULES = ['adoptiondata', 'aez', 'ch4calcs', 'co2calcs', 'customadoption', 'dez',
+           'emissionsfactors', 'firstcost', 'helpertables', 'n2ocalcs', 'operatingcost',
+           's_curve', 'scenario', 'tam', 'tla', 'unitadoption', 'vma']
+
+_LRU_WRAPPER = type(functools.lru_cache()(lambda: None))
+
+COLUMNS = ['solution', 'scenario', 'method', 'calls', 'hits', 'misses', 'seconds',
+           'self_seconds', 'output_bytes']
+
+
+class Profile:
+    """The measurements of a profiling session."""
+
+    def __init__(self):
+        # (solution, scenario, method) -> [calls, hits, misses, seconds, self seconds, output bytes]
+        self._records = {}
+        # (solution, scenario, method, method, ...) -> self seconds
+        self._stacks = {}
+        self._lock = threading.Lock()
+
+    def _add(self, key, stack, hit, miss, seconds, self_seconds, output_bytes):
+        with self._lock:
+            record = self._records.setdefault(key, [0, 0, 0, 0.0, 0.0, 0])
+            record[0] += 1
+            record[1] += hit
+            record[2] += miss
+            record[3] += seconds
+            record[4] += self_seconds
+            record[5] = max(record[5], output_bytes)
+            self._stacks[stack] = self._stacks.get(stack, 0.0) + self_seconds
+
+    def records(self):
+        """Return a DataFrame with one row per (solution, scenario, method), slowest first.
+        seconds include the time of the methods called, self_seconds do not.  hits and misses
+        are zero for methods without an lru_cache."""
+        with self._lock:
+            rows = [key + tuple(record) for (key, record) in self._records.items()]
+        df = pd.DataFrame(rows, columns=COLUMNS)
+        return df.sort_values('self_seconds', ascending=False, ignore_index=True)
+
+    def folded(self):
+        """Return the self times as folded stacks ("solution;scenario;Class.method;... usec"
+        lines), the input format of flamegraph.pl, inferno and speedscope."""
+        with self._lock:
+            stacks = list(self._stacks.items())
+        return [';'.join(stack) + f' {round(seconds * 1e6)}' for (stack, seconds) in stacks]
+
+    def write(self, filename):
+        """Write the records as CSV if filename ends in .csv, else the folded stacks."""
+        filename = str(filename)
+        if filename.endswith('.csv'):
+            self.records().to_csv(filename, index=False)
+        else:
+            with open(filename, 'w') as f:
+                f.writelines(line + '\n' for line in self.folded())
+
+
+_state = threading.local()
+_lock = threading.RLock()
+_profiles = []
+_originals = []
+_owners = weakref.WeakKeyDictionary()
+_constructing = None
+
+
+def _scenario_label(ref):
+    scen = ref() if ref is not None else None
+    if scen is None:
+        return ('', '')
+    return (str(getattr(scen, 'module_name', '')), str(getattr(scen, 'scenario', '')))
+
+
+def _label(obj):
+    """The (solution, scenario) of the scenario holding model obj, or of the scenario being
+    constructed."""
+    try:
+        ref = _owners.get(obj)
+    except TypeError:
+        ref = None
+    return _scenario_label(ref if ref is not None else _constructing)
+
+
+def _size(value):
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (tuple, list)):
+        return sum(_size(v) for v in value)
+    return 0
+
+
+def _instrument(func, name):
+    """Return a wrapper of the method func (a function or an lru_cache wrapper) which records
+    its calls in the active profiles."""
+    cache_info = getattr(func, 'cache_info', None)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        stack = getattr(_state, 'stack', None)
+        if stack is None:
+            stack = _state.stack = []
+        if stack:
+            (label, path) = (stack[-1][0], stack[-1][1] + (name,))
+        else:
+            label = _label(args[0]) if args else _scenario_label(_constructing)
+            path = label + (name,)
+        misses = cache_info().misses if cache_info else 0
+        frame = [label, path, 0.0]
+        stack.append(frame)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        finally:
+            seconds = time.perf_counter() - start
+            stack.pop()
+            if stack:
+                stack[-1][2] += seconds
+        miss = int(cache_info().misses > misses) if cache_info else 0
+        hit = int(not miss) if cache_info else 0
+        output_bytes = _size(result) if (miss or not cache_info) else 0
+        for prof in _profiles:
+            prof._add(label + (name,), path, hit, miss, seconds, seconds - frame[2], output_bytes)  # pylint: disable=protected-access
+        return result
+
+    if cache_info:
+        wrapper.cache_info = func.cache_info
+        wrapper.cache_clear = func.cache_clear
+    return wrapper
+
+
+def _model_classes():
+    for name in MODULES:
+        importlib.import_module(f'model.{name}')
+    for (modname, module) in list(sys.modules.items()):
+        if not modname.startswith('model.') or modname.startswith('model.tests') or module is None:
+            continue
+        for cls in list(vars(module).values()):
+            if isinstance(cls, type) and cls.__module__ == modname:
+                yield cls
+
+
+def _install():
+    from model import scenario
+    for cls in _model_classes():
+        for (attr, func) in list(vars(cls).items()):
+            if isinstance(func, (types.FunctionType, _LRU_WRAPPER)) and (
+                    getattr(func, 'data_func', False) or hasattr(func, 'cache_info')):
+                _originals.append((cls, attr, func))
+                setattr(cls, attr, _instrument(func, f'{cls.__name__}.{attr}'))
+    original_setattr = scenario.Scenario.__setattr__
+
+    def __setattr__(self, name, value):
+        global _constructing
+        _constructing = weakref.ref(self)
+        model = value
+        if isinstance(model, scenario._DeferringProxy):  # pylint: disable=protected-access
+            model = model._model  # pylint: disable=protected-access
+        try:
+            _owners[model] = _constructing
+        except TypeError:
+            pass  # not a model: unhashable or not weak-referenceable
+        original_setattr(self, name, value)
+
+    _originals.append((scenario.Scenario, '__setattr__', original_setattr))
+    scenario.Scenario.__setattr__ = __setattr__
+
+
+def _uninstall():
+    global _constructing
+    for (cls, attr, func) in reversed(_originals):
+        setattr(cls, attr, func)
+    _originals.clear()
+    _owners.clear()
+    _constructing = None
+
+
+def enable(profile=None):
+    """Start recording calls into profile (a new Profile by default), and return it."""
+    profile = profile or Profile()
+    with _lock:
+        if not _profiles:
+            _install()
+        _profiles.append(profile)
+    return profile
+
+
+def disable(profile):
+    """Stop recording calls into profile."""
+    with _lock:
+        _profiles.remove(profile)
+        if not _profiles:
+            _uninstall()
+
+
+@contextlib.contextmanager
+def profile():
+    """Record the calls made within this block into the Profile it returns."""
+    prof = enable()
+    try:
+        yield prof
+    finally:
+        disable(prof)
+
+
+_environment_profile = None
+
+
+def enable_from_environment():
+    """Enable profiling if DRAWDOWN_PROFILE is set (see the module documentation)."""
+    global _environment_profile
+    filename = os.environ.get(ENV_VAR)
+    if not filename or _environment_profile is not None:
+        return
+    _environment_profile = enable()
+    atexit.register(_environment_profile.write, filename.replace('{pid}', str(os.getpid())))
@@ -0,0 +1,319 @@
+"""Persistent on-disk cache of scenario outputs.
+
+Building a scenario recomputes TAM, adoption, helper tables, unit adoption, costs and CO2 from
+scratch.  When neither the Advanced Controls nor the code and data files of the solution have
+changed, the outputs are the same, so they can be stored and reloaded instead.
+
+The cache is opt-in.  Set the environment variable DRAWDOWN_RESULT_CACHE to a directory (or to
+'1' for the default ~/.cache/drawdown) and use factory.load_scenario_outputs, or construct a
+ResultCache explicitly.  The other persistent caches (see cache_directory) are opt-in the same way.
+
+Each entry is a single uncompressed .npz file holding every table of one scenario column by
+column, plus a JSON manifest describing how to rebuild the DataFrames/Series.  Entries are
+keyed by a content hash of:
+  * the Advanced Controls values (AdvancedControls.fingerprint),
+  * the source code of the model and of the solution, and
+  * the data files of the solution and the shared data/ directory, and
+  * the integration (if any) whose data files are used instead (see integration_tag).
+The total size of the cache directory is bounded; least recently used entries are evicted.
+"""
+
+import enum
+import hashlib
+import json
+import os
+import zipfile
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from model.data_handler import DataHandler
+
+FORMAT_VERSION = 1
+DEFAULT_DIRECTORY = Path.home() / '.cache' / 'drawdown'
+DEFAULT_MAX_BYTES = 2 * 1024 ** 3
+OTHER_CACHES = '_caches'
+"""The subdirectory of the cache directory holding the other persistent caches (see cache_directory).
+Its name cannot be that of a solution, so ResultCache never counts or evicts their files."""
+
+_ROOT = Path(__file__).parents[1]
+_file_digests = {}
+
+
+###########----############----############----############----############
+# Cache keys
+
+def _file_digest(path):
+    """Content digest of a file, memoized on its size and modification time."""
+    st = path.stat()
+    memo_key = (str(path), st.st_size, st.st_mtime_ns)
+    result = _file_digests.get(memo_key)
+    if result is None:
+        result = hashlib.blake2b(path.read_bytes(), digest_size=16).hexdigest()
+        _file_digests[memo_key] = result
+    return result
+
+
+def _tree_files(directory, pattern='*', skip=('tests', '__pycache__')):
+    return sorted(p for p in Path(directory).rglob(pattern)
+                  if p.is_file() and not any(part in skip for part in p.relative_to(directory).parts))
+
+
+def _digest_files(files):
+    h = hashlib.blake2b(digest_size=16)
+    for path in files:
+        h.update(str(path.relative_to(_ROOT) if path.is_relative_to(_ROOT) else path).encode())
+        h.update(_file_digest(path).encode() if path.is_file() else b'missing')
+    return h.hexdigest()
+
+
+def source_digest(solution):
+    """Digest of the code and data that a solution's results can depend on."""
+    return _digest_files(_tree_files(_ROOT / 'model', '*.py') + sorted((_ROOT / 'solution').glob('*.py')) +
+                         _tree_files(_ROOT / 'solution' / solution) + _tree_files(_ROOT / 'data'))
+
+
+def files_digest(paths, exclude=()):
+    """Digest of the files among paths and of the files in the directories among paths, other
+    than those in exclude.  Files which do not exist are digested as missing."""
+    exclude = {Path(p) for p in exclude}
+    files = []
+    for path in map(Path, paths):
+        files.extend(_tree_files(path) if path.is_dir() else [path])
+    return _digest_files(f for f in files if f not in exclude)
+
+
+def _json_default(obj):
+    if isinstance(obj, np.generic):
+        return obj.item()
+    if isinstance(obj, enum.Enum):
+        return obj.name
+    raise TypeError(f"Cannot store {type(obj)} in the result cache")
+
+
+def integration_tag():
+    """The part of a cache key naming the integration whose data files are used.  While
+    DDINTEGRATE is set, solutions read the *_<DDINTEGRATE> versions of their data files where
+    they exist (see model.integration.integration_alt_file), so their outputs differ."""
+    return f"int_{os.environ['DDINTEGRATE']}" if 'DDINTEGRATE' in os.environ else 'noint'
+
+
+def cache_key(solution, ac):
+    """The key under which the outputs of solution with Advanced Controls ac are stored."""
+    return f"v{FORMAT_VERSION}-{integration_tag()}-{source_digest(solution)}-{ac.fingerprint()}"
+
+
+###########----############----############----############----############
+# Collecting and (de)serializing outputs
+
+def scenario_outputs(s):
+    """Evaluate every @data_func table of every model object of scenario s.
+
+    Returns a dict with keys 'key_results' and 'tables', the latter mapping the scenario
+    attribute name (e.g. 'ua') to a dict of table name -> result.  Unlike DataHandler.to_json
+    the (cached) results are not modified.
+    """
+    tables = {}
+    for (attr, obj) in vars(s).items():
+        if not isinstance(obj, DataHandler):
+            continue
+        tables[attr] = {name: getattr(obj, name)() for name in type(obj).table_names()}
+    return {'key_results': s.get_key_results(), 'tables': tables}
+
+
+def _encode_labels(index):
+    if isinstance(index, pd.MultiIndex):
+        return {'levels': [_encode_labels(index.get_level_values(i)) for i in range(index.nlevels)],
+                'names': list(index.names)}
+    if isinstance(index, pd.RangeIndex):
+        return {'range': [index.start, index.stop, index.step], 'name': index.name}
+    return {'values': [_json_default(v) if isinstance(v, np.generic) else v for v in index.tolist()],
+            'dtype': str(index.dtype), 'name': index.name}
+
+
+def _decode_labels(enc):
+    if 'levels' in enc:
+        return pd.MultiIndex.from_arrays([_decode_labels(lvl) for lvl in enc['levels']],
+                                         names=enc['names'])
+    if 'range' in enc:
+        return pd.RangeIndex(*enc['range'], name=enc['name'])
+    return pd.Index(enc['values'], dtype=enc['dtype'], name=enc['name'])
+
+
+class _Writer:
+    def __init__(self):
+        self.arrays = {}
+
+    def column(self, values):
+        """Store one column, returning its manifest entry."""
+        values = np.asarray(values)
+        if values.dtype.kind in 'biufcmM':
+            key = f"a{len(self.arrays)}"
+            self.arrays[key] = values
+            return {'array': key}
+        if all(isinstance(v, str) for v in values):
+            key = f"a{len(self.arrays)}"
+            self.arrays[key] = values.astype(str)
+            return {'array': key, 'dtype': 'object'}
+        return {'list': [_json_default(v) if isinstance(v, (np.generic, enum.Enum)) else v
+                         for v in values.tolist()]}
+
+    def encode(self, value):
+        if isinstance(value, pd.DataFrame):
+            # DataFrames have no name of their own, but the model sets one as an attribute.
+            return {'type': 'frame', 'name': vars(value).get('name'),
+                    'index': _encode_labels(value.index), 'columns': _encode_labels(value.columns),
+                    'data': [self.column(value.iloc[:, i].values) for i in range(value.shape[1])]}
+        if isinstance(value, pd.Series):
+            return {'type': 'series', 'name': value.name, 'index': _encode_labels(value.index),
+                    'data': self.column(value.values)}
+        if isinstance(value, (tuple, list)):
+            return {'type': type(value).__name__, 'items': [self.encode(v) for v in value]}
+        if isinstance(value, dict):
+            return {'type': 'dict', 'items': {str(k): self.encode(v) for (k, v) in value.items()}}
+        if isinstance(value, np.ndarray):
+            return {'type': 'ndarray', 'data': self.column(value)}
+        if isinstance(value, (np.generic, enum.Enum)):
+            value = _json_default(value)
+        if value is None or isinstance(value, (bool, int, float, str)):
+            return {'type': 'scalar', 'value': value}
+        raise TypeError(f"Cannot store {type(value)} in the result cache")
+
+
+def _decode_column(enc, arrays):
+    if 'array' in enc:
+        values = arrays[enc['array']]
+        return values.astype(object) if enc.get('dtype') == 'object' else values
+    return np.array(enc['list'], dtype=object)
+
+
+def _decode(enc, arrays):
+    kind = enc['type']
+    if kind == 'frame':
+        columns = _decode_labels(enc['columns'])
+        data = {i: _decode_column(c, arrays) for (i, c) in enumerate(enc['data'])}
+        df = pd.DataFrame(data, index=_decode_labels(enc['index']))
+        df.columns = columns
+        if enc['name'] is not None:
+            df.name = enc['name']
+        return df
+    if kind == 'series':
+        return pd.Series(_decode_column(enc['data'], arrays), index=_decode_labels(enc['index']),
+                         name=enc['name'])
+    if kind == 'tuple':
+        return tuple(_decode(v, arrays) for v in enc['items'])
+    if kind == 'list':
+        return [_decode(v, arrays) for v in enc['items']]
+    if kind == 'dict':
+        return {k: _decode(v, arrays) for (k, v) in enc['items'].items()}
+    if kind == 'ndarray':
+        return _decode_column(enc['data'], arrays)
+    return enc['value']
+
+
+def save_outputs(path, outputs):
+    """Write outputs (DataFrames, Series, arrays and scalars nested in dicts, lists and tuples)
+    to the .npz file path, in the format of the cache entries."""
+    writer = _Writer()
+    manifest = writer.encode(outputs)
+    writer.arrays['__manifest__'] = np.array(json.dumps(manifest))
+    np.savez(path, **writer.arrays)
+
+
+def load_outputs(path):
+    """Read outputs written by save_outputs."""
+    with np.load(path, allow_pickle=False) as npz:
+        arrays = {k: npz[k] for k in npz.files}
+    manifest = json.loads(str(arrays.pop('__manifest__')))
+    return _decode(manifest, arrays)
+
+
+###########----############----############----############----############
+# The cache itself
+
+class ResultCache:
+    """A size-bounded directory of scenario outputs.
+
+    Arguments:
+      directory: where to store entries (default ~/.cache/drawdown).
+      max_bytes: the total size of all entries is kept below this by evicting the least
+        recently used entries.
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = Path(directory or DEFAULT_DIRECTORY)
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+
+    def _path(self, solution, key):
+        return self.directory / solution / f"{key}.npz"
+
+    def get(self, solution, key):
+        """Return the stored outputs for key, or None if there are none."""
+        path = self._path(solution, key)
+        try:
+            outputs = load_outputs(path)
+        except (OSError, ValueError, zipfile.BadZipFile):
+            self.misses += 1
+            return None
+        os.utime(path)  # mark as recently used
+        self.hits += 1
+        return outputs
+
+    def put(self, solution, key, outputs):
+        """Store outputs (as returned by scenario_outputs) under key."""
+        path = self._path(solution, key)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(f".{path.stem}.{os.getpid()}.tmp.npz")
+        save_outputs(tmp, outputs)
+        os.replace(tmp, path)
+        self.evict()
+
+    def entries(self):
+        """The files of all stored outputs (but not those of the other caches in OTHER_CACHES)."""
+        return [p for p in self.directory.glob('*/*.npz') if p.parent.name != OTHER_CACHES]
+
+    def size(self):
+        return sum(p.stat().st_size for p in self.entries())
+
+    def evict(self):
+        """Delete least recently used entries until the cache fits in max_bytes."""
+        entries = [(p.stat(), p) for p in self.entries()]
+        total = sum(st.st_size for (st, _) in entries)
+        for (st, path) in sorted(entries, key=lambda e: e[0].st_mtime_ns):
+            if total <= self.max_bytes:
+                break
+            path.unlink(missing_ok=True)
+            total -= st.st_size
+
+    def clear(self):
+        for path in self.entries():
+            path.unlink(missing_ok=True)
+
+
+def _cache_root():
+    """The directory set by DRAWDOWN_RESULT_CACHE, or None if it is not set or disables caching."""
+    setting = os.environ.get('DRAWDOWN_RESULT_CACHE')
+    if not setting or setting.lower() in ('0', 'false', 'no'):
+        return None
+    return DEFAULT_DIRECTORY if setting.lower() in ('1', 'true', 'yes') else Path(setting)
+
+
+def cache_directory(name):
+    """The directory for other persistent caches (e.g. climate baselines): OTHER_CACHES/`name` in
+    the directory set by DRAWDOWN_RESULT_CACHE, or None if DRAWDOWN_RESULT_CACHE is not set or
+    disables caching."""
+    root = _cache_root()
+    return root / OTHER_CACHES / name if root is not None else None
+
+
+def default_cache():
+    """The ResultCache configured by the DRAWDOWN_RESULT_CACHE environment variable, or None
+    if it is not set.  DRAWDOWN_RESULT_CACHE_MAX_BYTES optionally overrides the size bound."""
+    directory = _cache_root()
+    if directory is None:
+        return None
+    max_bytes = int(os.environ.get('DRAWDOWN_RESULT_CACHE_MAX_BYTES', DEFAULT_MAX_BYTES))
+    return ResultCache(directory, max_bytes)
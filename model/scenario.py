@@ -1,5 +1,12 @@
 """Base classes of all scenario objects"""
+import contextlib
+import dataclasses
+import functools
+import inspect
 import json
+import re
+import threading
+import numpy as np
 import pandas as pd
 import warnings
 import numbers
@@ -8,6 +15,7 @@ from model import integration
 from model import adoptiondata
 from model import advanced_controls
 from model import customadoption
+from model.data_handler import Deferred
 from model import helpertables
 from model import s_curve
 from model import tam
@@ -38,6 +46,164 @@ warnings.filterwarnings("ignore",message=".*invalid value.*",module=".*pandas.*"
 # we simplify and generalize the kinds of parameterization these classes support.
 
 
+# Lazy construction.
+# Solution __init__ methods eagerly compute unit adoption and cost tables just to pass them into
+# the FirstCost, OperatingCost, CH4Calcs and CO2Calcs constructors.  Inside a lazy_models() block,
+# the models assigned to the fields in LAZY_MODEL_FIELDS are replaced by proxies while the scenario
+# is being constructed, and method calls on those proxies return Deferred values instead of
+# results.  The receiving models resolve them the first time they are used, so building a scenario
+# only does the adoption work, and e.g. asking for the emissions reductions never computes costs.
+
+LAZY_MODEL_FIELDS = ('ef', 'ua', 'fc', 'oc', 'c4', 'c2')
+_lazy = threading.local()
+
+
+class _DeferringProxy:
+    """Stand-in for a model during lazy construction: method calls return Deferred results."""
+
+    def __init__(self, model):
+        self._model = model
+
+    def __getattr__(self, name):
+        value = getattr(self._model, name)
+        if callable(value) and not isinstance(value, type):
+            return lambda *args, **kwargs: Deferred(functools.partial(value, *args, **kwargs))
+        return value
+
+
+@contextlib.contextmanager
+def lazy_models():
+    """Construct scenarios lazily within this block (see LAZY_MODEL_FIELDS above).
+    Scenarios are fully usable once the block exits."""
+    outer = getattr(_lazy, 'proxies', None)
+    _lazy.proxies = proxies = []
+    try:
+        yield
+    finally:
+        _lazy.proxies = outer
+        for (scen, field, proxy) in proxies:
+            if scen.__dict__.get(field) is proxy:
+                object.__setattr__(scen, field, proxy._model)
+
+
+# Incremental recomputation.
+# Scenario.with_ac_changes builds a scenario with a modified AC by running the solution __init__
+# again, but each model assigned to one of the REUSABLE_MODEL_FIELDS is replaced by the model of the
+# original scenario if it would compute the same results: it has the same class, the same
+# constructor inputs (its public attributes, other than ac) and does not read any of the AC fields
+# that changed.  The reused models keep their cached results, so the models depending on them get
+# their inputs without recomputation, and only the models affected by the change are computed.
+# Which AC fields a model reads is found from the source of its class (see ac_fields_read); fields
+# the solution __init__ reads itself are covered by the comparison of the constructor inputs.
+
+REUSABLE_MODEL_FIELDS = ('tm', 'ae', 'ad', 'pds_ca', 'ref_ca', 'sc', 'ht', 'ef', 'ua', 'fc', 'oc',
+                         'c4', 'c2')
+_reuse = threading.local()
+
+_AC_READ = re.compile(r"""\bac\.(\w+)|\bac\[\s*['"](\w+)['"]\s*\]|getattr\(\s*(?:self\.)?ac\s*,\s*['"](\w+)['"]""")
+# reads we can't follow: the whole AC passed on or aliased, or fields looked up by a computed name
+_AC_DYNAMIC = re.compile(r"""[(,=]\s*self\.ac\s*[,)]|^\s*(?!self\.ac\b)[\w.]+\s*=\s*(?:self\.)?ac\s*$|"""
+                         r"""\bac\[\s*[^'"\s]|getattr\(\s*(?:self\.)?ac\s*,\s*[^'"\s]""", re.M)
+
+
+@functools.lru_cache(maxsize=None)
+def ac_fields_read(cls):
+    """Return the names of the AC fields and properties read by the methods of model class cls,
+    or None if that can't be determined from its source."""
+    names = set()
+    for klass in cls.__mro__[:-1]:
+        try:
+            source = inspect.getsource(klass)
+        except (OSError, TypeError):
+            return None
+        if _AC_DYNAMIC.search(source):
+            return None
+        names.update(next(filter(None, m.groups())) for m in _AC_READ.finditer(source))
+    ac_class = advanced_controls.AdvancedControls
+    if any(inspect.isfunction(getattr(ac_class, name, None)) for name in names):
+        return None  # calls an AC method
+    return frozenset(names)
+
+
+def _ac_values(ac):
+    values = {f.name: getattr(ac, f.name) for f in dataclasses.fields(ac)}
+    for (name, _) in inspect.getmembers(type(ac), lambda m: isinstance(m, property)):
+        try:
+            values[name] = getattr(ac, name)
+        except Exception as e:
+            values[name] = type(e)
+    return values
+
+
+def changed_ac_fields(ac1, ac2):
+    """Return the names of the fields and properties whose values differ between ac1 and ac2."""
+    (values1, values2) = (_ac_values(ac1), _ac_values(ac2))
+    return {name for name in values1.keys() | values2.keys()
+            if not _same_value(values1.get(name), values2.get(name))}
+
+
+def _same_value(a, b, reused=None):
+    """Whether a and b are equal, with models in reused (id(new) -> (new, old)) equal to the
+    models they replace."""
+    if a is b or (reused and reused.get(id(a), (None, None))[1] is b):
+        return True
+    if type(a) is not type(b):
+        return False
+    if isinstance(a, (pd.DataFrame, pd.Series)):
+        return a.equals(b) and a.index.equals(b.index) and (
+                not isinstance(a, pd.DataFrame) or a.columns.equals(b.columns))
+    if isinstance(a, np.ndarray):
+        return a.shape == b.shape and bool(((a == b) | (pd.isna(a) & pd.isna(b))).all())
+    if isinstance(a, (list, tuple)):
+        return len(a) == len(b) and all(_same_value(x, y, reused) for (x, y) in zip(a, b))
+    if isinstance(a, dict):
+        return a.keys() == b.keys() and all(_same_value(a[k], b[k], reused) for k in a)
+    if isinstance(a, float) and np.isnan(a):
+        return np.isnan(b)
+    try:
+        return bool(a == b)
+    except (TypeError, ValueError):
+        return False
+
+
+def _model_inputs(model):
+    """The public attributes of model (resolving Deferred values), other than ac."""
+    names = set(vars(model)) | set(vars(model).get('_deferred') or ())
+    return {name: getattr(model, name) for name in names
+            if not name.startswith('_') and name != 'ac'}
+
+
+class _ModelReuse:
+    """The state of a Scenario.with_ac_changes construction."""
+
+    def __init__(self, original, changed):
+        self.original = original
+        self.changed = changed
+        self.target = None
+        self.reused = {}  # id(new model) -> (new model, original model)
+
+    def model(self, scen, name, value):
+        """Return the model to assign to field name of scen: value, or the model it replaces."""
+        if self.target is None:
+            self.target = scen  # the first scenario to set a field is the one being built
+        if scen is not self.target or name not in REUSABLE_MODEL_FIELDS:
+            return value
+        old = self.original.__dict__.get(name)
+        if isinstance(old, _DeferringProxy):
+            old = old._model
+        if old is None or type(old) is not type(value) or old is value:
+            return value
+        reads = ac_fields_read(type(value))
+        if reads is None or reads & self.changed:
+            return value
+        (new_inputs, old_inputs) = (_model_inputs(value), _model_inputs(old))
+        if new_inputs.keys() != old_inputs.keys() or not all(
+                _same_value(v, old_inputs[k], self.reused) for (k, v) in new_inputs.items()):
+            return value
+        self.reused[id(value)] = (value, old)
+        return old
+
+
 class Scenario:
 
     # Public Fields common across all scenarios.
@@ -88,6 +254,43 @@ class Scenario:
     def key_inputs(self):
         return { x: self.ac[x] for x in self.key_parameters };
 
+    def ac_dependencies(self):
+        """Return {AC field or property: [model fields]}, the models of this scenario (among
+        REUSABLE_MODEL_FIELDS) whose methods read each AC value.  Models for which that can't be
+        determined are listed under every value."""
+        deps = {name: [] for name in _ac_values(self.ac)}
+        for field in REUSABLE_MODEL_FIELDS:
+            model = getattr(self, field, None)
+            if model is None:
+                continue
+            reads = ac_fields_read(type(getattr(model, '_model', model)))
+            for name in (deps if reads is None else reads):
+                deps.setdefault(name, []).append(field)
+        return {name: fields for (name, fields) in deps.items() if fields}
+
+    def with_ac_changes(self, **mods):
+        """Return a new scenario of this solution with self.ac.with_modifications(**mods),
+        reusing the models (and their cached results) which the modifications don't affect.
+        Reused models keep their reference to this scenario's ac, which differs from the new
+        one only in values they don't read."""
+        ac = self.ac.with_modifications(**mods)
+        outer = getattr(_reuse, 'state', None)
+        _reuse.state = _ModelReuse(self, changed_ac_fields(self.ac, ac))
+        try:
+            return type(self)(ac)
+        finally:
+            _reuse.state = outer
+
+    def __setattr__(self, name, value):
+        reuse = getattr(_reuse, 'state', None)
+        if reuse is not None and value is not None:
+            value = reuse.model(self, name, value)
+        proxies = getattr(_lazy, 'proxies', None)
+        if proxies is not None and name in LAZY_MODEL_FIELDS and value is not None:
+            value = _DeferringProxy(value)
+            proxies.append((self, name, value))
+        object.__setattr__(self, name, value)
+
     ##############################################################################################################
     # Initialize AC
 
@@ -0,0 +1,173 @@
+"""Monte Carlo sensitivity of key results to VMA-derived parameters.
+
+Advanced Controls parameters linked to a VMA statistic (e.g. {"value": 12.5, "statistic":
+"mean"}) are computed by VMA.avg_high_low.  This module draws many values of those parameters
+from the VMA source data instead (see VMA.sample) and returns the key results of the scenario
+for every draw, giving distributions rather than single points:
+
+    draws = sensitivity.run('improvedrice', n=5000, seed=1, workers=8)
+    draws.quantile([0.05, 0.5, 0.95])
+
+Evaluating one draw means building a Scenario, so two things keep thousands of draws cheap:
+  * Identical parameter vectors (common when sampling the empirical distribution of small
+    VMAs) are evaluated once.
+  * With method='auto', the key results are first evaluated at a few probe points: the
+    base scenario, each parameter at the lowest and highest drawn value, and all parameters
+    at their lowest and highest drawn values together.  Many parameters (operating costs,
+    emissions factors, sequestration rates) enter the key results linearly; if the probes
+    confirm that every key result is affine in the sampled parameters, all draws are computed
+    at once as a matrix product.  Otherwise, or with method='exact', every distinct draw is
+    evaluated, in worker processes if workers > 1.
+"""
+
+import dataclasses
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+from solution import factory
+
+# relative tolerance for accepting the affine model of method='auto'
+LINEAR_RTOL = 1e-9
+
+
+def vma_parameters(ac, parameters=None):
+    """Return a dict of parameter name -> VMA for the parameters of ac to sample.
+
+    By default these are the parameters whose value ac took from a VMA statistic, except those
+    with per region statistics.  parameters may instead list Advanced Controls field names
+    (which must have a VMA) or vma_values titles.
+    """
+    if parameters is None:
+        parameters = [name for (name, stat) in ac.vma_statistics.items()
+                      if not stat.endswith('per region')]
+    fields = {f.name: f for f in dataclasses.fields(ac)}
+    result = {}
+    for name in parameters:
+        titles = fields[name].metadata.get('vma_titles', []) if name in fields else [name]
+        for title in titles:
+            v = (ac.vmas or {}).get(title, None)
+            if v and not pd.isna(v.avg_high_low(key='mean')):
+                result[name] = v
+                break
+        else:
+            raise ValueError(f"{name} has no VMA with values to sample")
+    return result
+
+
+def sample_parameters(ac, n, parameters=None, seed=None, distribution='empirical'):
+    """Draw n values of each parameter (see vma_parameters) from its VMA (see VMA.sample).
+    Parameters taken from the same VMA (like pds_2014_cost and ref_2014_cost) get the same
+    values.  Returns a DataFrame with one row per draw and one column per parameter."""
+    rng = np.random.default_rng(seed)
+    drawn = {}
+    columns = {}
+    for (name, v) in vma_parameters(ac, parameters).items():
+        if id(v) not in drawn:
+            drawn[id(v)] = v.sample(n, rng=rng, distribution=distribution)
+        columns[name] = drawn[id(v)]
+    samples = pd.DataFrame(columns, index=range(n))
+    samples.index.name = 'draw'
+    return samples
+
+
+def _value(ac, name):
+    """The value of parameter name (a field or a vma_values title) in ac."""
+    if ac.vma_values and name in ac.vma_values:
+        return ac.vma_values[name]
+    return getattr(ac, name)
+
+
+def _modified_ac(ac, values):
+    """Return ac with the parameters in the dict values replaced."""
+    mods = {}
+    vma_values = dict(ac.vma_values or {})
+    for (name, value) in values.items():
+        if name in vma_values:
+            vma_values[name] = float(value)
+        else:
+            mods[name] = float(value)
+    if ac.vma_values:
+        mods['vma_values'] = vma_values
+    return ac.with_modifications(**mods)
+
+
+def _evaluate(solution, ac, draws):
+    """Return the key results of solution for each of a list of parameter dicts.  Runs in a
+    worker process of run for workers > 1."""
+    return [factory.load_scenario(solution, _modified_ac(ac, draw), lazy=True).get_key_results()
+            for draw in draws]
+
+
+def _evaluate_all(solution, ac, draws, workers):
+    if workers == 1 or len(draws) <= 1:
+        return _evaluate(solution, ac, draws)
+    chunks = np.array_split(np.arange(len(draws)), min(len(draws), workers * 4))
+    with ProcessPoolExecutor(max_workers=min(workers, len(chunks))) as executor:
+        futures = [executor.submit(_evaluate, solution, ac, [draws[i] for i in chunk])
+                   for chunk in chunks if len(chunk)]
+        return [kr for f in futures for kr in f.result()]
+
+
+def _linear_results(solution, ac, samples, workers):
+    """Return the key results of every draw if the probes show they are affine in the
+    parameters, else None."""
+    names = list(samples.columns)
+    base = pd.Series({name: _value(ac, name) for name in names}, dtype=float)
+    (low, high) = (samples.min(), samples.max())
+    moved = [name for name in names if high[name] != base[name]]
+    probes = [dict(base)]
+    probes += [dict(base, **{name: high[name]}) for name in moved]
+    probes += [dict(base, **{name: low[name]}) for name in moved if low[name] != base[name]]
+    probes += [dict(low), dict(high)]
+    results = pd.DataFrame(_evaluate_all(solution, ac, probes, workers), dtype=float)
+    x = pd.DataFrame(probes)[names].to_numpy() - base.to_numpy()
+    y = results.to_numpy() - results.to_numpy()[0]
+    slopes = np.zeros((len(names), y.shape[1]))
+    for (i, name) in enumerate(moved):
+        slopes[names.index(name)] = y[i + 1] / x[i + 1, names.index(name)]
+    scale = np.nanmax(np.abs(results.to_numpy()), axis=0, initial=1.0)
+    if not np.allclose(x @ slopes, y, rtol=0, atol=LINEAR_RTOL * scale, equal_nan=True):
+        return None
+    predicted = results.to_numpy()[0] + (samples.to_numpy() - base.to_numpy()) @ slopes
+    return pd.DataFrame(predicted, index=samples.index, columns=results.columns)
+
+
+def run(solution, scenario=None, n=1000, parameters=None, seed=None, distribution='empirical',
+        method='auto', workers=1):
+    """Draw n parameter vectors for a scenario and return the key results for each.
+
+    Arguments:
+      solution, scenario: as for factory.load_scenario (default: the PDS2 scenario).
+      n: number of draws.
+      parameters, distribution: see vma_parameters and VMA.sample.
+      seed: seed for the random number generator, for reproducible draws.
+      method: 'auto' to use the affine fast path when the probes allow it (see the module
+        documentation), 'exact' to evaluate every distinct draw.
+      workers: number of worker processes for evaluating draws, None for one per CPU.
+
+    Returns a DataFrame with one row per draw, holding the sampled parameters followed by
+    the key results.  Its attrs['method'] is 'linear' or 'exact', the method actually used.
+    """
+    if method not in ('auto', 'exact'):
+        raise ValueError(f"invalid method: {method}. must be 'auto' or 'exact'")
+    workers = workers or os.cpu_count()
+    ac = factory.scenario_ac(solution, scenario)
+    samples = sample_parameters(ac, n, parameters=parameters, seed=seed,
+                                distribution=distribution)
+    results = None
+    if method == 'auto' and len(samples.columns):
+        results = _linear_results(solution, ac, samples, workers)
+    used = 'linear' if results is not None else 'exact'
+    if results is None:
+        keys = [tuple(row) for row in samples.itertuples(index=False)]
+        unique = list(dict.fromkeys(keys))
+        evaluated = _evaluate_all(solution, ac, [dict(zip(samples.columns, k)) for k in unique],
+                                  workers)
+        by_key = dict(zip(unique, evaluated))
+        results = pd.DataFrame([by_key[k] for k in keys], index=samples.index, dtype=float)
+    draws = pd.concat([samples, results], axis=1)
+    draws.attrs['method'] = used
+    return draws
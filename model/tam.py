@@ -4,6 +4,7 @@ from functools import lru_cache
 import pathlib
 import re
 
+from model import data_sources
 from model import dd
 from model.metaclass_cache import MetaclassCache
 from model import interpolation
@@ -108,7 +109,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                    df = data_sources.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
                             skip_blank_lines=True, comment='#').reindex(columns=regions)
                     for region in regions:
                         df_per_region[region][name] = df[region]
@@ -121,7 +122,7 @@ class TAM(DataHandler, object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                    df = data_sources.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
                             skip_blank_lines=True, comment='#', usecols=["Year", main_region])
                     df_per_region[main_region_pds][name] = df[main_region]
 
@@ -3,6 +3,8 @@
 import json
 import os
 import pathlib
+import subprocess
+import sys
 import tempfile
 
 import numpy as np
@@ -317,6 +319,14 @@ def test_from_json_with_stats():
     assert ac.conv_2014_cost == pytest.approx(15.0)
     assert ac.lookup_vma("MY VMA HAS A FIRST NAME") == pytest.approx(-1.0)
     assert ac.lookup_vma("ITS OSCAR") == pytest.approx(-10.0)
+    names = advanced_controls.scenario_names_from_json(directory=datadir.joinpath('ac'))
+    assert names == list(l.keys())
+    lazy = advanced_controls.load_scenarios_from_json(directory=datadir.joinpath('ac'), vmas=vmas, lazy=True)
+    assert isinstance(lazy, advanced_controls.ScenarioDirectory)
+    assert list(lazy.keys()) == names
+    assert lazy['ac_with_stats'] is lazy['ac_with_stats']
+    assert lazy['ac_with_stats'].pds_2014_cost == pytest.approx(10.0)
+    assert 'no such scenario' not in lazy and lazy.get('no such scenario') is None
 
 
 def test_to_json():
@@ -387,6 +397,37 @@ def test_with_modifications():
 
 
 
+def test_fingerprint():
+    ac1 = advanced_controls.AdvancedControls(name='one', pds_2014_cost=100.0,
+            soln_pds_adoption_regional_data=False, solution_category='REDUCTION',
+            vma_values={'Some VMA': pd.Series([1.0, nan], index=['World', 'OECD90'])})
+    ac2 = advanced_controls.AdvancedControls(name='two', pds_2014_cost=100.0,
+            soln_pds_adoption_regional_data=False,
+            solution_category=advanced_controls.SOLUTION_CATEGORY.REDUCTION,
+            vma_values={'Some VMA': pd.Series([1.0, nan], index=['World', 'OECD90'])})
+    assert ac1.fingerprint() == ac2.fingerprint()
+    assert hash(ac1) == hash(ac2)
+    assert ac1 == ac2
+    assert len({ac1, ac2}) == 1
+    ac3 = ac1.with_modifications(pds_2014_cost=100.0 + 1e-12)
+    assert ac3.fingerprint() != ac1.fingerprint()
+    assert ac3 != ac1
+    assert ac1.with_modifications(name='three') == ac1
+    ac4 = ac1.with_modifications(vma_values={'Some VMA': pd.Series([1.0, 2.0], index=['World', 'OECD90'])})
+    assert ac4.fingerprint() != ac1.fingerprint()
+
+
+def test_fingerprint_is_stable_across_processes():
+    code = ("from model import advanced_controls as a; "
+            "print(a.AdvancedControls(pds_2014_cost=100.0, emissions_grid_source='ipcc_only').fingerprint())")
+    root = str(pathlib.Path(__file__).parents[2])
+    env = dict(os.environ, PYTHONHASHSEED='12345', PYTHONPATH=root)
+    out = subprocess.run([sys.executable, '-c', code], env=env, cwd=root, check=True,
+                         capture_output=True, text=True).stdout.strip()
+    ac = advanced_controls.AdvancedControls(pds_2014_cost=100.0, emissions_grid_source='ipcc_only')
+    assert out == ac.fingerprint()
+
+
 def test_vma_to_param_names():
     result = advanced_controls.get_vma_for_param('yield_gain_from_conv_to_soln')
     assert 'Yield Gain (% Increase from CONVENTIONAL to SOLUTION)' in result
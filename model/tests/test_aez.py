@@ -1,5 +1,7 @@
+import os
 import pytest
 from model import aez
+from model import result_cache
 
 
 @pytest.mark.slow
@@ -50,3 +52,35 @@ def test_tropical_tree_staples():
     ae = aez.AEZ('Tropical Tree Staples')
     result = ae.soln_land_dist_df
     assert result is not None
+
+
+def test_allocation_cube_follows_csv_changes(tmp_path, monkeypatch):
+    source = tmp_path / 'allocation2018' / 'Tropical_Humid' / 'AEZ3_Forest_good_moderate.csv'
+    source.parent.mkdir(parents=True)
+    source.write_text("Solution,Total % allocated\nsilvopasture,0.25\n")
+    monkeypatch.setattr(aez, 'LAND_CSV_PATH', tmp_path)
+    monkeypatch.delenv('DRAWDOWN_RESULT_CACHE', raising=False)
+    args = ('silvopasture', 'Tropical_Humid', 'AEZ3_Forest_good_moderate')
+    assert aez.AllocationCube.load(2018).total_allocated(*args) == 0.25
+    assert aez.AllocationCube.load(2018) is aez.AllocationCube.load(2018)
+    source.write_text("Solution,Total % allocated\nsilvopasture,0.5\n")
+    st = source.stat()
+    os.utime(source, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert aez.AllocationCube.load(2018).total_allocated(*args) == 0.5
+
+
+def test_allocation_cube_is_persisted(tmp_path, monkeypatch):
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path))
+    aez.AllocationCube._load.cache_clear()
+    try:
+        built = aez.AllocationCube.load(2018)
+        assert len(list(result_cache.cache_directory('land').glob('allocation2018-*.npy'))) == 1
+        aez.AllocationCube._load.cache_clear()
+        loaded = aez.AllocationCube.load(2018)
+        assert loaded.values.shape == built.values.shape
+        assert loaded.total_allocated('Tropical Forest Restoration', 'Tropical_Humid',
+                'AEZ3_Forest_good_moderate') == pytest.approx(0.245464949942429)
+        with pytest.raises(KeyError):
+            loaded.total_allocated('No Such Solution', 'Tropical_Humid', 'AEZ3_Forest_good_moderate')
+    finally:
+        aez.AllocationCube._load.cache_clear()
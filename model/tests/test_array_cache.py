@@ -0,0 +1,81 @@
+"""Tests for array_cache.py"""
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import array_cache
+
+
+def _counting_func(maxsize=2):
+    calls = []
+
+    @array_cache.array_cache(maxsize=maxsize)
+    def func(df, factor):
+        calls.append(factor)
+        return df * factor
+    return func, calls
+
+
+def test_hit_on_equal_content():
+    func, calls = _counting_func()
+    a = func(pd.DataFrame(1.0, index=[2014, 2015], columns=['World']), 2)
+    b = func(pd.DataFrame(1.0, index=[2014, 2015], columns=['World']), 2)
+    assert a is b
+    assert len(calls) == 1
+    assert func.cache_info() == array_cache.CacheInfo(hits=1, misses=1, maxsize=2, currsize=1)
+
+
+def test_passes_original_arguments():
+    seen = []
+
+    @array_cache.array_cache()
+    def func(s):
+        seen.append(s)
+        return s.sum()
+    s = pd.Series([0.1, 0.2], index=[2014, 2015])
+    func(s)
+    assert seen[0] is s
+
+
+def test_miss_on_different_content_or_labels():
+    func, calls = _counting_func(maxsize=None)
+    df = pd.DataFrame(1.0, index=[2014, 2015], columns=['World'])
+    func(df, 2)
+    func(df + 1e-12, 2)
+    func(df.rename(columns={'World': 'OECD90'}), 2)
+    func(df.set_axis([2015, 2016]), 2)
+    func(df, 3)
+    assert len(calls) == 5
+
+
+def test_lru_eviction():
+    func, calls = _counting_func(maxsize=2)
+    dfs = [pd.DataFrame(float(i), index=[1], columns=['A']) for i in range(3)]
+    func(dfs[0], 1)
+    func(dfs[1], 1)
+    func(dfs[0], 1)  # refresh dfs[0], dfs[1] is now least recently used
+    func(dfs[2], 1)  # evicts dfs[1]
+    func(dfs[0], 1)
+    assert len(calls) == 3
+    func(dfs[1], 1)
+    assert len(calls) == 4
+    assert func.cache_info().currsize == 2
+
+
+def test_cache_clear_and_stats():
+    func, _ = _counting_func()
+    func(pd.DataFrame([[1.0]]), 1)
+    name = f"{__name__}._counting_func.<locals>.func"
+    assert array_cache.cache_stats()[name].misses == 1
+    func.cache_clear()
+    assert func.cache_info() == array_cache.CacheInfo(hits=0, misses=0, maxsize=2, currsize=0)
+
+
+def test_digest():
+    df = pd.DataFrame({'A': [1.0, np.nan], 'B': ['x', 'y']})
+    assert array_cache.digest(df) == array_cache.digest(df.copy())
+    assert array_cache.digest(df) != array_cache.digest(df.assign(B=['x', 'z']))
+    assert array_cache.digest(np.arange(3.0)) != array_cache.digest(np.arange(3))
+    assert array_cache.digest(7) == 7
+    with pytest.raises(TypeError):
+        array_cache.digest({'a': 1})
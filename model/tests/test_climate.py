@@ -0,0 +1,68 @@
+"""Tests for climate.py"""
+
+import numpy as np
+import pandas as pd
+from fair.RCPs import rcp45
+from model import climate
+from model import fairutil
+from model import result_cache
+
+
+def test_rcp_emissions_is_a_copy():
+    before = rcp45.Emissions.emissions.copy()
+    e = climate.rcp_emissions('rcp45')
+    assert list(e.columns) == climate.EMISSIONS_COLUMNS
+    assert e.index[0] == 1765 and e.index[-1] == 2500
+    e.iloc[:, 1] = 0.0
+    np.testing.assert_array_equal(rcp45.Emissions.emissions, before)
+
+
+def test_drawdown_emissions():
+    before = rcp45.Emissions.emissions.copy()
+    reductions = pd.DataFrame({'CO2 (Gt-C)': 1.0, 'CH4 (Mt-CH4)': 2.0, 'N2O (Mt-N2O)': 3.0},
+                              index=range(2014, 2061))
+    e = climate.drawdown_emissions('rcp45', reductions)
+    base = climate.rcp_emissions('rcp45')
+    diff = base - e
+    reduced = diff.loc[2014:2060, ['FossilCO2 (Gt-C)', 'CH4 (Mt-CH4)', 'N2O (Mt-N2O)']]
+    np.testing.assert_allclose(reduced.values, np.tile([1.0, 2.0, 3.0], (47, 1)), rtol=1e-9)
+    assert (diff.loc[:2013] == 0).all().all()
+    assert (diff.loc[2061:] == 0).all().all()
+    np.testing.assert_array_equal(rcp45.Emissions.emissions, before)
+
+
+def test_run_batch():
+    kwargs = fairutil.fair_scm_kwargs()
+    base = np.linspace(5.0, 10.0, 60)
+    stack = np.stack([base, base * 0.9, base * 0.5])
+    result = climate.run_batch(stack, useMultigas=False, **kwargs)
+    assert result.T.shape == (3, 60)
+    single = climate.run(stack[1], useMultigas=False, **kwargs)
+    np.testing.assert_array_equal(result.C[1], single.C)
+    np.testing.assert_array_equal(result.T[1], single.T)
+    assert result.T[0, -1] > result.T[1, -1] > result.T[2, -1]
+    parallel = climate.run_batch(stack, useMultigas=False, workers=2, **kwargs)
+    np.testing.assert_array_equal(parallel.T, result.T)
+
+
+def test_rcp_baseline_is_persisted(tmp_path, monkeypatch):
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path))
+    climate.rcp_baseline.cache_clear()
+    try:
+        first = climate.rcp_baseline('rcp3')
+        assert len(list(result_cache.cache_directory('fair').glob('rcp3-*.npz'))) == 1
+        climate.rcp_baseline.cache_clear()
+        second = climate.rcp_baseline('rcp3')
+        np.testing.assert_array_equal(first.T, second.T)
+        np.testing.assert_array_equal(first.F, second.F)
+        assert not second.T.flags.writeable
+    finally:
+        climate.rcp_baseline.cache_clear()
+
+
+def test_drawdown_batch_matches_baseline(monkeypatch):
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', '0')
+    zero = pd.DataFrame(0.0, index=range(2014, 2061), columns=['CO2', 'CH4', 'N2O'])
+    batch = climate.drawdown_batch('rcp45', [zero, zero + 1.0])
+    np.testing.assert_array_equal(batch.T[0], climate.rcp_baseline('rcp45').T)
+    assert batch.T[1][-1] < batch.T[0][-1]
@@ -207,6 +207,22 @@ def test_co2_ppm_calculator_land_with_avoided_emissions():
             pd.testing.assert_frame_equal(c2.co2_ppm_calculator(), expected, check_dtype=False)
 
 
+def test_co2_ppm_calculator_array_skips_before_report_start_year():
+    co2_vals = pd.Series(1.0, index=range(2015, 2061))
+    rrs = co2calcs.co2_ppm_calculator_array(co2_vals, SOLUTION_CATEGORY.REDUCTION, 2020)
+    land = co2calcs.co2_ppm_calculator_array(co2_vals, SOLUTION_CATEGORY.LAND, 2020)
+    assert (rrs.loc[:, 2015:2019] == 0.0).all(axis=None)
+    assert (land.loc[2015:, 2015] > 0.0).all()
+    assert rrs.at[2020, 2020] == land.at[2020, 2020]
+    kernel = co2calcs.co2_decay_kernel(46)
+    assert rrs.at[2020, 2020] == pytest.approx(0.217 + 0.259 * np.exp(-1 / 172.9) +
+            0.338 * np.exp(-1 / 18.51) + 0.186 * np.exp(-1 / 1.186))
+    assert land.at[2060, 2015] == kernel[45]
+    assert (land.loc[2015, 2016:] == 0.0).all()
+    assert land.at[2060, 'Total'] == pytest.approx(kernel.sum())
+    assert land.at[2060, 'PPM'] == pytest.approx(kernel.sum() / (44.01 * 1.8 * 100))
+
+
 def test_co2eq_ppm_calculator():
     soln_pds_net_grid_electricity_units_saved = pd.DataFrame([[1.0, 1.0], [1.0, 1.0], [1.0, 1.0]],
             columns=["World", "B"], index=[2020, 2021, 2022])
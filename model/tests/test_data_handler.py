@@ -5,7 +5,7 @@ from model import advanced_controls
 from model import ch4calcs
 import pytest
 
-from model.data_handler import DataHandler
+from model.data_handler import DataHandler, Deferred
 
 @pytest.mark.skip(reason="ch4 updates have broken this example")
 def test_ch4_tons_reduced():
@@ -28,6 +28,59 @@ def test_ch4_tons_reduced():
     assert existing_key == True
     pd.testing.assert_frame_equal(json_data['ch4_tons_reduced'].loc[2015:], expected, check_exact=False)
 
+def test_deferred_attribute():
+    calls = []
+    def compute():
+        calls.append(1)
+        return 42
+
+    class Handler(DataHandler):
+        cls_value = None
+
+        def __init__(self):
+            self.value = Deferred(compute)
+            self.cls_value = Deferred(lambda: 'eager')
+
+    h = Handler()
+    assert calls == []
+    assert h.cls_value == 'eager'  # class attributes would hide a pending value
+    assert h.value == 42
+    assert h.value == 42
+    assert calls == [1]
+    h.value = Deferred(compute)
+    h.value = 7
+    assert h.value == 7
+    assert calls == [1]
+    with pytest.raises(AttributeError):
+        h.no_such_attribute
+
+def test_to_json_does_not_modify_results():
+    from model.decorators import data_func
+    import numpy as np
+    df = pd.DataFrame([[1.0, np.nan, 3.0]], index=pd.Index([2015], name='Year'),
+                      columns=['World', 'OECD90', np.int64(5)])
+    class Handler(DataHandler):
+        @data_func
+        def table(self):
+            return df
+        @data_func
+        def with_argument(self, x):
+            return x
+        @data_func
+        def scalar(self):
+            return 4
+    h = Handler()
+    assert Handler.table_names() == ('scalar', 'table')
+    result = h.to_json(regions=['World'])
+    assert result['scalar'] == 4
+    assert list(result['table'].columns) == ['World']
+    assert list(df.columns) == ['World', 'OECD90', np.int64(5)]
+    result = h.to_json()
+    assert list(result['table'].columns) == ['World', 'OECD90', '5']
+    assert result['table'].loc[2015, 'OECD90'] == 0.0
+    assert np.isnan(df.loc[2015, 'OECD90'])
+
+
 # 'Unit Adoption'!B251:L298
 soln_net_annual_funits_adopted_list = [
     ["Year", "World", "OECD90", "Eastern Europe", "Asia (Sans Japan)", "Middle East and Africa", "Latin America",
@@ -0,0 +1,53 @@
+"""Tests for data_sources.py"""
+
+import io
+import os
+
+import pandas as pd
+from model import data_sources
+
+
+def test_read_csv_parses_once(tmp_path):
+    data_sources.clear()
+    filename = tmp_path / 'source.csv'
+    filename.write_text("Year,World,OECD90\n2014,1.0,2.0\n2015,3.0,4.0\n")
+    first = data_sources.read_csv(filename, index_col=0)
+    second = data_sources.read_csv(str(filename), index_col=0)
+    pd.testing.assert_frame_equal(first, second)
+    assert first is not second
+    stats = data_sources.stats()
+    assert (stats.hits, stats.misses, stats.files_read, stats.entries) == (1, 1, 1, 1)
+    assert stats.bytes_read == filename.stat().st_size
+    data_sources.read_csv(filename, index_col=0, usecols=['Year', 'World'])
+    assert data_sources.stats().files_read == 2
+
+
+def test_read_csv_copies_are_independent(tmp_path):
+    filename = tmp_path / 'source.csv'
+    filename.write_text("Year,World\n2014,1.0\n2015,3.0\n")
+    df = data_sources.read_csv(filename, index_col=0)
+    df.iloc[0, 0] = 5.0
+    df.loc[2015, 'World'] += 1.0
+    df.index = df.index.astype(float)
+    df['World'] = df['World'] * 2
+    again = data_sources.read_csv(filename, index_col=0)
+    assert again.loc[2014, 'World'] == 1.0
+    assert again.loc[2015, 'World'] == 3.0
+    assert again.index.dtype == 'int64'
+
+
+def test_read_csv_reparses_changed_file(tmp_path):
+    filename = tmp_path / 'source.csv'
+    filename.write_text("Year,World\n2014,1.0\n")
+    assert data_sources.read_csv(filename, index_col=0).loc[2014, 'World'] == 1.0
+    filename.write_text("Year,World\n2014,22.0\n")
+    st = filename.stat()
+    os.utime(filename, ns=(st.st_atime_ns, st.st_mtime_ns + 10**9))
+    assert data_sources.read_csv(filename, index_col=0).loc[2014, 'World'] == 22.0
+
+
+def test_read_csv_buffer_is_not_cached():
+    data_sources.clear()
+    df = data_sources.read_csv(io.StringIO("Year,World\n2014,1.0\n"), index_col=0)
+    assert df.loc[2014, 'World'] == 1.0
+    assert data_sources.stats().entries == 0
@@ -0,0 +1,36 @@
+"""Tests for export.py."""
+
+import io
+import json
+
+import numpy as np
+import pandas as pd
+from model import export
+from solution import factory
+
+
+def test_write_json():
+    scenario = factory.load_scenario('solarpvutil', 'PDS2')
+    f = io.StringIO()
+    export.write_json(scenario, f, regions=['World', 'OECD90'])
+    result = json.loads(f.getvalue())
+    assert result['key_results'] == json.loads(json.dumps(scenario.get_key_results()))
+    expected = scenario.ua.to_json(regions=['World', 'OECD90'])
+    table = result['tables']['ua']['ref_tam_per_capita']
+    df = pd.DataFrame(table['data'], index=table['index'], columns=table['columns'])
+    assert list(df.columns) == ['World', 'OECD90']
+    pd.testing.assert_frame_equal(df, expected['ref_tam_per_capita'],
+                                  check_names=False, check_index_type=False)
+    assert set(result['tables']['ua']) == set(expected)
+    # the cached results still have all regions
+    assert 'USA' in scenario.ua.ref_tam_per_capita().columns
+
+
+def test_binary_round_trip(tmp_path):
+    scenario = factory.load_scenario('solarpvutil', 'PDS2')
+    export.write_binary(scenario, tmp_path / 'pds2.npz')
+    result = export.read_binary(tmp_path / 'pds2.npz')
+    assert result['key_results'] == scenario.get_key_results()
+    pd.testing.assert_frame_equal(result['tables']['ua']['ref_tam_per_capita'],
+                                  scenario.ua.ref_tam_per_capita())
+    np.testing.assert_equal(set(result['tables']), set(export.scenario_tables(scenario)))
@@ -177,6 +177,30 @@ g_data_sources = {
 g_all_data_sources = ['Ambitious 1', 'Ambitious 2', 'Baseline 1', 'Conservative 1']
 
 
+def test_fit_trends():
+    low_med_high = pd.DataFrame(adoption_low_med_high_list[1:],
+                                columns=adoption_low_med_high_list[0], dtype=np.float64).set_index('Year')
+    with_nan = pd.DataFrame(tam_low_med_high_NaN_years_list[1:],
+                            columns=tam_low_med_high_NaN_years_list[0], dtype=np.float64).set_index('Year')
+    data = pd.DataFrame({'Medium': low_med_high['Medium'], 'High': low_med_high['High'],
+                         'Sparse': with_nan['Medium'], 'Empty': np.nan})
+    result = itrp.fit_trends(data)
+    for trend in itrp.TRENDS:
+        for column in data.columns:
+            expected = itrp.trend_algorithm(data=data[column], trend=trend)
+            pd.testing.assert_frame_equal(result[(trend, column)], expected, check_exact=False,
+                                          check_names=False, rtol=1e-12)
+    assert result[('degree3', 'Empty')].isna().all().all()
+
+
+def test_trend_name():
+    assert itrp.trend_name('3rd Poly') == 'degree3'
+    assert itrp.trend_name('Exp') == 'exponential'
+    assert itrp.trend_name('single source') == 'single'
+    with pytest.raises(ValueError):
+        itrp.trend_name('4th poly')
+
+
 def test_matching_data_sources():
     assert sorted(itrp.matching_data_sources(data_sources=g_data_sources,
                                              name='Ambitious Cases', groups_only=False)) == sorted(
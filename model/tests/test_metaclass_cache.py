@@ -1,6 +1,9 @@
 """Tests for metaclass_cache.py"""
 
+import numpy as np
 import pandas as pd
+import pytest
+from model import metaclass_cache
 from model.metaclass_cache import MetaclassCache
 
 # test_tam.py also exercises metaclass_cache.
@@ -32,3 +35,65 @@ def test_cache():
     a = MemoizedClass(df=df, number=6, number2=6)
     b = MemoizedClass(df=df, number=7, number2=7)
     assert a is not b
+
+
+@pytest.fixture
+def small_cache():
+    metaclass_cache.cache_clear()
+    metaclass_cache.set_limits(maxsize=2)
+    yield
+    metaclass_cache.set_limits()
+
+
+def test_lru_eviction(small_cache):
+    a = MemoizedClass(df=None, number=1, number2=0)
+    b = MemoizedClass(df=None, number=2, number2=0)
+    assert MemoizedClass(df=None, number=1, number2=0) is a  # b is now least recently used
+    MemoizedClass(df=None, number=3, number2=0)
+    assert MemoizedClass(df=None, number=1, number2=0) is a
+    assert MemoizedClass(df=None, number=2, number2=0) is not b
+    info = metaclass_cache.cache_info()
+    assert (info.hits, info.misses, info.maxsize, info.currsize) == (2, 4, 2, 2)
+
+
+def test_byte_budget(small_cache):
+    class Holder(object, metaclass=MetaclassCache):
+        def __init__(self, n):
+            self.data = np.zeros(n)
+    metaclass_cache.set_limits(maxsize=None, max_bytes=12000)
+    first = Holder(1000)
+    assert Holder(1000) is first
+    Holder(1001)
+    assert metaclass_cache.cache_info().currsize == 1
+    assert Holder(1000) is not first
+    assert metaclass_cache.cache_info().bytes >= 8000
+
+
+def test_sizes_are_estimated_once(small_cache, monkeypatch):
+    class Holder(object, metaclass=MetaclassCache):
+        def __init__(self, n):
+            self.data = np.zeros(n)
+    estimated = []
+    real = metaclass_cache._estimate_bytes
+    def estimate(value, depth=0):
+        if depth == 0:
+            estimated.append(value)
+        return real(value, depth)
+    monkeypatch.setattr(metaclass_cache, '_estimate_bytes', estimate)
+    metaclass_cache.set_limits(maxsize=None, max_bytes=10**6)
+    first = Holder(10)
+    for n in range(11, 15):
+        Holder(n)
+    assert Holder(10) is first
+    assert len(estimated) == 5
+    assert metaclass_cache.cache_info().bytes == sum(real(obj) for obj in estimated)
+
+
+def test_key_is_content_digest():
+    df = pd.DataFrame(0.0, index=range(1000), columns=['A', 'B'])
+    key = metaclass_cache.hash_item(df)
+    assert isinstance(key, bytes) and len(key) == 16
+    assert metaclass_cache.hash_item(df.copy()) == key
+    assert metaclass_cache.hash_item(df + 1) != key
+    assert (metaclass_cache.hash_item([{'name': 'a', 'include': True}]) ==
+            metaclass_cache.hash_item([{'include': True, 'name': 'a'}]))
@@ -640,6 +640,26 @@ def test_conv_ref_annual_breakout_land():
     assert result.loc[2015, 2015] == 7.0
 
 
+@pytest.mark.parametrize('lifetime_replacement,report_end_year,has_var_costs,fixed_cost', [
+        (24.000000000000058, 2050, False, 23.18791293579),
+        (26.249689349122, 2050, True, 32.95140431108),
+        (2.5, 2060, True, 0.0),
+        (0, 2030, False, 7.0),
+        (10.0, 2050, False, 0.0),
+    ])
+def test_annual_breakout_array_matches_loop(lifetime_replacement, report_end_year,
+        has_var_costs, fixed_cost):
+    index = range(2012, 2061)
+    new_funits_per_year = pd.Series(np.linspace(-5.0, 80.0, len(index)), index=index)
+    new_annual_iunits_reqd = pd.Series(np.linspace(0.01, 3.0, len(index)), index=index)
+    args = (lifetime_replacement, 0.00375269040, 0.0731, fixed_cost, report_end_year,
+            has_var_costs, 10 ** 9, 10 ** 9)
+    expected = operatingcost.annual_breakout(new_funits_per_year, new_annual_iunits_reqd, *args)
+    result = operatingcost.annual_breakout_array(new_funits_per_year,
+            new_annual_iunits_reqd, *args)
+    pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9, atol=1e-9)
+
+
 def test_cashflow_no_fractional_years():
     soln_pds_install_cost_per_iunit = pd.Series(soln_pds_install_cost_per_iunit_nparray[:, 1],
             index=soln_pds_install_cost_per_iunit_nparray[:, 0], dtype=np.float64)
@@ -0,0 +1,36 @@
+"""Tests for profiling.py."""
+
+import pandas as pd
+from model import profiling
+from model import unitadoption
+from solution import factory
+
+
+def test_profile():
+    original = vars(unitadoption.UnitAdoption)['soln_pds_tot_iunits_reqd']
+    with profiling.profile() as prof:
+        scenario = factory.load_scenario('solarpvutil', 'PDS2')
+        assert vars(unitadoption.UnitAdoption)['soln_pds_tot_iunits_reqd'] is not original
+        scenario.get_key_results()
+        scenario.ua.soln_pds_tot_iunits_reqd()
+    assert vars(unitadoption.UnitAdoption)['soln_pds_tot_iunits_reqd'] is original
+    records = prof.records()
+    assert list(records.columns) == profiling.COLUMNS
+    assert set(records['solution']) == {'solarpvutil'}
+    assert set(records['scenario']) == {scenario.scenario}
+    row = records[records['method'] == 'UnitAdoption.soln_pds_tot_iunits_reqd'].iloc[0]
+    assert row['calls'] == row['hits'] + row['misses'] and row['misses'] == 1 and row['hits'] >= 1
+    assert row['output_bytes'] > 0
+    assert (records['self_seconds'] <= records['seconds'] + 1e-9).all()
+    folded = prof.folded()
+    assert all(line.startswith(f'solarpvutil;{scenario.scenario};') for line in folded)
+    assert any('CO2Calcs.co2eq_mmt_reduced;' in line for line in folded)
+
+
+def test_write(tmp_path):
+    with profiling.profile() as prof:
+        factory.load_scenario('solarpvutil', 'PDS2').get_key_results()
+    prof.write(tmp_path / 'profile.csv')
+    prof.write(tmp_path / 'profile.folded')
+    assert len(pd.read_csv(tmp_path / 'profile.csv')) == len(prof.records())
+    assert (tmp_path / 'profile.folded').read_text().splitlines() == prof.folded()
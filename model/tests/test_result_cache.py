@@ -0,0 +1,104 @@
+"""Tests for result_cache.py"""
+
+import os
+import types
+
+import numpy as np
+import pandas as pd
+import pytest
+from model import result_cache
+
+
+def _outputs():
+    df = pd.DataFrame({'World': [1.0, np.nan], 'OECD90': [2.5, 3.5]},
+                      index=pd.Index([2014, 2015], name='Year'))
+    df.name = 'soln_pds_funits_adopted'
+    mi = pd.DataFrame([[1, 'a'], [2, 'b']],
+                      columns=pd.MultiIndex.from_tuples([('x', 'y'), ('x', 'z')]))
+    mixed = pd.Series([1, 'two', None], name='mixed')
+    return {'key_results': {'implementation_unit_adoption_increase': 12.5},
+            'tables': {'ua': {'funits': df, 'tuple': (df, pd.Series([0.5], index=['World'])),
+                              'multi': mi, 'mixed': mixed, 'array': np.arange(3.0),
+                              'scalar': np.float64(0.25)}}}
+
+
+def test_round_trip(tmp_path):
+    cache = result_cache.ResultCache(tmp_path)
+    expected = _outputs()
+    assert cache.get('solar', 'k') is None
+    cache.put('solar', 'k', expected)
+    result = cache.get('solar', 'k')
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert result['key_results'] == expected['key_results']
+    ua, exp = result['tables']['ua'], expected['tables']['ua']
+    pd.testing.assert_frame_equal(ua['funits'], exp['funits'])
+    assert ua['funits'].name == 'soln_pds_funits_adopted'
+    assert isinstance(ua['tuple'], tuple)
+    pd.testing.assert_series_equal(ua['tuple'][1], exp['tuple'][1])
+    pd.testing.assert_frame_equal(ua['multi'], exp['multi'])
+    pd.testing.assert_series_equal(ua['mixed'], exp['mixed'])
+    np.testing.assert_array_equal(ua['array'], exp['array'])
+    assert ua['scalar'] == 0.25
+
+
+def test_evicts_least_recently_used(tmp_path):
+    cache = result_cache.ResultCache(tmp_path)
+    for key in ['a', 'b', 'c']:
+        cache.put('solar', key, _outputs())
+    paths = {p.stem: p for p in cache.entries()}
+    for (i, key) in enumerate(['b', 'a', 'c']):
+        os.utime(paths[key], ns=(i * 10**9, i * 10**9))
+    cache.max_bytes = cache.size() - 1
+    cache.evict()
+    assert sorted(p.stem for p in cache.entries()) == ['a', 'c']
+    cache.clear()
+    assert cache.entries() == []
+
+
+def test_default_cache(monkeypatch, tmp_path):
+    monkeypatch.delenv('DRAWDOWN_RESULT_CACHE', raising=False)
+    assert result_cache.default_cache() is None
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', '0')
+    assert result_cache.default_cache() is None
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', '1')
+    assert result_cache.default_cache().directory == result_cache.DEFAULT_DIRECTORY
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path))
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE_MAX_BYTES', '1000')
+    cache = result_cache.default_cache()
+    assert (cache.directory, cache.max_bytes) == (tmp_path, 1000)
+
+
+def test_cache_directory(monkeypatch, tmp_path):
+    monkeypatch.delenv('DRAWDOWN_RESULT_CACHE', raising=False)
+    assert result_cache.cache_directory('fair') is None
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path))
+    other = result_cache.cache_directory('fair')
+    other.mkdir(parents=True)
+    (other / 'rcp45.npz').write_bytes(b'baseline')
+    cache = result_cache.default_cache()
+    cache.put('solar', 'k', _outputs())
+    assert [p.stem for p in cache.entries()] == ['k']
+    cache.clear()
+    assert (other / 'rcp45.npz').is_file()
+
+
+def test_corrupt_entry_is_a_miss(tmp_path):
+    cache = result_cache.ResultCache(tmp_path)
+    cache.put('solar', 'k', _outputs())
+    cache.entries()[0].write_bytes(b'not a zip file')
+    assert cache.get('solar', 'k') is None
+    assert cache.misses == 1
+
+
+def test_cache_key_integration(monkeypatch):
+    ac = types.SimpleNamespace(fingerprint=lambda: 'ac')
+    monkeypatch.delenv('DDINTEGRATE', raising=False)
+    plain = result_cache.cache_key('solarpvutil', ac)
+    monkeypatch.setenv('DDINTEGRATE', 'int2021')
+    integrated = result_cache.cache_key('solarpvutil', ac)
+    assert plain != integrated and 'int2021' in integrated
+
+
+def test_unstorable_value(tmp_path):
+    with pytest.raises(TypeError):
+        result_cache.ResultCache(tmp_path).put('solar', 'k', {'x': object()})
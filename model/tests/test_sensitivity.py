@@ -0,0 +1,27 @@
+"""Tests for sensitivity.py"""
+
+import numpy as np
+import pytest
+from model import sensitivity
+from solution import factory
+
+
+def test_sample_parameters():
+    ac = factory.scenario_ac('biochar')
+    samples = sensitivity.sample_parameters(ac, 50, seed=2)
+    assert set(samples.columns) == set(ac.vma_statistics)
+    assert len(samples) == 50
+    # both come from the 'SOLUTION First Cost per Implementation Unit' VMA
+    np.testing.assert_array_equal(samples['pds_2014_cost'], samples['ref_2014_cost'])
+    with pytest.raises(ValueError):
+        sensitivity.sample_parameters(ac, 5, parameters=['report_start_year'])
+
+
+def test_run_linear_matches_exact():
+    linear = sensitivity.run('improvedrice', n=8, seed=3)
+    exact = sensitivity.run('improvedrice', n=8, seed=3, method='exact')
+    assert linear.attrs['method'] == 'linear'
+    assert exact.attrs['method'] == 'exact'
+    assert 'net_operating_savings' in exact.columns
+    np.testing.assert_allclose(linear.to_numpy(), exact.to_numpy(), rtol=1e-9, atol=1e-9)
+    assert exact['net_operating_savings'].nunique() > 1
@@ -177,6 +177,27 @@ def test_pds_cumulative_degraded_land_protected():
     pd.testing.assert_series_equal(result['World'], expected_world)
 
 
+def test_cumulative_degraded_land_no_delay_and_nan():
+    index = range(2014, 2061)
+    units_adopted = pd.DataFrame({'World': 10.0, 'A': 1.0}, index=index)
+    units_adopted.loc[2020, 'A'] = np.nan
+    tot_area = pd.DataFrame({'A': 4.0, 'World': 100.0}, index=index)
+    result = unitadoption.cumulative_degraded_land(tot_area, units_adopted, 0.5, False, 0.5,
+            'unprotected')
+    assert list(result.columns) == ['World', 'A']
+    assert result.loc[2014, 'World'] == 0.0
+    assert result.loc[2015, 'World'] == pytest.approx(45.0)  # (100 - 10 - 0) * 0.5
+    assert result.loc[2016, 'World'] == pytest.approx(67.5)  # 45 + (100 - 10 - 45) * 0.5
+    # NaN is skipped by the min() against the total area, as pandas would.
+    assert result.loc[2020, 'A'] == 4.0
+    result = unitadoption.cumulative_degraded_land(tot_area, units_adopted, 0.5, False, 0.5,
+            'protected')
+    assert result.loc[2014, 'World'] == 5.0
+    assert result.loc[2015, 'World'] == pytest.approx(7.5)
+    with pytest.raises(ValueError):
+        unitadoption.cumulative_degraded_land(tot_area, units_adopted, 0.5, False, 0.5, 'both')
+
+
 def test_ref_cumulative_degraded_land_unprotected():
     ac = advanced_controls.AdvancedControls(degradation_rate=0.003074,
             delay_protection_1yr=True, disturbance_rate=1)
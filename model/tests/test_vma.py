@@ -2,6 +2,7 @@
 
 import pytest
 import io
+import pickle
 import pathlib
 import tempfile
 
@@ -122,6 +123,25 @@ def test_excluded_data_weights_are_incorrect():
     assert result == pytest.approx(expected)
 
 
+def test_sample():
+    s = """Source ID, Raw Data Input, Original Units, Conversion calculation, Common Units, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
+        a, 10000, , , , 3.0, False
+        b, 20000, , , , 1.0, False
+        c, 40000, , , , 1.0, True
+    """
+    v = vma.VMA(filename=io.StringIO(s), use_weight=True)
+    draws = v.sample(4000, rng=1)
+    assert set(draws) == {10000, 20000}  # the excluded 40000 is never drawn
+    assert (draws == 10000).mean() == pytest.approx(0.75, abs=0.03)
+    np.testing.assert_array_equal(draws, v.sample(4000, rng=1))
+    (mean, high, _) = v.avg_high_low(high_sd=1.0)
+    normal = v.sample(4000, rng=1, distribution='normal')
+    assert normal.mean() == pytest.approx(mean, rel=0.05)
+    assert normal.std() == pytest.approx(high - mean, rel=0.05)
+    with pytest.raises(ValueError):
+        v.sample(10, distribution='uniform')
+
+
 def test_single_study():
     f = io.StringIO("""Source ID, Raw Data Input, Original Units, Conversion calculation, Common Units, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
       A, 39%, %,
@@ -200,6 +220,44 @@ def test_avg_high_low_by_region_with_special_countries():
     assert result[0] == pytest.approx(0.5)
 
 
+def test_statistics():
+    f = io.StringIO("""Source ID, Raw Data Input, Original Units, Conversion calculation, Common Units, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
+      A, 0.4, Mha,,, 1.0, False, Temperate/Boreal-Humid, OECD90
+      B, 0.5, Mha,,, 1.0, False, Temperate/Boreal-Humid, USA
+      C, 0.6, Mha,,, 1.0, False, Tropical-Humid, Latin America
+      D, 0.9, Mha,,, 1.0, True, Tropical-Humid, Latin America
+      """)
+    v = vma.VMA(filename=f)
+    table = v.statistics()
+    assert list(table.index.names) == ['regime', 'region']
+    assert list(table.columns) == ['mean', 'high', 'low']
+    for ((regime, region), row) in table.iterrows():
+        expected = v.avg_high_low(regime=regime, region=region)
+        np.testing.assert_allclose(row.to_numpy(), expected)
+    assert table.loc[('', 'World'), 'mean'] == pytest.approx(0.5)
+    assert table.loc[('', 'OECD90'), 'mean'] == pytest.approx(0.45)
+    assert table.loc[('Temperate/Boreal-Humid', 'USA'), 'mean'] == pytest.approx(0.5)
+    assert np.isnan(table.loc[('Tropical-Humid', 'OECD90'), 'mean'])
+    assert v.avg_high_low(key='mean', region='World') == pytest.approx(0.5)
+
+
+def test_statistics_reread(tmp_path):
+    filename = tmp_path / 'vma.csv'
+    filename.write_text("""Source ID, Raw Data Input, Original Units, Conversion calculation, Common Units, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
+      A, 0.4, Mha,,, 1.0, False,, OECD90
+      B, 0.6, Mha,,, 1.0, False,, OECD90
+      """)
+    v = vma.VMA(filename=filename)
+    assert v.avg_high_low(key='mean', region='OECD90') == pytest.approx(0.5)
+    df = v.source_data.copy()
+    df.loc[1, 'Raw Data Input'] = 1.0
+    v.write_to_file(df)
+    assert v.avg_high_low(key='mean', region='OECD90') == pytest.approx(0.7)
+    filename.write_text(filename.read_text().replace('0.4', '0.2'))
+    v.reload_from_file()
+    assert v.avg_high_low(key='mean', region='OECD90') == pytest.approx(0.6)
+
+
 def test_no_warnings_in_avg_high_low():
     f = io.StringIO("""Source ID, Raw Data Input, Original Units, Conversion calculation, Common Units, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
       A, 1.0, Mha,,, 0.0, False
@@ -349,4 +407,18 @@ def test_units():
         B,,World,,,2012,,0.1,kg,,,,,
         """)
     v = vma.VMA(filename=f)
-    assert v.units is None
\ No newline at end of file
+    assert v.units is None
+
+def test_vma_directory():
+    directoryfile = basedir.joinpath('solution', 'afforestation', 'vma_data', 'vma_sources.json')
+    energyfile = basedir.joinpath('data', 'energy', 'vma_data', 'vma_sources.json')
+    lazy = vma.VMA.load_vma_directory(directoryfile, lazy=True)
+    assert isinstance(lazy, vma.VMADirectory) and 'not loaded' in repr(lazy)
+    eager = vma.VMA.load_vma_directory(directoryfile)
+    assert list(lazy) == list(eager)
+    title = next(iter(eager))
+    assert lazy[title].avg_high_low() == eager[title].avg_high_low()
+    merged = lazy | vma.VMA.load_vma_directory(energyfile, lazy=True)
+    assert isinstance(merged, vma.VMADirectory)
+    assert list(merged) == list(eager | vma.VMA.load_vma_directory(energyfile))
+    assert list(pickle.loads(pickle.dumps(merged))) == list(merged)
@@ -5,17 +5,46 @@ import os.path
 import pathlib
 import pandas as pd
 import numpy as np
-from io import StringIO
 
 from model import dd
 from model import emissionsfactors
 from model.advanced_controls import SOLUTION_CATEGORY
 
+from model.array_cache import array_cache
 from model.data_handler import DataHandler
 from model.decorators import data_func
 
-@lru_cache
-def cumulative_degraded_land( 
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def _degraded_land_kernel(protected_land, tot_area, initial, rate, protected):
+    """Run the cumulative degraded land recurrence over (years x regions) float64 arrays.
+
+       protected_land and tot_area hold the values used for each year after the first;
+       initial is the first year's row.  np.fmin matches the NaN-skipping min() of pandas.
+    """
+    result = np.empty((protected_land.shape[0] + 1, protected_land.shape[1]))
+    result[0, :] = initial
+    for i in range(protected_land.shape[0]):
+        degraded_land = result[i, :]
+        if protected:
+            row = degraded_land + (protected_land[i, :] - degraded_land) * rate
+            result[i + 1, :] = np.fmin(row, protected_land[i, :])
+        else:
+            row = degraded_land + (tot_area[i, :] - protected_land[i, :] - degraded_land) * rate
+            result[i + 1, :] = np.fmin(row, tot_area[i, :])
+    return result
+
+
+if njit is not None:
+    _degraded_land_kernel = njit(cache=True)(_degraded_land_kernel)
+
+
+@array_cache()
+def cumulative_degraded_land(
     total_area_per_region,
     units_adopted,
     disturbance_rate,
@@ -23,31 +52,36 @@ def cumulative_degraded_land(
     degradation_rate,
     protected_or_unprotected):
 
-    total_area_per_region = pd.read_csv(StringIO(total_area_per_region), index_col=0, squeeze=True, float_precision='round_trip')
-    units_adopted = pd.read_csv(StringIO(units_adopted), index_col=0, squeeze=True, float_precision='round_trip')
-
-    df = pd.DataFrame(0., columns=units_adopted.columns.copy(), index=range(2014, 2061))
-    df.index.name = 'Year'
+    years = np.arange(2014, 2061)
+    columns = units_adopted.columns.copy()
 
     if None in [delay_protection_1yr, disturbance_rate, degradation_rate]:
-        return df  # passthru a DataFrame of zeros for non protection solutions
-
-    delay = 1 if delay_protection_1yr else 0
-    if protected_or_unprotected == 'protected':
-        # protected table starts with nonzero value
-        df.loc[2014, :] = units_adopted.loc[2014, :] * disturbance_rate
-
-    for y in list(df.index)[1:]:
-        protected_land = units_adopted.loc[y - delay, :]
-        degraded_land = df.loc[y - 1, :]
+        # passthru a DataFrame of zeros for non protection solutions
+        values = np.zeros((len(years), len(columns)))
+    else:
+        delay = 1 if delay_protection_1yr else 0
+        units = units_adopted.astype(np.float64)
         if protected_or_unprotected == 'protected':
-            row = degraded_land + (protected_land - degraded_land) * disturbance_rate
-            row = pd.DataFrame([row, protected_land]).min()
+            # protected table starts with nonzero value
+            initial = units.loc[2014, :].to_numpy() * disturbance_rate
+            rate = disturbance_rate
         elif protected_or_unprotected == 'unprotected':
-            tot_area = total_area_per_region.loc[y, :]
-            row = degraded_land + (tot_area - protected_land - degraded_land) * degradation_rate
-            row = pd.DataFrame([row, tot_area]).min()
-        df.loc[y, :] = row
+            initial = np.zeros(len(columns))
+            rate = degradation_rate
+        else:
+            raise ValueError("Must indicate 'protected' or 'unprotected'")
+        protected_land = units.loc[years[1:] - delay, :].to_numpy()
+        if protected_or_unprotected == 'unprotected':
+            tot_area = total_area_per_region.reindex(columns=columns).astype(np.float64)
+            tot_area = tot_area.loc[years[1:], :].to_numpy()
+        else:
+            tot_area = np.empty_like(protected_land)
+        values = _degraded_land_kernel(np.ascontiguousarray(protected_land),
+                np.ascontiguousarray(tot_area), initial, float(rate),
+                protected_or_unprotected == 'protected')
+
+    df = pd.DataFrame(values, columns=columns, index=range(2014, 2061), dtype=np.float64)
+    df.index.name = 'Year'
     return df
 
 class UnitAdoption(DataHandler):
@@ -358,8 +392,8 @@ class UnitAdoption(DataHandler):
             raise ValueError("Must indicate 'REF' or 'PDS'")
 
         return cumulative_degraded_land(
-            self.total_area_per_region.to_csv(),
-            units_adopted.to_csv(),
+            self.total_area_per_region,
+            units_adopted,
             self.ac.disturbance_rate,
             self.ac.delay_protection_1yr,
             self.ac.degradation_rate,
@@ -1,5 +1,6 @@
 """Implementation of the Variable Meta-Analysis module."""
 
+import collections.abc
 import math
 from pathlib import Path
 import re
@@ -7,6 +8,7 @@ import numpy as np
 import pandas as pd
 import json
 import warnings
+import model.data_sources
 import model.dd
 
 VMA_columns = ['Value', 'Raw', 'Raw Units', 'Weight', 'Exclude?', 'Region', 'Main Region', 'TMR']
@@ -137,8 +139,8 @@ class VMA:
 
         Populates self.source_data and self.df
         """
-        csv_df = pd.read_csv(filename, index_col=False, skipinitialspace=True, skip_blank_lines=True,
-                             na_values=['#DIV/0!', '#REF!'])
+        csv_df = model.data_sources.read_csv(filename, index_col=False, skipinitialspace=True,
+                             skip_blank_lines=True, na_values=['#DIV/0!', '#REF!'])
         self._convert_from_human_readable(csv_df, filename)
 
  
@@ -158,6 +160,7 @@ class VMA:
         with a series of renamed columns, along with a few data cleanup steps.
         """
         self._validate_readable_df(readable_df)
+        self._cache_df = None  # forget the memoized statistics
         self.source_data = readable_df
         if self.use_weight:
             err = f"'Use weight' selected but no weights to use in {filename}"
@@ -211,6 +214,124 @@ class VMA:
         df = df[valid]
         return df
 
+    def _select(self, regime, region, discard_multiplier, stat_correction):
+        """Return the rows of self.df which avg_high_low computes its statistics over."""
+        df = self._discard_outliers(discard_multiplier) if stat_correction else self.df
+        df = df.loc[df['Exclude?'] == False]
+        if regime:
+            df = df.loc[df['TMR'] == regime]
+        if region in model.dd.SPECIAL_COUNTRIES:
+            df = df.loc[df['Region'] == region]
+        elif region in model.dd.MAIN_REGIONS:
+            # include values for special countries in corresponding main regions' statistics
+            df = df.loc[df['Main Region'] == region]
+        return df
+
+    @staticmethod
+    def _selection_key(regime, region):
+        """The (regime, region) selection that _select makes for these arguments."""
+        if region not in model.dd.SPECIAL_COUNTRIES and region not in model.dd.MAIN_REGIONS:
+            region = None
+        return (regime or None, region)
+
+    def _cache(self):
+        """The memoized statistics (see _statistics), emptied when the data is (re)read."""
+        if self.__dict__.get('_cache_df') is not self.df:
+            self._cache_df = self.df
+            self._rows_cache = {}
+            self._stats_cache = {}
+        return (self._rows_cache, self._stats_cache)
+
+    def _rows(self, discard_multiplier, stat_correction):
+        """Return (df, {regime: positions}, {region: positions}): the rows of self.df which are not
+        excluded (or discarded as outliers), and the positions in it of each regime and region,
+        grouped in one pass."""
+        rows_cache = self._cache()[0]
+        key = (discard_multiplier, bool(stat_correction))
+        rows = rows_cache.get(key)
+        if rows is None:
+            df = self._select(regime=None, region=None, discard_multiplier=discard_multiplier,
+                    stat_correction=stat_correction)
+            regimes = df.groupby('TMR', observed=True, sort=False).indices
+            regions = {k: v for (k, v) in df.groupby('Main Region', sort=False).indices.items()
+                       if k in model.dd.MAIN_REGIONS}
+            regions.update({k: v for (k, v) in df.groupby('Region', observed=True, sort=False).indices.items()
+                            if k in model.dd.SPECIAL_COUNTRIES})
+            rows = rows_cache[key] = (df, regimes, regions)
+        return rows
+
+    def _statistics(self, regime, region, discard_multiplier, stat_correction, use_weight):
+        """Return (mean, sd) of the rows _select selects.  Results are memoized, so each selection
+        is computed once (until the data is read again, see write_to_file and reload_from_file)."""
+        if self.df.empty:
+            return np.nan, np.nan
+        stats_cache = self._cache()[1]
+        (regime, region) = self._selection_key(regime, region)
+        key = (regime, region, discard_multiplier, bool(stat_correction), bool(use_weight))
+        stats = stats_cache.get(key)
+        if stats is None:
+            (df, regimes, regions) = self._rows(discard_multiplier, stat_correction)
+            empty = np.array([], dtype=np.intp)
+            if regime and region:
+                positions = np.intersect1d(regimes.get(regime, empty), regions.get(region, empty))
+            elif regime or region:
+                positions = regimes.get(regime, empty) if regime else regions.get(region, empty)
+            else:
+                positions = None
+            stats = stats_cache[key] = self._compute_statistics(
+                    df if positions is None else df.iloc[positions], use_weight)
+        return stats
+
+    def _compute_statistics(self, df, use_weight):
+        """Return (mean, sd) of the rows df of self.df."""
+        if use_weight:
+            # Sum the weights before discarding outliers, to match Excel.
+            # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#heading=h.qkdzs364y2t2
+            # Once reproducing Excel results is no longer essential, total_weight computation
+            # can be moved down to the second use_weight conditional below. That way the sum
+            # of the weights will only include sources which are being included in the mean.
+            total_weights = self.df['Weight'].fillna(1.0).sum()
+            total_weights = total_weights if total_weights != 0.0 else 1.0
+            all_weights = self.df['Weight'].fillna(1.0)
+            M = (all_weights != 0).sum()
+
+            weights = df['Weight'].fillna(1.0)
+            mean = (df['Value'] * weights).sum(skipna=True) / total_weights
+            if M == 0.0:
+                sd = 0.0
+            else:
+                # A weighted standard deviation is not the same as stddev()
+                numerator = (weights * ((df['Value'] - mean) ** 2)).sum()
+                # when Excel is deprecated, remove all_weights and use: M = (weights != 0).sum()
+                denominator = ((M - 1) / M) * total_weights
+                sd = math.sqrt(numerator / denominator)
+        else:
+            mean = df['Value'].mean(skipna=True)
+            # whole population stddev, ddof=0
+            sd = df['Value'].std(ddof=0)
+        return mean, sd
+
+    def statistics(self, low_sd=None, high_sd=None, discard_multiplier=None,
+                   stat_correction=None, use_weight=None, bound_correction=None):
+        """
+        Return a DataFrame with the mean, high and low (as avg_high_low returns them) for every
+        selection of sources: all of them, each thermal moisture regime in the data, each region
+        and each combination of the two.  The index has levels 'regime' ('' for all regimes) and
+        'region' (a name in dd.REGIONS).  Parameters are as for avg_high_low.
+        """
+        (_, regimes, _) = self._rows(
+                self.discard_multiplier if discard_multiplier is None else discard_multiplier,
+                self.stat_correction if stat_correction is None else stat_correction)
+        rows = {}
+        for regime in [''] + [r for r in regimes if r]:
+            for region in model.dd.REGIONS:
+                rows[(regime, region)] = self.avg_high_low(regime=regime, region=region,
+                        low_sd=low_sd, high_sd=high_sd, discard_multiplier=discard_multiplier,
+                        stat_correction=stat_correction, use_weight=use_weight,
+                        bound_correction=bound_correction)
+        index = pd.MultiIndex.from_tuples(list(rows), names=['regime', 'region'])
+        return pd.DataFrame(list(rows.values()), index=index, columns=['mean', 'high', 'low'])
+
     def avg_high_low(self, key=None, regime=None, region=None,
                     low_sd=None, high_sd=None, discard_multiplier=None, 
                     stat_correction=None, use_weight=None, bound_correction=None):
@@ -233,50 +354,15 @@ class VMA:
         use_weight = self.use_weight if use_weight is None else use_weight
         bound_correction = self.bound_correction if bound_correction is None else bound_correction
 
-        if use_weight:
-            # Sum the weights before discarding outliers, to match Excel.
-            # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#heading=h.qkdzs364y2t2
-            # Once reproducing Excel results is no longer essential, total_weight computation
-            # can be moved down to the second use_weight conditional below. That way the sum
-            # of the weights will only include sources which are being included in the mean.
-            total_weights = self.df['Weight'].fillna(1.0).sum()
-            total_weights = total_weights if total_weights != 0.0 else 1.0
-            all_weights = self.df['Weight'].fillna(1.0)
-            M = (all_weights != 0).sum()
-
-        if self.df.empty:
-            mean = high = low = np.nan
-        else:
-            df = self._discard_outliers(discard_multiplier) if stat_correction else self.df
-            df = df.loc[df['Exclude?'] == False]
-            if regime:
-                df = df.loc[df['TMR'] == regime]
-            if region in model.dd.SPECIAL_COUNTRIES:
-                df = df.loc[df['Region'] == region]
-            elif region in model.dd.MAIN_REGIONS:
-                # include values for special countries in corresponding main regions' statistics
-                df = df.loc[df['Main Region'] == region]
-
-            if use_weight:
-                weights = df['Weight'].fillna(1.0)
-                mean = (df['Value'] * weights).sum(skipna=True) / total_weights
-                if M == 0.0:
-                    sd = 0.0
-                else:
-                    # A weighted standard deviation is not the same as stddev()
-                    numerator = (weights * ((df['Value'] - mean) ** 2)).sum()
-                    # when Excel is deprecated, remove all_weights and use: M = (weights != 0).sum()
-                    denominator = ((M - 1) / M) * total_weights
-                    sd = math.sqrt(numerator / denominator)
-            else:
-                mean = df['Value'].mean(skipna=True)
-                # whole population stddev, ddof=0
-                sd = df['Value'].std(ddof=0)
-
-            high = mean + (high_sd * sd)
-            low = mean - (low_sd * sd)
-            if low < 0 and bound_correction:
-                low = min( df['Value'] )
+        (mean, sd) = self._statistics(regime=regime, region=region,
+                discard_multiplier=discard_multiplier, stat_correction=stat_correction,
+                use_weight=use_weight)
+        high = mean + (high_sd * sd)
+        low = mean - (low_sd * sd)
+        if low < 0 and bound_correction:
+            df = self._select(regime=regime, region=region, discard_multiplier=discard_multiplier,
+                    stat_correction=stat_correction)
+            low = min( df['Value'] )
 
         if key is None:
             return mean, high, low
@@ -289,6 +375,55 @@ class VMA:
         else:
             raise ValueError(f"invalid key: {key}. key must be 'mean', 'high', 'low' or None")
 
+    def sample(self, n, rng=None, distribution='empirical', regime=None, region=None,
+               discard_multiplier=None, stat_correction=None, use_weight=None,
+               bound_correction=None):
+        """
+        Draw n values of this variable, for Monte Carlo sensitivity analysis.
+
+        Args:
+          n: number of values to draw.
+          rng: a numpy.random.Generator, or a seed for one.
+          distribution: 'empirical' draws from the source values which avg_high_low computes
+            its statistics over (i.e. after discarding outliers and excluded sources), with
+            probabilities proportional to their weights if use_weight.  'normal' draws from a
+            normal distribution with the mean and standard deviation of avg_high_low; if
+            bound_correction, negative draws are replaced by the lowest source value, as for
+            the 'low' statistic.
+          Other parameters: as for avg_high_low.
+
+        Returns:
+          a numpy array of n values.
+        """
+        rng = np.random.default_rng(rng)
+        discard_multiplier = self.discard_multiplier if discard_multiplier is None else discard_multiplier
+        stat_correction = self.stat_correction if stat_correction is None else stat_correction
+        use_weight = self.use_weight if use_weight is None else use_weight
+        bound_correction = self.bound_correction if bound_correction is None else bound_correction
+
+        (mean, sd) = self._statistics(regime=regime, region=region,
+                discard_multiplier=discard_multiplier, stat_correction=stat_correction,
+                use_weight=use_weight)
+        df = self._select(regime=regime, region=region, discard_multiplier=discard_multiplier,
+                stat_correction=stat_correction)
+        values = df['Value'].to_numpy(dtype=np.float64)
+        valid = ~np.isnan(values)
+        if not valid.any():
+            raise ValueError(f"VMA {self.title!r} has no source values to sample")
+        if distribution == 'normal':
+            result = rng.normal(mean, sd, size=n)
+            if bound_correction:
+                result = np.where(result < 0, min(values[valid]), result)
+            return result
+        if distribution != 'empirical':
+            raise ValueError(f"invalid distribution: {distribution}. must be 'empirical' or 'normal'")
+        p = None
+        if use_weight:
+            weights = df['Weight'].fillna(1.0).to_numpy(dtype=np.float64)[valid]
+            if weights.sum() > 0:
+                p = weights / weights.sum()
+        return rng.choice(values[valid], size=n, p=p)
+
     def write_to_file(self, new_df):
         new_df.to_csv(path_or_buf=self.filename, index=False, encoding='utf-8')
         self._read_csv(filename=self.filename)
@@ -314,8 +449,11 @@ class VMA:
  
 
     @classmethod
-    def load_vma_directory(cls, directoryfile):
-        """Load and return an array of VMAs that are defined in a directory json-file"""
+    def load_vma_directory(cls, directoryfile, lazy=False):
+        """Load and return an array of VMAs that are defined in a directory json-file.
+        If lazy is True, return a VMADirectory which only loads them when first used."""
+        if lazy:
+            return VMADirectory(directoryfile, cls=cls)
         directoryfile = Path(directoryfile)
         directorycontent = json.loads(directoryfile.read_text(encoding='utf-8'))
         result = {}
@@ -351,3 +489,51 @@ class VMA:
         directoryfile = Path(directory)/"vma_sources.json"
         directoryfile.write_text(json.dumps(directoryinfo, indent=2))
 
+
+class VMADirectory(collections.abc.Mapping):
+    """The VMAs defined in one or more directory json-files (see VMA.load_vma_directory),
+    loaded when the mapping is first used.  Solutions define their VMAs this way, so that
+    importing a solution does not read every VMA file.  As with dicts, `|` merges two
+    directories, with the VMAs of the right one taking precedence."""
+
+    def __init__(self, *directoryfiles, cls=VMA):
+        self.directoryfiles = directoryfiles
+        self.cls = cls
+        self._vmas = None
+
+    def _load(self):
+        if self._vmas is None:
+            vmas = {}
+            for directoryfile in self.directoryfiles:
+                vmas.update(self.cls.load_vma_directory(directoryfile))
+            self._vmas = vmas
+        return self._vmas
+
+    def __getitem__(self, title):
+        return self._load()[title]
+
+    def __iter__(self):
+        return iter(self._load())
+
+    def __len__(self):
+        return len(self._load())
+
+    def __or__(self, other):
+        if isinstance(other, VMADirectory) and other.cls is self.cls:
+            return VMADirectory(*self.directoryfiles, *other.directoryfiles, cls=self.cls)
+        if isinstance(other, collections.abc.Mapping):
+            return {**self, **other}
+        return NotImplemented
+
+    def __ror__(self, other):
+        if isinstance(other, collections.abc.Mapping):
+            return {**other, **self}
+        return NotImplemented
+
+    def __reduce__(self):
+        # pickled (e.g. for worker processes) as the loaded dict
+        return (dict, (dict(self),))
+
+    def __repr__(self):
+        state = 'loaded' if self._vmas is not None else 'not loaded'
+        return f"VMADirectory({', '.join(str(f) for f in self.directoryfiles)}; {state})"
@@ -59,7 +59,11 @@ class World_TMR_AEZ_Map:
     def reduce_columns(self, column_mapping):
         """Create a reduced map by summing columns in column mapping.  The column mapping should be like
         `AEZ_LAND_COVER_MAP`"""
-        newcols = {}
-        for (newcol, arange) in enumerate(column_mapping):
-            newcols[newcol] = self._map[arange].sum(axis=1)
-        return pd.concat(newcols.values(), axis=1, keys=newcols.keys())
+        return sum_columns(self._map, column_mapping)
+
+
+def sum_columns(df, column_mapping):
+    """Return a dataframe with a column for each key of column mapping, the sum of the columns of df
+    it maps to.  The column mapping should be like `AEZ_LAND_COVER_MAP`"""
+    newcols = {newcol: df[arange].sum(axis=1) for (newcol, arange) in column_mapping.items()}
+    return pd.concat(newcols.values(), axis=1, keys=newcols.keys())
@@ -25,7 +25,7 @@ from solution import rrs
 
 DATADIR = Path(__file__).parents[2]/'data'
 THISDIR = Path(__file__).parent
-VMAs = vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json')
+VMAs = vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json', lazy=True)
 
 units = {
     "implementation unit": "bike lane km/ car lane km",
@@ -37,7 +37,7 @@ units = {
 name = 'Bike Infrastructure'
 solution_category = ac.SOLUTION_CATEGORY.REDUCTION
 
-scenarios = ac.load_scenarios_from_json(directory=THISDIR/'ac', vmas=VMAs)
+scenarios = ac.load_scenarios_from_json(directory=THISDIR/'ac', vmas=VMAs, lazy=True)
 
 # These are the "default" scenarios to use for each of the drawdown categories.
 # They should be set to the most recent "official" set"
@@ -27,8 +27,8 @@ from model import conversions
 
 DATADIR = pathlib.Path(__file__).parents[2].joinpath('data')
 THISDIR = pathlib.Path(__file__).parents[0]
-VMAs = (vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json') |
-        vma.VMA.load_vma_directory(DATADIR/'energy/vma_data/vma_sources.json'))
+VMAs = (vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json', lazy=True) |
+        vma.VMA.load_vma_directory(DATADIR/'energy/vma_data/vma_sources.json', lazy=True))
 
 units = {
     "implementation unit": "TW",
@@ -40,7 +40,7 @@ units = {
 name = 'Biomass from Perennial Crops for Electricity Generation'
 solution_category = ac.SOLUTION_CATEGORY.REPLACEMENT
 
-scenarios = ac.load_scenarios_from_json(directory=THISDIR.joinpath('ac'), vmas=VMAs)
+scenarios = ac.load_scenarios_from_json(directory=THISDIR.joinpath('ac'), vmas=VMAs, lazy=True)
 
 # These are the "default" scenarios to use for each of the drawdown categories.
 # They should be set to the most recent "official" set"
@@ -1,10 +1,19 @@
 """Return objects for solutions."""
 
 import importlib
+import json
+import os
+import sys
+import time
+import traceback
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 from functools import lru_cache
 from model import advanced_controls as ac
-from model import scenario
+from model import integration
+from model import profiling
+from model import result_cache
+import model.scenario
 from model import vma
 
 def all_solutions():
@@ -18,37 +27,81 @@ def all_solutions():
     return [ name for name in candidates if not name.startswith('_') and not name.startswith('test') ]
 
 def list_scenarios(solution):
-    """Return a list of scenarios for this solution"""
+    """Return a list of scenarios for this solution.  The names are read from the scenario files,
+    without loading the solution."""
+    acdir = solution_path(solution)/'ac'
+    if acdir.is_dir():
+        return ac.scenario_names_from_json(acdir)
     m = load_solution(solution)
     return list(m.scenarios.keys())
 
-def load_scenario(solution, scenario=None):
+def load_scenario(solution, scenario=None, lazy=False):
     """Load a scenario for the requested solution.  Scenario may be one of the following:
      *  None (the default): return the PDS2 scenario for this solution
      *  `PDS`, `PDS2` or `PDS3`:  get the most recent scenario of the requested type
      *  a scenario name:  load the scenario with that name
      *  an AdvancedControl object: create a scenario with these values
-     *  a dictionary representing an AdvancedControl object (e.g. its serialized form):  create a scenario with these values."""
+     *  a dictionary representing an AdvancedControl object (e.g. its serialized form):  create a scenario with these values.
+    If lazy is True, unit adoption, cost and emissions tables are only computed when they are first
+    needed (see scenario.lazy_models)."""
     m = load_solution(solution)
     if isinstance(scenario, dict):
         scenario = ac.ac_from_dict(scenario, m.VMAs)
     scenario = pds_truename(solution,scenario)
+    if lazy:
+        with model.scenario.lazy_models():
+            return m.Scenario(scenario)
     return m.Scenario(scenario)
 
+def scenario_ac(solution, scenario=None):
+    """Return the AdvancedControls that load_scenario(solution, scenario) would use, without
+    building the scenario.  Raises ValueError if solution has no such scenario."""
+    m = load_solution(solution)
+    if isinstance(scenario, dict):
+        return ac.ac_from_dict(scenario, m.VMAs)
+    if isinstance(scenario, ac.AdvancedControls):
+        return scenario
+    name = pds_truename(solution, scenario) or m.PDS2
+    alt_name = integration.integration_alt_name(name)
+    name = alt_name if alt_name in m.scenarios else name
+    if name not in m.scenarios:
+        raise ValueError(f"{solution} has no scenario {name!r}; its scenarios are {sorted(m.scenarios)}")
+    return m.scenarios[name]
+
+def load_scenario_outputs(solution, scenario=None, cache=None):
+    """Return the key results and all @data_func tables of a scenario (see
+    result_cache.scenario_outputs), using a persistent result cache if one is configured.
+    `cache` may be a result_cache.ResultCache, False to disable caching, or None to use the
+    cache configured by the DRAWDOWN_RESULT_CACHE environment variable (if any)."""
+    if cache is None:
+        cache = result_cache.default_cache()
+    if not cache:
+        return result_cache.scenario_outputs(load_scenario(solution, scenario))
+    the_ac = scenario_ac(solution, scenario)
+    key = result_cache.cache_key(solution, the_ac)
+    outputs = cache.get(solution, key)
+    if outputs is None:
+        outputs = result_cache.scenario_outputs(load_scenario(solution, the_ac))
+        cache.put(solution, key, outputs)
+    return outputs
+
 @lru_cache()
 def load_solution(solution):
     """Return the python module containing the Scenario class and attributes of this solution"""
+    profiling.enable_from_environment()
     importname = 'solution.' + solution
+    imported = importname in sys.modules
     m = importlib.import_module(importname)
 
-    # This reload is gratuitous for the first time you import a module m,
-    # but makes it possible to reload it if you've updated it, like so:
+    # Reloading makes it possible to reload a module m if you've updated it, like so:
     # 1. re-import this module (factory), which clears its lru cache but
     #    not Python's internal cache of imported modules.
     # 2. re-import m (using this method), which first calls import_module -
     #    a no-op because Python remembers it - but then calls 'reload' below
     #    which causes an actual reload.
-    importlib.reload(m)
+    # It is skipped the first time m is imported, which would only load it twice.
+    if imported:
+        importlib.reload(m)
     return m
 
 def all_solutions_scenarios():
@@ -57,6 +110,65 @@ def all_solutions_scenarios():
         everything[solution] = list_scenarios(solution)
     return everything
 
+def all_solutions_category(category):
+    """Return the solutions of a category (an ac.SOLUTION_CATEGORY).  The category is read from the
+    scenario files, without loading the solution."""
+    result = []
+    for solution in all_solutions():
+        for filename in sorted((solution_path(solution)/'ac').glob('*.json'))[:1]:
+            solution_category = json.loads(filename.read_text(encoding='utf-8'))['solution_category']
+            if ac.string_to_solution_category(solution_category) == category:
+                result.append(solution)
+    return result
+
+def _get_table(obj, table):
+    """Return the result of a dotted @data_func path like 'ua.soln_pds_tot_iunits_reqd' on obj"""
+    (*path, funcname) = table.split('.')
+    for attr in path:
+        obj = getattr(obj, attr)
+    func = getattr(obj, funcname)
+    if not getattr(func, 'data_func', False):
+        raise ValueError(f"{table} is not a @data_func table")
+    return func()
+
+def _run_one(solution, scenario, tables):
+    """Load one scenario and collect its results.  Runs in a worker process of run_scenarios."""
+    result = {'solution': solution, 'scenario': scenario, 'key_results': None,
+              'tables': {}, 'seconds': None, 'error': None}
+    start = time.perf_counter()
+    try:
+        s = load_scenario(solution, scenario)
+        result['scenario'] = s.scenario
+        result['key_results'] = s.get_key_results()
+        for table in tables:
+            result['tables'][table] = _get_table(s, table)
+    except Exception:
+        result['error'] = traceback.format_exc()
+    result['seconds'] = time.perf_counter() - start
+    return result
+
+def run_scenarios(pairs, tables=None, workers=None):
+    """Load many (solution, scenario) pairs in parallel and return their results.
+    Scenario may be anything accepted by load_scenario.
+    `tables` is an optional list of @data_func tables to return for each scenario, given as
+    dotted paths relative to the scenario, e.g. ['ua.soln_pds_tot_iunits_reqd', 'c2.co2_mmt_reduced'].
+    `workers` is the number of worker processes (default: the number of CPUs); with
+    workers=1 everything runs in the current process.
+
+    Returns a list of dicts, one per pair and in the same order, with the keys
+    'solution', 'scenario' (the true scenario name if it could be loaded), 'key_results',
+    'tables' (name -> result), 'seconds' (wall time to load and evaluate) and 'error'
+    (None, or the formatted traceback if anything failed)."""
+    pairs = list(pairs)
+    tables = list(tables or [])
+    workers = workers or os.cpu_count()
+    if workers == 1 or len(pairs) <= 1:
+        return [_run_one(solution, scenario, tables) for (solution, scenario) in pairs]
+    with ProcessPoolExecutor(max_workers=min(workers, len(pairs))) as executor:
+        futures = [executor.submit(_run_one, solution, scenario, tables)
+                   for (solution, scenario) in pairs]
+        return [f.result() for f in futures]
+
 def pds_scenarios(solution):
     """Return the names of the PDS scenarios for a given solution"""
     m = load_solution(solution)
@@ -45,3 +45,14 @@ def test_deep_results(scenario_skip=None, test_skip=None, test_only=None):
         expected_file,
         scenario_skip=scenario_skip, test_skip=test_skip, test_only=test_only)
 
+@pytest.mark.slow
+@pytest.mark.deep_sheets
+@pytest.mark.parametrize('scenario_name, sheetname',
+        expected_result_tester.deep_test_cases(solution_name, expected_file, scenario_skip=SCENARIO_SKIP))
+def test_deep_sheet(scenario_name, sheetname, record_property):
+    """Test computed results of one sheet of one scenario against stored Excel results (--deep-sheets)"""
+    expected_result_tester.one_sheet_tester(
+        solution_name,
+        expected_file,
+        scenario_name, sheetname,
+        test_skip=TEST_SKIP, record_property=record_property)
@@ -1,18 +1,27 @@
 """Test solution classes."""
 import dataclasses
 import json
+import pandas as pd
+import pytest
 from . import factory
 from model import scenario
 from model import advanced_controls as ac
+from model import result_cache
 
 def test_all_solutions():
     result = factory.all_solutions()
     assert 'solarpvutil' in result
     assert 'silvopasture' in result
 
+def test_all_solutions_category():
+    result = factory.all_solutions_category(ac.SOLUTION_CATEGORY.LAND)
+    assert 'silvopasture' in result and 'afforestation' in result
+    assert 'solarpvutil' not in result
+
 def test_list_scenarios():
     result = factory.list_scenarios('silvopasture')
     assert len(result) > 0
+    assert result == list(factory.load_solution('silvopasture').scenarios)
 
 def test_load_PDS_scenario():
     result = factory.load_scenario('peatlands','PDS2')
@@ -23,6 +32,64 @@ def test_load_named_scenario():
     result = factory.load_scenario('geothermal', scenarios[0])
     assert result and isinstance(result, scenario.Scenario)
 
+def test_run_scenarios():
+    pairs = [('solarpvutil', 'PDS2'), ('afforestation', 'PDS2'), ('no_such_solution', 'PDS2')]
+    results = factory.run_scenarios(pairs, tables=['c2.co2_mmt_reduced'], workers=2)
+    assert [r['solution'] for r in results] == ['solarpvutil', 'afforestation', 'no_such_solution']
+    assert results[0]['error'] is None
+    assert results[0]['scenario'] == factory.pds_truename('solarpvutil', 'PDS2')
+    expected = factory.load_scenario('solarpvutil', 'PDS2').get_key_results()
+    assert results[0]['key_results'] == expected
+    assert results[0]['tables']['c2.co2_mmt_reduced'].loc[2050, 'World'] > 0
+    assert 'cumulative_emissions_reduced' in results[1]['key_results']
+    assert results[2]['key_results'] is None
+    assert 'ModuleNotFoundError' in results[2]['error']
+    assert all(r['seconds'] >= 0 for r in results)
+
+def test_run_scenarios_rejects_non_data_func():
+    [result] = factory.run_scenarios([('solarpvutil', 'PDS2')], tables=['ua.__init__'], workers=1)
+    assert 'is not a @data_func table' in result['error']
+
+def test_load_scenario_outputs_cached(tmp_path):
+    cache = result_cache.ResultCache(tmp_path)
+    first = factory.load_scenario_outputs('solarpvutil', 'PDS2', cache=cache)
+    second = factory.load_scenario_outputs('solarpvutil', 'PDS2', cache=cache)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert first['key_results'] == second['key_results']
+    pd.testing.assert_frame_equal(first['tables']['ua']['ref_population'],
+                                  second['tables']['ua']['ref_population'])
+
+def test_unknown_scenario_cached(tmp_path):
+    cache = result_cache.ResultCache(tmp_path)
+    with pytest.raises(ValueError, match="PDS-25p2050-PDS2_june2020"):
+        factory.load_scenario_outputs('solarpvutil', 'No Such Scenario', cache=cache)
+
+def test_load_scenario_lazy():
+    eager = factory.load_scenario('solarpvutil', 'PDS3')
+    lazy = factory.load_scenario('solarpvutil', 'PDS3', lazy=True)
+    assert type(lazy.ua) is type(eager.ua)
+    pd.testing.assert_frame_equal(lazy.c2.co2eq_mmt_reduced(), eager.c2.co2eq_mmt_reduced())
+    assert 'soln_pds_annual_world_first_cost' in vars(lazy.oc)['_deferred']
+    assert lazy.get_key_results() == eager.get_key_results()
+
+def test_with_ac_changes():
+    original = factory.load_scenario('solarpvutil', 'PDS2', lazy=True)
+    original.get_key_results()
+    assert 'fc' in original.ac_dependencies()['pds_2014_cost']
+    assert 'ua' not in original.ac_dependencies()['pds_2014_cost']
+    changed = original.with_ac_changes(pds_2014_cost=1500.0)
+    assert changed.ac.pds_2014_cost == 1500.0
+    assert changed.ua is original.ua and changed.ht is original.ht
+    assert changed.fc is not original.fc and changed.oc is not original.oc
+    full = factory.load_scenario('solarpvutil', original.ac.with_modifications(pds_2014_cost=1500.0))
+    assert changed.get_key_results() == full.get_key_results()
+    pd.testing.assert_series_equal(changed.oc.soln_pds_annual_operating_cost(),
+                                   full.oc.soln_pds_annual_operating_cost())
+    changed = original.with_ac_changes(soln_lifetime_capacity=50000.0)
+    assert changed.ua is not original.ua and changed.tm is original.tm
+    full = factory.load_scenario('solarpvutil', original.ac.with_modifications(soln_lifetime_capacity=50000.0))
+    assert changed.get_key_results() == full.get_key_results()
+
 def test_load_custom_scenario_by_copying():
     onescenario = factory.load_scenario('hybridcars')
     
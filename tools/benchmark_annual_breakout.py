@@ -0,0 +1,83 @@
+"""Compare the loop and array implementations of the Operating Cost annual breakout.
+
+Usage:
+    python -m tools.benchmark_annual_breakout [solution ...]
+
+For each solution (solarpvutil and hybridcars by default) the PDS scenarios are loaded,
+the soln_pds and conv_ref breakout inputs are extracted from the OperatingCost object,
+and both model.operatingcost.annual_breakout and model.operatingcost.annual_breakout_array
+are timed on them.  The maximum absolute difference between the two results is reported;
+it is expected to be zero (and must be below 1e-9).
+"""
+
+import sys
+import timeit
+
+import numpy as np
+
+from model import operatingcost
+from model.advanced_controls import SOLUTION_CATEGORY
+from solution import factory
+
+DEFAULT_SOLUTIONS = ['solarpvutil', 'hybridcars']
+TOLERANCE = 1e-9
+
+
+def breakout_inputs(oc):
+    """Return the (name, args) for the soln_pds and conv_ref breakouts of an OperatingCost."""
+    ac = oc.ac
+    new_funits = oc.soln_pds_new_funits_per_year().loc[:, 'World']
+    if ac.solution_category in (SOLUTION_CATEGORY.LAND, SOLUTION_CATEGORY.OCEAN):
+        soln_iunits = conv_iunits = new_funits
+    else:
+        soln_iunits = oc.soln_pds_new_annual_iunits_reqd().loc[:, 'World']
+        conv_iunits = oc.conv_ref_new_annual_iunits_reqd().loc[:, 'World']
+    common = (ac.report_end_year, ac.has_var_costs, oc.conversion_factor_vom,
+            oc.conversion_factor_fom)
+    return [
+        ('soln_pds', (new_funits, soln_iunits, ac.soln_lifetime_replacement,
+            ac.soln_var_oper_cost_per_funit, ac.soln_fuel_cost_per_funit,
+            ac.soln_fixed_oper_cost_per_iunit) + common),
+        ('conv_ref', (new_funits, conv_iunits, ac.soln_lifetime_replacement,
+            ac.conv_var_oper_cost_per_funit, ac.conv_fuel_cost_per_funit,
+            ac.conv_fixed_oper_cost_per_iunit) + common),
+    ]
+
+
+# Both run_* bypass the array_cache so that every call measures the actual computation.
+def run_loop(funits, iunits, *args):
+    return operatingcost.annual_breakout.__wrapped__(funits, iunits, *args)
+
+
+def run_array(funits, iunits, *args):
+    return operatingcost.annual_breakout_array.__wrapped__(funits, iunits, *args)
+
+
+def benchmark(solution, number=3):
+    """Benchmark both implementations for the PDS scenarios of solution, returning rows of
+    (solution, scenario, table, loop seconds, array seconds, max abs difference)."""
+    rows = []
+    for pds in ['PDS1', 'PDS2', 'PDS3']:
+        s = factory.load_scenario(solution, pds)
+        for (name, args) in breakout_inputs(s.oc):
+            loop_time = timeit.timeit(lambda: run_loop(*args), number=number) / number
+            array_time = timeit.timeit(lambda: run_array(*args), number=number) / number
+            diff = np.nanmax(np.abs(run_loop(*args).values - run_array(*args).values))
+            rows.append((solution, s.scenario, name, loop_time, array_time, diff))
+    return rows
+
+
+def main(solutions):
+    ok = True
+    print(f"{'solution':<20}{'table':<10}{'loop (s)':>10}{'array (s)':>11}{'speedup':>9}"
+          f"{'max diff':>11}  scenario")
+    for solution in solutions:
+        for (soln, scen, name, loop_time, array_time, diff) in benchmark(solution):
+            ok = ok and diff <= TOLERANCE
+            print(f"{soln:<20}{name:<10}{loop_time:>10.4f}{array_time:>11.4f}"
+                  f"{loop_time / array_time:>8.1f}x{diff:>11.2e}  {scen}")
+    return ok
+
+
+if __name__ == "__main__":
+    sys.exit(0 if main(sys.argv[1:] or DEFAULT_SOLUTIONS) else 1)
@@ -6,14 +6,18 @@ same reasons.
 """
 # pylint: disable=line-too-long
 
+from collections import OrderedDict
 from os import error
 import re
 import functools
+import numbers
+import time
+from pathlib import Path
 import numpy as np
 import pandas as pd
 import pytest
-import zipfile
-from tools.util import df_excel_range, cell_to_offsets
+from tools import expected_store
+from model import advanced_controls as ac
 from model import scenario
 from solution import factory
 
@@ -832,10 +836,7 @@ def excel_read_cell_any_scenario(zip_f, sheetname, cell):
     """Find the first instance of sheetname, and return the value of cell."""
     for name in zip_f.namelist():
         if sheetname in name:
-            with zip_f.open(name=name) as zip_csv_f:
-                df = pd.read_csv(filepath_or_buffer=zip_csv_f, header=None)
-                (row,col) = cell_to_offsets(cell)
-                return df.loc[row,col]
+            return zip_f.excel_range(name, f'{cell}:{cell}', to_numeric=False).iloc[0, 0]
     return None
 
 
@@ -843,7 +844,7 @@ def RRS_solution_verify_list(obj, zip_f):
     """Assemble verification for the modules used in RRS solutions.
           Arguments:
               obj: a solution object to be verified.
-              zip_f: expected.zip of the Excel file to verify against.
+              zip_f: expected results (see expected_store.open) of the Excel file to verify against.
     """
     verify = {}
     include_regional_data = not is_custom_ad_with_no_regional_data(obj)
@@ -896,7 +897,7 @@ def LAND_solution_verify_list(obj, zip_f):
 
     Arguments:
         obj: a solution object to be verified.
-        zip_f: expected.zip of the Excel file to verify against.
+        zip_f: expected results (see expected_store.open) of the Excel file to verify against.
     """
     verify = {}
 
@@ -991,28 +992,55 @@ def dataframes_differ(val, expt, mask=None, all_zero=True, thresh=None):
     True.  Parameters all_zero and thresh are passed directly to `approx_compare`.
     If the dataframes do differ, return a list of tuples `(row, col, val.value, expt.value)`
     for each cell that differs.  Return False if they do not differ.
+
+    Cells where both values are numbers are compared with array operations equivalent to
+    `approx_compare`; all other cells (strings, None, ...) are passed to `approx_compare`.
     """
-    result = []   
-    (nrows,ncols) = val.shape
-    for r in range(nrows):
-        for c in range(ncols):
-            if mask is not None and mask.iloc[r,c]:
-                continue
-            if not approx_compare(val.iloc[r,c], expt.iloc[r,c], all_zero=all_zero, thresh=thresh):
-                result.append( (r, c, val.iloc[r,c], expt.iloc[r,c]) )
-    
+    (nrows, ncols) = val.shape
+    (v, v_numeric) = _numeric_cells(val)
+    (e, e_numeric) = _numeric_cells(expt.iloc[:nrows, :ncols])
+    thresh = thresh or 1e-4
+    numeric = v_numeric & e_numeric
+    with np.errstate(invalid='ignore'):
+        pseudo_zero = lambda x: (x == 0) | np.isnan(x) | (x == np.inf) | (np.abs(x) <= thresh)
+        close = (v == e) | (np.isfinite(e) & (np.abs(e - v) <= np.maximum(1e-6 * np.abs(e), thresh)))
+        if all_zero:
+            close = np.where(pseudo_zero(v), pseudo_zero(e), close)
+    differ = ~close & numeric
+    for (r, c) in zip(*np.nonzero(~numeric)):
+        differ[r, c] = not approx_compare(val.iloc[r, c], expt.iloc[r, c], all_zero=all_zero, thresh=thresh)
+    if mask is not None:
+        differ &= ~mask.to_numpy()[:nrows, :ncols].astype(bool)
+    result = [(int(r), int(c), val.iloc[r, c], expt.iloc[r, c]) for (r, c) in zip(*np.nonzero(differ))]
     return result if len(result) else False
 
 
+def _numeric_cells(df):
+    """Return (values, numeric): the values of df as a float array, and a boolean array of the
+    cells which hold (real) numbers.  Booleans are not numbers here, as pytest.approx compares
+    them exactly."""
+    values = np.full(df.shape, np.nan)
+    numeric = np.zeros(df.shape, dtype=bool)
+    for c in range(df.shape[1]):
+        column = df.iloc[:, c]
+        if column.dtype.kind in 'iuf':
+            values[:, c] = column.to_numpy(dtype=float)
+            numeric[:, c] = True
+        else:
+            for (r, x) in enumerate(column):
+                if isinstance(x, numbers.Real) and not isinstance(x, (bool, np.bool_)):
+                    values[r, c] = x
+                    numeric[r, c] = True
+    return (values, numeric)
+
+
 def check_excel_against_object(obj, zip_f, scenario, i, verify, test_skip=None, test_only=None):
     errors = []
     for sheetname in verify.keys():
         if _verbosity >= 2: print(sheetname)
         expected_scenario_name = find_expected_scenario_in_zip(scenario, zip_f)
         arcname = f'{expected_scenario_name}/{sheetname}'
-        with zip_f.open(name=arcname) as zip_csv_f:
-            sheet_df = pd.read_csv(zip_csv_f, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)', '#NUM!']) 
-        
+
         skip_count=0
         for (cellrange, actual_df, actual_mask, expected_mask) in verify[sheetname]:
             description = f"|{sheetname} {cellrange}|"
@@ -1024,7 +1052,7 @@ def check_excel_against_object(obj, zip_f, scenario, i, verify, test_skip=None,
                 skip_count = skip_count + 1
                 continue
 
-            expected_df = df_excel_range(sheet_df, cellrange)
+            expected_df = zip_f.excel_range(arcname, cellrange)
             if actual_df.shape != expected_df.shape:
                 raise AssertionError(description + '\nDataFrames differ in shape: ' +
                         str(actual_df.shape) + " versus " + str(expected_df.shape))
@@ -1084,7 +1112,7 @@ def one_solution_tester(solution_name, expected_filename,
 
     scenario_errors = {}
     scenario_count = 0
-    with zipfile.ZipFile(expected_filename) as zf:
+    with expected_store.open(expected_filename) as zf:
         for (i, scenario_name) in enumerate(factory.list_scenarios(solution_name)):
             if scenario_skip and i in scenario_skip:
                 if _verbosity >= 1: print(f"**** Skipped scenario {i} '{scenario_name}'")
@@ -1110,10 +1138,99 @@ def one_solution_tester(solution_name, expected_filename,
         raise AssertionError( strout )
 
 
+# Sheets which the verify lists compare.
+DEEP_SHEETS = ['AEZ Data', 'TAM Data', 'Adoption Data', 'Custom PDS Adoption', 'Custom REF Adoption',
+               'S-Curve Adoption', 'Helper Tables', 'Emissions Factors', 'Unit Adoption Calculations',
+               'First Cost', 'Operating Cost', 'CO2 Calcs', 'CH4 Calcs']
+
+
+def deep_test_cases(solution_name, expected_filename, scenario_skip=None):
+    """Return the pytest parameters (scenario_name, sheetname) for testing each sheet of each scenario
+    of a solution as a separate test item, with `one_sheet_tester`.  Items of the same scenario are in
+    the same xdist group, so that with `pytest -n auto --dist loadgroup` a scenario is loaded once.
+    `scenario_skip` is as for `one_solution_tester`.
+    """
+    if not Path(expected_filename).is_file():
+        # a single item, which reports the missing file
+        return [pytest.param(None, None, id='expected-results')]
+    cases = []
+    with expected_store.open(expected_filename, build=False) as zf:
+        names = set(zf.namelist())
+        # the scenario names of factory.list_scenarios, without importing the solution while collecting tests
+        scenario_names = ac.scenario_names_from_json(Path(factory.__file__).parent / solution_name / 'ac')
+        for (i, scenario_name) in enumerate(scenario_names):
+            if scenario_skip and i in scenario_skip:
+                continue
+            try:
+                expected_scenario_name = find_expected_scenario_in_zip(scenario_name, zf)
+                sheets = [s for s in DEEP_SHEETS if f'{expected_scenario_name}/{s}' in names]
+            except ValueError:
+                sheets = DEEP_SHEETS  # the test items report the missing scenario
+            group = pytest.mark.xdist_group(name=f'{solution_name}:{i}')
+            cases.extend(pytest.param(scenario_name, sheet, id=f'{scenario_name}:{sheet}', marks=group)
+                         for sheet in sheets)
+    return cases
+
+
+OPEN_EXPECTED_RESULTS = 8
+"""The number of most recently used expected results that _expected_results keeps open."""
+
+_open_expected_results = OrderedDict()
+
+
+def _expected_results(expected_filename):
+    """expected_store.open, kept open for later calls with the same expected_filename.  Only the
+    OPEN_EXPECTED_RESULTS most recently used are kept; older ones are closed."""
+    if expected_filename in _open_expected_results:
+        _open_expected_results.move_to_end(expected_filename)
+        return _open_expected_results[expected_filename]
+    zf = _open_expected_results[expected_filename] = expected_store.open(expected_filename)
+    while len(_open_expected_results) > OPEN_EXPECTED_RESULTS:
+        _open_expected_results.popitem(last=False)[1].close()
+    return zf
+
+
+@functools.lru_cache(maxsize=2)
+def _scenario_verify_list(solution_name, expected_filename, scenario_name):
+    """Return (obj, verify, seconds): the loaded scenario, its verify list and the time taken to
+    build them."""
+    start = time.perf_counter()
+    zf = _expected_results(expected_filename)
+    obj = factory.load_scenario(solution_name, scenario_name)
+    if isinstance(obj, scenario.LandScenario):
+        verify = LAND_solution_verify_list(obj, zf)
+    else:
+        verify = RRS_solution_verify_list(obj, zf)
+    return (obj, verify, time.perf_counter() - start)
+
+
+def one_sheet_tester(solution_name, expected_filename, scenario_name, sheetname,
+                     test_skip=None, test_only=None, record_property=None):
+    """Perform the expected result tests of one sheet of one scenario of a solution (see
+    `deep_test_cases`).  The scenario and its verify list are cached per process, so the other
+    sheets of the scenario reuse them.  `test_skip` and `test_only` are as for `one_solution_tester`.
+    `record_property`, the pytest fixture, records the scenario and how long loading it took, for
+    the summary of the slowest scenarios.
+    """
+    zf = _expected_results(expected_filename)
+    (obj, verify, load_seconds) = _scenario_verify_list(solution_name, expected_filename, scenario_name)
+    if record_property is not None:
+        record_property('deep_scenario', f'{solution_name}: {scenario_name}')
+        record_property('deep_scenario_load_seconds', load_seconds)
+    if sheetname not in verify:
+        pytest.skip(f"{sheetname} is not verified for {solution_name} {scenario_name}")
+    i = factory.list_scenarios(solution_name).index(scenario_name)
+    errors = check_excel_against_object(obj, zf, scenario_name, i,
+                                        {sheetname: verify[sheetname]}, test_skip=test_skip, test_only=test_only)
+    if len(errors):
+        raise AssertionError(f"\nSolution {solution_name} deep results\nscenario {i}: {scenario_name}\n" +
+                             "\n".join(errors))
+
+
 def key_results_tester(solution_name, expected_filename, scenario_skip=None, key_results_skip=[]):
     scenario_errors = {}
     scenario_count = 0
-    with zipfile.ZipFile(expected_filename) as zf:
+    with expected_store.open(expected_filename, build=False) as zf:
         for (i, scenario_name) in enumerate(factory.list_scenarios(solution_name)):
             if scenario_skip and i in scenario_skip:
                 if _verbosity >= 1: print(f"**** Skipped scenario {i} '{scenario_name}'")
@@ -1123,8 +1240,7 @@ def key_results_tester(solution_name, expected_filename, scenario_skip=None, key
 
             obj = factory.load_scenario(solution_name,scenario_name)
             expected_scenario_name = find_expected_scenario_in_zip(scenario_name, zf)
-            ac_file = zf.open(expected_scenario_name + "/" + 'Advanced Controls')
-            df_expected = pd.read_csv(ac_file, header=None, na_values=['#REF!', '#DIV/0!', '#VALUE!', '(N/A)','#NUM!'])
+            df_expected = zf.sheet(expected_scenario_name + "/" + 'Advanced Controls')
             key_results = obj.get_key_results()
             row_expected_values = 3
             cols_expected_values = range(0,6)
@@ -0,0 +1,264 @@
+"""Binary store of the expected results in expected.zip files.
+
+expected.zip holds one CSV per (scenario, sheet) of the Excel model.  The expected result
+tests compare many ranges of each sheet, and parsing the CSV text of every sheet of every
+scenario is much of their run time.  convert() parses each CSV of an expected.zip once and
+saves the cells in a compressed .npz file, one set of arrays per (scenario, sheet) member:
+  * kinds: the type pandas.read_csv inferred for each column (float, int, bool or text),
+  * values: the numeric cells as float64 (NaN elsewhere),
+  * codes and text: the cells of text columns, as indices into the distinct strings of the
+    sheet (-1 for NaN).
+ExpectedStore loads only the members that are asked for, and excel_range slices the arrays
+before building a DataFrame, returning the same frame as tools.util.df_excel_range on the
+parsed CSV.
+
+open() converts an expected.zip on first use and keeps the store under
+result_cache.cache_directory('expected'), keyed on the zip file's name, size and modification
+time.  If DRAWDOWN_RESULT_CACHE is not set (or disables caching) it returns an ExpectedZip, which parses the
+CSVs directly.  The stores of all solutions can be built ahead of a test run with
+`python -m tools.expected_store [solution ...]`.
+"""
+
+import argparse
+from collections import OrderedDict
+import hashlib
+import os
+import pathlib
+import zipfile
+
+import numpy as np
+import openpyxl
+import pandas as pd
+
+from model import result_cache
+from tools.util import df_excel_range
+
+NA_VALUES = ['#REF!', '#DIV/0!', '#VALUE!', '(N/A)', '#NUM!']
+
+# column kinds
+FLOAT, INT, BOOL, TEXT = 0, 1, 2, 3
+
+# codes of text columns besides indices into the strings of the sheet
+NAN_CODE, TRUE_CODE, FALSE_CODE = -1, -2, -3
+
+_VERSION = 1
+
+SHEET_CACHE_SIZE = 8
+"""The number of most recently used sheets an ExpectedStore or ExpectedZip keeps parsed."""
+
+
+def read_sheet(f):
+    """Parse a CSV of expected.zip, as the expected result tests always have."""
+    try:
+        return pd.read_csv(f, header=None, na_values=NA_VALUES)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame(index=pd.RangeIndex(0), columns=pd.Index([], dtype=np.int64))
+
+
+def _encode(df):
+    """Return the (kinds, values, codes, text) arrays of a parsed sheet."""
+    (nrows, ncols) = df.shape
+    kinds = np.full(ncols, FLOAT, dtype=np.int8)
+    values = np.full((nrows, ncols), np.nan)
+    codes = np.full((nrows, ncols), NAN_CODE, dtype=np.int32)
+    strings = {}
+    for c in range(ncols):
+        column = df.iloc[:, c]
+        if pd.api.types.is_bool_dtype(column.dtype):
+            kinds[c] = BOOL
+            values[:, c] = column.to_numpy(dtype=float)
+        elif pd.api.types.is_integer_dtype(column.dtype):
+            values[:, c] = column.to_numpy(dtype=float)
+            exact = (values[:, c].astype(np.int64) == column.to_numpy()).all()
+            kinds[c] = INT if exact else FLOAT
+        elif pd.api.types.is_float_dtype(column.dtype):
+            values[:, c] = column.to_numpy(dtype=float)
+        else:
+            kinds[c] = TEXT
+            for (r, value) in enumerate(column):
+                if value is True or value is False:
+                    codes[r, c] = TRUE_CODE if value else FALSE_CODE
+                elif not (isinstance(value, float) and np.isnan(value)):
+                    codes[r, c] = strings.setdefault(str(value), len(strings))
+    text = np.array(list(strings), dtype=str) if strings else np.zeros(0, dtype='<U1')
+    return (kinds, values, codes, text)
+
+
+def convert(zip_filename, store_filename):
+    """Convert the CSVs of expected.zip zip_filename into the store store_filename."""
+    arrays = {}
+    with zipfile.ZipFile(zip_filename) as zip_f:
+        names = zip_f.namelist()
+        for (i, name) in enumerate(names):
+            with zip_f.open(name=name) as csv_f:
+                (kinds, values, codes, text) = _encode(read_sheet(csv_f))
+            arrays.update({f'kinds{i}': kinds, f'values{i}': values, f'codes{i}': codes,
+                           f'text{i}': text})
+    arrays['names'] = np.array(names, dtype=str)
+    arrays['version'] = np.array(_VERSION)
+    store_filename = pathlib.Path(store_filename)
+    store_filename.parent.mkdir(parents=True, exist_ok=True)
+    tmp = store_filename.with_name(f".{store_filename.stem}.{os.getpid()}.tmp.npz")
+    np.savez_compressed(tmp, **arrays)
+    os.replace(tmp, store_filename)
+
+
+def _column(kind, values, codes, text):
+    if kind == FLOAT:
+        return values
+    if kind == INT:
+        return values.astype(np.int64)
+    if kind == BOOL:
+        return values.astype(bool)
+    column = np.full(len(codes), np.nan, dtype=object)
+    found = codes >= 0
+    column[found] = [str(s) for s in text[codes[found]]]
+    column[codes == TRUE_CODE] = True
+    column[codes == FALSE_CODE] = False
+    return column
+
+
+def _cached_sheet(sheets, name, load):
+    """Return sheets[name], calling load() for it if it is not there.  sheets is an OrderedDict
+    holding the SHEET_CACHE_SIZE most recently used sheets."""
+    if name in sheets:
+        sheets.move_to_end(name)
+        return sheets[name]
+    sheet = sheets[name] = load()
+    while len(sheets) > SHEET_CACHE_SIZE:
+        sheets.popitem(last=False)
+    return sheet
+
+
+class ExpectedStore:
+    """The expected results of a store created by convert().  Like zipfile.ZipFile, it can
+    be used as a context manager."""
+
+    def __init__(self, store_filename):
+        self._npz = np.load(store_filename, allow_pickle=False)
+        if int(self._npz['version']) != _VERSION:
+            self._npz.close()
+            raise ValueError(f"{store_filename} is not a version {_VERSION} expected store")
+        self._names = [str(name) for name in self._npz['names']]
+        self._index = {name: i for (i, name) in enumerate(self._names)}
+        self._sheets = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._npz.close()
+        self._sheets.clear()
+
+    def namelist(self):
+        """The names of the (scenario, sheet) members of expected.zip, like 'PDS1/TAM Data'."""
+        return list(self._names)
+
+    def _arrays(self, name):
+        if name not in self._index:
+            raise KeyError(f"There is no item named {name!r} in the expected results")
+        i = self._index[name]
+        return _cached_sheet(self._sheets, name, lambda: tuple(self._npz[f'{key}{i}']
+                             for key in ('kinds', 'values', 'codes', 'text')))
+
+    def _frame(self, name, rows, cols):
+        (kinds, values, codes, text) = self._arrays(name)
+        index = pd.RangeIndex(values.shape[0])[rows]
+        columns = range(len(kinds))[cols]
+        data = {c: _column(kinds[c], values[rows, c], codes[rows, c], text) for c in columns}
+        return pd.DataFrame(data, index=index, columns=pd.Index(columns, dtype=np.int64))
+
+    def sheet(self, name):
+        """Return the whole sheet name as read_sheet would parse its CSV."""
+        return self._frame(name, slice(None), slice(None))
+
+    def excel_range(self, name, rangeref, to_numeric=True):
+        """Return the range rangeref (like 'A48:H53') of sheet name, as df_excel_range would."""
+        (firstcol, firstrow, lastcol, lastrow) = openpyxl.utils.cell.range_boundaries(rangeref)
+        result = self._frame(name, slice(firstrow - 1, lastrow), slice(firstcol - 1, lastcol))
+        if to_numeric:
+            result = result.apply(pd.to_numeric, errors='ignore')
+        return result
+
+
+class ExpectedZip:
+    """The same interface as ExpectedStore, parsing the CSVs of expected.zip directly."""
+
+    def __init__(self, zip_filename):
+        self._zip_f = zipfile.ZipFile(zip_filename)
+        self._sheets = OrderedDict()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._zip_f.close()
+        self._sheets.clear()
+
+    def namelist(self):
+        return self._zip_f.namelist()
+
+    def sheet(self, name):
+        def load():
+            with self._zip_f.open(name=name) as csv_f:
+                return read_sheet(csv_f)
+        return _cached_sheet(self._sheets, name, load)
+
+    def excel_range(self, name, rangeref, to_numeric=True):
+        return df_excel_range(self.sheet(name), rangeref, to_numeric=to_numeric)
+
+
+def store_path(zip_filename):
+    """The path of the cached store of zip_filename, or None if caching is disabled."""
+    directory = result_cache.cache_directory('expected')
+    if directory is None:
+        return None
+    zip_filename = pathlib.Path(zip_filename).resolve()
+    st = zip_filename.stat()
+    key = f"{zip_filename}:{st.st_size}:{st.st_mtime_ns}:{_VERSION}".encode()
+    digest = hashlib.blake2b(key, digest_size=12).hexdigest()
+    return directory / f"{zip_filename.parent.parent.name}-{digest}.npz"
+
+
+def open(zip_filename, build=True):  # pylint: disable=redefined-builtin
+    """Return the expected results of expected.zip zip_filename, converting it to a store
+    on first use (see the module documentation).  With build=False an existing store is used
+    but none is created, for callers which only read a sheet or two."""
+    path = store_path(zip_filename)
+    if path is None or (not build and not path.is_file()):
+        return ExpectedZip(zip_filename)
+    if not path.is_file():
+        try:
+            convert(zip_filename, path)
+        except OSError:
+            return ExpectedZip(zip_filename)  # the store is an optimization only
+    return ExpectedStore(path)
+
+
+def main(solutions=None):
+    """Build the stores of the expected.zip files of solutions (default: all)."""
+    root = pathlib.Path(__file__).resolve().parents[1] / 'solution'
+    for zip_filename in sorted(root.glob('*/tests/expected.zip')):
+        solution = zip_filename.parent.parent.name
+        if solutions and solution not in solutions:
+            continue
+        path = store_path(zip_filename)
+        if path is None:
+            raise SystemExit("DRAWDOWN_RESULT_CACHE is not set, so there is no store to build")
+        if not path.is_file():
+            convert(zip_filename, path)
+        print(f"{solution}: {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description='Convert the expected.zip files of solutions to binary stores.')
+    parser.add_argument('solutions', nargs='*', help='Solutions to convert.  Defaults to all.')
+    args = parser.parse_args()
+    main(args.solutions)
@@ -1393,10 +1393,10 @@ def extract_vmas(f, wb, outputdir):
     vxe.write_vmas(vma_data, vma_dir_path)
     
     if is_elecgen:
-        f.write("VMAs = (vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json') | \n")
-        f.write("        vma.VMA.load_vma_directory(DATADIR/'energy/vma_data/vma_sources.json'))\n")
+        f.write("VMAs = (vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json', lazy=True) | \n")
+        f.write("        vma.VMA.load_vma_directory(DATADIR/'energy/vma_data/vma_sources.json', lazy=True))\n")
     else:
-        f.write("VMAs = vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json')\n")
+        f.write("VMAs = vma.VMA.load_vma_directory(THISDIR/'vma_data/vma_sources.json', lazy=True)\n")
     f.write("\n")
 
 
@@ -1675,7 +1675,7 @@ def output_solution_python_file(outputdir, xl_filename):
             fname = to_unique_filename(name, acs, suffix=".json")
             acs.append(fname)
             write_json(filename=ac_dir/fname, d=s)
-        f.write("scenarios = ac.load_scenarios_from_json(directory=THISDIR/'ac', vmas=VMAs)\n")
+        f.write("scenarios = ac.load_scenarios_from_json(directory=THISDIR/'ac', vmas=VMAs, lazy=True)\n")
         f.write("\n")
 
         f.write('# These are the "default" scenarios to use for each of the drawdown categories.\n')
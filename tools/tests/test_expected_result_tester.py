@@ -0,0 +1,60 @@
+from pathlib import Path
+import numpy as np
+import pandas as pd
+from tools import expected_result_tester
+from solution import factory
+
+def test_dataframes_differ():
+    val = pd.DataFrame([[1.0, 0.0, 'a', 5.0],
+                        [1e6, np.nan, '', 7.0],
+                        [2.0, np.inf, None, True]], dtype=object)
+    expt = pd.DataFrame([[1.0000005, np.nan, 'a', 5.1],
+                         [1e6 + 0.5, 0.00005, np.nan, 8.0],
+                         [3.0, 0.0, 0.0, 1.0]])
+    assert expected_result_tester.dataframes_differ(val, expt) == [
+            (0, 3, 5.0, 5.1), (1, 3, 7.0, 8.0), (2, 0, 2.0, 3.0)]
+    mask = pd.DataFrame(False, index=val.index, columns=val.columns)
+    mask.iloc[1, 3] = True
+    assert expected_result_tester.dataframes_differ(val, expt, mask=mask) == [
+            (0, 3, 5.0, 5.1), (2, 0, 2.0, 3.0)]
+    result = expected_result_tester.dataframes_differ(val, expt, all_zero=False, thresh=0.2)
+    assert repr(result) == repr([(0, 1, 0.0, np.nan), (1, 1, np.nan, 0.00005), (1, 2, '', np.nan),
+            (1, 3, 7.0, 8.0), (2, 0, 2.0, 3.0), (2, 1, np.inf, 0.0), (2, 2, None, 0.0)])
+    assert expected_result_tester.dataframes_differ(val.iloc[:1, :3], expt.iloc[:1, :3]) is False
+
+def test_dataframes_differ_matches_approx_compare():
+    values = [0.0, np.nan, np.inf, -np.inf, 1e-5, 2e-4, 1.0, 1.0000005, 1.00001, 1e6, 1e6 + 2,
+              '', None, 'a', True, 3]
+    val = pd.DataFrame([[v] * len(values) for v in values], dtype=object)
+    expt = pd.DataFrame([values] * len(values), dtype=object)
+    for all_zero in (True, False):
+        expected = [(r, c, values[r], values[c]) for r in range(len(values)) for c in range(len(values))
+                    if not expected_result_tester.approx_compare(values[r], values[c], all_zero=all_zero)]
+        assert repr(expected_result_tester.dataframes_differ(val, expt, all_zero=all_zero)) == repr(expected)
+
+def test_deep_test_cases():
+    thisdir = Path(__file__).parent
+    expected_file = thisdir.parents[1] / 'solution' / 'solarpvutil' / 'tests' / 'expected.zip'
+    cases = expected_result_tester.deep_test_cases('solarpvutil', expected_file, scenario_skip=[1])
+    scenarios = factory.list_scenarios('solarpvutil')
+    assert {case.values[0] for case in cases} == {s for (i, s) in enumerate(scenarios) if i != 1}
+    assert {case.values[1] for case in cases} <= set(expected_result_tester.DEEP_SHEETS)
+    assert all(case.id == f"{case.values[0]}:{case.values[1]}" for case in cases)
+    assert [case.id for case in expected_result_tester.deep_test_cases(
+            'solarpvutil', thisdir / 'no_such_expected.zip')] == ['expected-results']
+
+
+def test_expected_results_closes_evicted(monkeypatch):
+    class Store:
+        closed = False
+        def close(self):
+            self.closed = True
+    monkeypatch.setattr(expected_result_tester.expected_store, 'open', lambda filename: Store())
+    monkeypatch.setattr(expected_result_tester, '_open_expected_results', expected_result_tester.OrderedDict())
+    monkeypatch.setattr(expected_result_tester, 'OPEN_EXPECTED_RESULTS', 2)
+    a = expected_result_tester._expected_results('a.zip')
+    b = expected_result_tester._expected_results('b.zip')
+    assert expected_result_tester._expected_results('a.zip') is a
+    expected_result_tester._expected_results('c.zip')
+    assert b.closed and not a.closed
+    assert expected_result_tester._expected_results('a.zip') is a
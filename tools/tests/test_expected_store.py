@@ -0,0 +1,64 @@
+import zipfile
+import pandas as pd
+import pytest
+from model import result_cache
+from tools import expected_store
+
+SHEET = ("Title,,,\n"
+         "Year,World,OECD90,Flag\n"
+         "2014,1.5,#REF!,TRUE\n"
+         "2015,2.5,3,FALSE\n"
+         ",,,\n")
+
+@pytest.fixture
+def expected_zip(tmp_path):
+    filename = tmp_path / 'solution' / 'tests' / 'expected.zip'
+    filename.parent.mkdir(parents=True)
+    with zipfile.ZipFile(filename, mode='w') as zip_f:
+        zip_f.writestr('PDS1/TAM Data', SHEET)
+        zip_f.writestr('PDS1/Numbers', "1,2\n3,4.5\n")
+        zip_f.writestr('PDS1/ScenarioRecord', "")
+    return filename
+
+def test_store_matches_csv(expected_zip, tmp_path):
+    expected_store.convert(expected_zip, tmp_path / 'store.npz')
+    with expected_store.ExpectedStore(tmp_path / 'store.npz') as store, \
+            expected_store.ExpectedZip(expected_zip) as direct:
+        assert store.namelist() == direct.namelist()
+        for name in store.namelist():
+            pd.testing.assert_frame_equal(store.sheet(name), direct.sheet(name))
+        for rangeref in ['A3:D4', 'B2:C3', 'A1:A1', 'C1:D5', 'B3:F9', 'G1:H2']:
+            pd.testing.assert_frame_equal(store.excel_range('PDS1/TAM Data', rangeref),
+                    direct.excel_range('PDS1/TAM Data', rangeref))
+            pd.testing.assert_frame_equal(
+                    store.excel_range('PDS1/TAM Data', rangeref, to_numeric=False),
+                    direct.excel_range('PDS1/TAM Data', rangeref, to_numeric=False))
+        assert store.excel_range('PDS1/Numbers', 'B2:B2').iloc[0, 0] == 4.5
+        with pytest.raises(KeyError):
+            store.sheet('PDS2/TAM Data')
+
+def test_open(expected_zip, tmp_path, monkeypatch):
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path / 'cache'))
+    with expected_store.open(expected_zip) as store:
+        assert isinstance(store, expected_store.ExpectedStore)
+        assert store.excel_range('PDS1/TAM Data', 'A1:A1').iloc[0, 0] == 'Title'
+    assert list(result_cache.cache_directory('expected').glob('solution-*.npz'))
+    with expected_store.open(expected_zip, build=False) as store:
+        assert isinstance(store, expected_store.ExpectedStore)
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', str(tmp_path / 'other'))
+    with expected_store.open(expected_zip, build=False) as store:
+        assert isinstance(store, expected_store.ExpectedZip)
+    monkeypatch.setenv('DRAWDOWN_RESULT_CACHE', '0')
+    with expected_store.open(expected_zip) as store:
+        assert isinstance(store, expected_store.ExpectedZip)
+
+def test_sheet_cache_is_bounded(expected_zip, tmp_path, monkeypatch):
+    monkeypatch.setattr(expected_store, 'SHEET_CACHE_SIZE', 2)
+    expected_store.convert(expected_zip, tmp_path / 'store.npz')
+    with expected_store.ExpectedStore(tmp_path / 'store.npz') as store, \
+            expected_store.ExpectedZip(expected_zip) as direct:
+        for f in (store, direct):
+            for name in ['PDS1/TAM Data', 'PDS1/Numbers', 'PDS1/TAM Data', 'PDS1/ScenarioRecord']:
+                f.sheet(name)
+            assert list(f._sheets) == ['PDS1/TAM Data', 'PDS1/ScenarioRecord']
+        pd.testing.assert_frame_equal(store.sheet('PDS1/Numbers'), direct.sheet('PDS1/Numbers'))